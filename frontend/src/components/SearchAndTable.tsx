@@ -1,32 +1,99 @@
-import { useState } from "react";
+import { useEffect, useMemo, useRef, useState } from "react";
 import { Item } from "@/models";
+import { loadBlob } from "@/lib/blobs";
+import { loadSearchIndex, searchIndex, SearchIndex } from "@/lib/search";
 
 interface Props {
     items: Item[];
     onClickRow?: (item: Item) => void;
+    // name of the prebuilt index in public/search (covers summaries too)
+    searchIndexName?: string;
+    // for paged items (see lib/pages.ts): more pages can be loaded, and
+    // items past the first `listed` were only loaded for search hits
+    listed?: number;
+    hasMore?: boolean;
+    onLoadMore?: () => void;
+    onLoadAll?: () => void;
+    onLoadItemsAt?: (positions: number[], indexSize: number) => void;
 }
 
 export default function SearchAndTable({
-    items, onClickRow
+    items, onClickRow, searchIndexName, listed, hasMore, onLoadMore, onLoadAll, onLoadItemsAt
 }: Props) {
     const [searchQuery, setSearchQuery] = useState<string>("")
     const [selectedSummary, setSelectedSummary] = useState<string | null>(null)
     const [isModalOpen, setIsModalOpen] = useState<boolean>(false)
+    const activeBlob = useRef<string | null>(null)
+    const [index, setIndex] = useState<SearchIndex | null>(null)
+    const [indexFailed, setIndexFailed] = useState<boolean>(false)
 
-    const filtered = items.filter((item) => {
+    // fetch the index on the first keystroke, not on page load
+    useEffect(() => {
+        if (!searchIndexName || index || !searchQuery) return;
+        loadSearchIndex(searchIndexName)
+            .then(setIndex)
+            .catch((err) => {
+                console.error(err);
+                setIndexFailed(true);
+            });
+    }, [searchIndexName, index, searchQuery]);
+
+    const hits = useMemo(
+        () => (index && searchQuery.trim() ? searchIndex(index, searchQuery) : null),
+        [index, searchQuery]
+    );
+
+    // hits can be on any page: fetch just the pages holding them, or every
+    // page when there is no index to tell which
+    useEffect(() => {
+        if (!hasMore || !searchQuery.trim()) return;
+        if (hits && index) onLoadItemsAt?.(hits, index.ids.length);
+        else if (!searchIndexName || indexFailed) onLoadAll?.();
+    }, [hasMore, searchQuery, hits, index, searchIndexName, indexFailed, onLoadItemsAt, onLoadAll]);
+
+    const itemsById = useMemo(
+        () => new Map(items.map((item) => [String(item.id), item])),
+        [items]
+    );
+
+    const indexedIds = useMemo(() => new Set(index?.ids ?? []), [index]);
+
+    const filtered = useMemo(() => {
+        if (!searchQuery.trim()) return items.slice(0, listed ?? items.length);
+        // plain substring match on title and url
         const query = searchQuery.toLowerCase();
-        return (
+        const matches = (item: Item) =>
             item.title.toLowerCase().includes(query) ||
-            item.url.toLowerCase().includes(query)
+            item.url.toLowerCase().includes(query);
+        if (!index || !hits) return items.filter(matches);
+        // hits on pages still loading show up once their page is in
+        const ranked = hits
+            .map((doc) => itemsById.get(index.ids[doc]))
+            .filter((item): item is Item => item !== undefined);
+        // items added since the index was built are only found by substring
+        const unindexed = items.filter(
+            (item) => !indexedIds.has(String(item.id)) && matches(item)
         );
-    });
+        return [...ranked, ...unindexed];
+    }, [items, listed, itemsById, index, indexedIds, hits, searchQuery]);
 
-    const handleSummaryClick = (summary: string | null | undefined) => {
-        setSelectedSummary(summary || null);
+    const handleSummaryClick = (item: Item) => {
+        setSelectedSummary(item.summary || null);
         setIsModalOpen(true);
+        activeBlob.current = item.summaryBlob ?? null;
+        if (item.summaryBlob) {
+            // show the preview right away, swap in the full text once loaded
+            const path = item.summaryBlob;
+            loadBlob<string>(path)
+                .then((full) => {
+                    if (activeBlob.current === path) setSelectedSummary(full);
+                })
+                .catch((err) => console.error(err));
+        }
     };
 
     const closeModal = () => {
+        activeBlob.current = null;
         setIsModalOpen(false);
         setSelectedSummary(null);
     };
@@ -94,7 +161,7 @@ export default function SearchAndTable({
                                             <button
                                                 onClick={(e) => {
                                                     e.stopPropagation();
-                                                    handleSummaryClick(item.summary);
+                                                    handleSummaryClick(item);
                                                 }}
                                                 className="text-left w-full text-gray-300 hover:text-white transition-colors max-w-64"
                                             >
@@ -151,7 +218,7 @@ export default function SearchAndTable({
                                 <button
                                     onClick={(e) => {
                                         e.stopPropagation();
-                                        handleSummaryClick(item.summary);
+                                        handleSummaryClick(item);
                                     }}
                                     className="text-left w-full text-gray-300 hover:text-white transition-colors"
                                 >
@@ -176,6 +243,17 @@ export default function SearchAndTable({
                 )}
             </div>
 
+            {hasMore && !searchQuery.trim() && (
+                <div className="mt-4 text-center">
+                    <button
+                        onClick={onLoadMore}
+                        className="bg-gray-800 border border-gray-700 rounded px-4 py-2 text-gray-300 hover:text-white hover:bg-gray-700 transition-colors"
+                    >
+                        Load more
+                    </button>
+                </div>
+            )}
+
             {/* Summary Modal */}
             {isModalOpen && (
                 <div
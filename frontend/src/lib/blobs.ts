@@ -0,0 +1,33 @@
+// Heavy per-item fields (full summaries, transcripts) live in gzip blobs under
+// public/blobs; the bundled data files only carry a preview and the blob path.
+
+const GZIP_MAGIC = [0x1f, 0x8b]
+
+const cache = new Map<string, Promise<unknown>>()
+
+async function decode(buffer: ArrayBuffer): Promise<string> {
+  const bytes = new Uint8Array(buffer)
+  // some hosts serve .gz with Content-Encoding: gzip and the browser has
+  // already inflated it, so only decompress when the magic bytes are there
+  if (bytes[0] !== GZIP_MAGIC[0] || bytes[1] !== GZIP_MAGIC[1]) {
+    return new TextDecoder().decode(bytes)
+  }
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("gzip"))
+  return new Response(stream).text()
+}
+
+export function loadBlob<T = unknown>(path: string): Promise<T> {
+  let pending = cache.get(path)
+  if (!pending) {
+    pending = fetch(`/${path}`)
+      .then((res) => {
+        if (!res.ok) throw new Error(`Failed to load ${path}: ${res.status}`)
+        return res.arrayBuffer()
+      })
+      .then(decode)
+      .then((text) => JSON.parse(text))
+    pending.catch(() => cache.delete(path))
+    cache.set(path, pending)
+  }
+  return pending as Promise<T>
+}
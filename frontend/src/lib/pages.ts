@@ -0,0 +1,129 @@
+// Client for the paginated data files built by scripts/build_pages.py.
+// Only the manifest (/pages/<name>.json) is fetched up front; pages are
+// content-hashed gzip files, fetched newest first as the list grows, and
+// out of order when a search hit is on a page that is not loaded yet.
+
+import { useCallback, useEffect, useMemo, useState } from "react"
+import { loadBlob } from "@/lib/blobs"
+
+interface PageRef {
+  path: string
+  count: number
+}
+
+export interface Manifest {
+  v: number
+  total: number
+  pageSize: number
+  pages: PageRef[]
+}
+
+const manifests = new Map<string, Promise<Manifest>>()
+
+export function loadManifest(name: string): Promise<Manifest> {
+  let pending = manifests.get(name)
+  if (!pending) {
+    // the manifest keeps its name across builds, so always revalidate it
+    pending = fetch(`/pages/${name}.json`, { cache: "no-cache" }).then((res) => {
+      if (!res.ok) throw new Error(`Failed to load pages of ${name}: ${res.status}`)
+      return res.json() as Promise<Manifest>
+    })
+    pending.catch(() => manifests.delete(name))
+    manifests.set(name, pending)
+  }
+  return pending
+}
+
+export function loadPage<T>(page: PageRef): Promise<T[]> {
+  return loadBlob<T[]>(`${page.path}.gz`)
+}
+
+// the newest page is the partial one and may hold a single item
+function initialPages(manifest: Manifest): number {
+  const [first] = manifest.pages
+  return first && first.count < manifest.pageSize ? 2 : 1
+}
+
+// manifest position of the page holding item `position` of the data file
+// (pages hold fixed blocks of it, newest block first)
+function pageOf(manifest: Manifest, position: number): number {
+  return manifest.pages.length - 1 - Math.floor(position / manifest.pageSize)
+}
+
+export function usePagedItems<T>(name: string) {
+  const [manifest, setManifest] = useState<Manifest | null>(null)
+  // loaded pages by manifest position; pages [0, wanted) make up the list,
+  // others are only loaded because they hold search hits
+  const [pages, setPages] = useState<Map<number, T[]>>(new Map())
+  const [wanted, setWanted] = useState(0)
+
+  useEffect(() => {
+    let cancelled = false
+    loadManifest(name)
+      .then((loaded) => {
+        if (cancelled) return
+        setManifest(loaded)
+        setWanted((current) => Math.max(current, initialPages(loaded)))
+      })
+      .catch((err) => console.error(err))
+    return () => {
+      cancelled = true
+    }
+  }, [name])
+
+  // loadPage caches its promise, so asking twice for a page fetches it once
+  const fetchPages = useCallback(
+    (numbers: Iterable<number>) => {
+      if (!manifest) return
+      for (const number of new Set(numbers)) {
+        if (pages.has(number) || number < 0 || number >= manifest.pages.length) continue
+        loadPage<T>(manifest.pages[number])
+          .then((loaded) =>
+            setPages((current) =>
+              current.has(number) ? current : new Map(current).set(number, loaded)
+            )
+          )
+          .catch((err) => console.error(err))
+      }
+    },
+    [manifest, pages]
+  )
+
+  useEffect(() => {
+    if (!manifest) return
+    const end = Math.min(wanted, manifest.pages.length)
+    fetchPages(Array.from({ length: end }, (_, i) => i))
+  }, [manifest, wanted, fetchPages])
+
+  const items = useMemo(
+    () => [...pages.entries()].sort((a, b) => a[0] - b[0]).flatMap(([, page]) => page),
+    [pages]
+  )
+  // items[0, listed) are the pages loaded in order, the list without gaps
+  let listedPages = 0
+  let listed = 0
+  for (let page = pages.get(0); page; page = pages.get(listedPages)) {
+    listed += page.length
+    listedPages++
+  }
+
+  const loadMore = useCallback(
+    () => setWanted((current) => Math.max(current, listedPages) + 1),
+    [listedPages]
+  )
+  const loadAll = useCallback(() => setWanted(Infinity), [])
+  // positions are doc numbers of the search index, which lists the items in
+  // data-file order; an index of another size was built from another file
+  // version and cannot tell which pages to fetch
+  const loadItemsAt = useCallback(
+    (positions: number[], indexSize: number) => {
+      if (!manifest) return
+      if (indexSize !== manifest.total) setWanted(Infinity)
+      else fetchPages(positions.map((position) => pageOf(manifest, position)))
+    },
+    [manifest, fetchPages]
+  )
+  const hasMore = manifest !== null && listedPages < manifest.pages.length
+
+  return { items, listed, hasMore, loadMore, loadAll, loadItemsAt }
+}
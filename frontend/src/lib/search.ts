@@ -0,0 +1,171 @@
+// Client for the inverted indexes built by scripts/build_search_index.py.
+// Indexes are fetched lazily from /search/<name>.json and queried with
+// binary-searched prefix lookups, so query cost does not grow with the corpus.
+// See the module docstring there for the format.
+
+interface RawIndex {
+  v: number
+  ids: (string | number)[]
+  terms: string
+  postings: string
+}
+
+export interface SearchIndex {
+  ids: string[]
+  terms: string[]
+  // varint-encoded (doc delta, weight) pairs per term, decoded on lookup
+  postings: string[]
+}
+
+// a very short prefix like "a" would otherwise expand to thousands of terms;
+// the exact term and the terms in the most documents are kept
+const MAX_PREFIX_EXPANSION = 64
+const TOKEN_RE = /[a-z0-9]+/g
+const MAX_TERM_LEN = 32
+// varint digits, must match TERMINAL and CONTINUATION in build_search_index.py
+const TERMINAL = "0123456789abcdefghijklmnopqrstuv"
+const CONTINUATION = "ABCDEFGHIJKLMNOPQRSTUVWXYZwxyz-_"
+const DIGIT_VALUE = new Int8Array(128).fill(-1)
+const IS_TERMINAL = new Uint8Array(128)
+for (let i = 0; i < 32; i++) {
+  DIGIT_VALUE[TERMINAL.charCodeAt(i)] = i
+  DIGIT_VALUE[CONTINUATION.charCodeAt(i)] = i
+  IS_TERMINAL[TERMINAL.charCodeAt(i)] = 1
+}
+
+const loaded = new Map<string, Promise<SearchIndex>>()
+
+// must match stem() in scripts/build_search_index.py
+function stem(token: string): string {
+  if (token.length > 3 && token.endsWith("s") && !/(ss|us|is)$/.test(token)) {
+    return token.slice(0, -1)
+  }
+  return token
+}
+
+// must match tokenize() in scripts/build_search_index.py
+export function tokenize(text: string): string[] {
+  return (text.toLowerCase().match(TOKEN_RE) ?? []).map((t) => stem(t.slice(0, MAX_TERM_LEN)))
+}
+
+// front-coded terms: an uppercase letter (A + shared prefix length) starts
+// each term, and terms themselves only hold [a-z0-9]
+function decodeTerms(coded: string): string[] {
+  const terms: string[] = []
+  let previous = ""
+  let i = 0
+  while (i < coded.length) {
+    const shared = coded.charCodeAt(i) - 65
+    let j = i + 1
+    while (j < coded.length && !(coded[j] >= "A" && coded[j] <= "Z")) j++
+    previous = previous.slice(0, shared) + coded.slice(i + 1, j)
+    terms.push(previous)
+    i = j
+  }
+  return terms
+}
+
+// the numbers of one postings list: doc delta, weight, doc delta, ...
+function decodePostings(coded: string): number[] {
+  const numbers: number[] = []
+  let value = 0
+  for (let i = 0; i < coded.length; i++) {
+    const code = coded.charCodeAt(i)
+    value = value * 32 + DIGIT_VALUE[code]
+    if (IS_TERMINAL[code]) {
+      numbers.push(value)
+      value = 0
+    }
+  }
+  return numbers
+}
+
+export function loadSearchIndex(name: string): Promise<SearchIndex> {
+  let pending = loaded.get(name)
+  if (!pending) {
+    pending = fetch(`/search/${name}.json`)
+      .then((res) => {
+        if (!res.ok) throw new Error(`Failed to load search index ${name}: ${res.status}`)
+        return res.json() as Promise<RawIndex>
+      })
+      .then((raw) => ({
+        ids: raw.ids.map(String),
+        terms: decodeTerms(raw.terms),
+        postings: raw.postings ? raw.postings.split(" ") : [],
+      }))
+    pending.catch(() => loaded.delete(name))
+    loaded.set(name, pending)
+  }
+  return pending
+}
+
+function lowerBound(terms: string[], prefix: string): number {
+  let lo = 0
+  let hi = terms.length
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1
+    if (terms[mid] < prefix) lo = mid + 1
+    else hi = mid
+  }
+  return lo
+}
+
+// score of every document matching any term that starts with `prefix`
+function matchPrefix(index: SearchIndex, prefix: string): Map<number, number> {
+  const scores = new Map<number, number>()
+  const total = index.ids.length
+  // terms are sorted, so the ones starting with prefix are a contiguous range
+  const start = lowerBound(index.terms, prefix)
+  const end = lowerBound(index.terms, prefix + "\uffff")
+  let matched = Array.from({ length: end - start }, (_, i) => start + i)
+  if (matched.length > MAX_PREFIX_EXPANSION) {
+    // the encoded length stands in for the number of documents
+    const rank = (t: number) =>
+      index.terms[t] === prefix ? Infinity : index.postings[t].length
+    matched = matched.sort((a, b) => rank(b) - rank(a)).slice(0, MAX_PREFIX_EXPANSION)
+  }
+  for (const t of matched) {
+    const term = index.terms[t]
+    const postings = decodePostings(index.postings[t])
+    const docCount = postings.length / 2
+    const idf = Math.log(1 + (total - docCount + 0.5) / (docCount + 0.5))
+    // exact term hits rank above completions of a prefix
+    const boost = term === prefix ? 1 : 0.7
+    let doc = 0
+    for (let i = 0; i < postings.length; i += 2) {
+      doc += postings[i]
+      const weight = postings[i + 1]
+      const score = idf * boost * ((weight * 2.2) / (weight + 1.2))
+      scores.set(doc, Math.max(scores.get(doc) ?? 0, score))
+    }
+  }
+  return scores
+}
+
+// doc numbers (positions in the data file, see index.ids) of matching items,
+// best first; every query token must match. All tokens are prefix-matched so
+// results update while typing.
+export function searchIndex(index: SearchIndex, query: string): number[] {
+  const tokens = tokenize(query)
+  if (tokens.length === 0) return []
+
+  let combined: Map<number, number> | null = null
+  for (const token of tokens) {
+    const scores = matchPrefix(index, token)
+    if (combined === null) {
+      combined = scores
+      continue
+    }
+    const next = new Map<number, number>()
+    for (const [doc, score] of combined) {
+      const other = scores.get(doc)
+      if (other !== undefined) next.set(doc, score + other)
+    }
+    combined = next
+    if (combined.size === 0) break
+  }
+
+  return [...(combined ?? new Map<number, number>()).entries()]
+    .sort((a, b) => b[1] - a[1] || b[0] - a[0])
+    .map(([doc]) => doc)
+}
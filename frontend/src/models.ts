@@ -3,5 +3,7 @@ export interface Item {
     title: string;
     url: string;
     summary?: string;
+    // path of the gzip blob holding the full summary when `summary` is a preview
+    summaryBlob?: string;
     addedAt: Date;
 }
\ No newline at end of file
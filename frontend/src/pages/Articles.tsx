@@ -1,26 +1,37 @@
 import Navbar from "@/components/Navbar";
 import { useMemo } from "react";
 import SearchAndTable from "@/components/SearchAndTable";
-import articlesRawLinks from "../data/articles.json";
+import { usePagedItems } from "@/lib/pages";
 import { Item } from "@/models";
 
 export default function Articles() {
+    // pages hold the newest items first
+    const { items, listed, hasMore, loadMore, loadAll, loadItemsAt } = usePagedItems<any>("articles");
     const links: Item[] = useMemo(
         () =>
-            articlesRawLinks.map((entry: any) => ({
+            items.map((entry: any) => ({
                 id: entry.id,
                 title: entry.title,
                 url: entry.url,
                 summary: entry.summary,
+                summaryBlob: entry.summaryBlob,
                 addedAt: new Date(entry.addedAt),
             })),
-        []
+        [items]
     );
     return (
         <div>
             <Navbar />
             <h1 className="my-4 text-center font-bold text-3xl">Articles</h1>
-            <SearchAndTable items={links.reverse()} />
+            <SearchAndTable
+                items={links}
+                searchIndexName="articles"
+                listed={listed}
+                hasMore={hasMore}
+                onLoadMore={loadMore}
+                onLoadAll={loadAll}
+                onLoadItemsAt={loadItemsAt}
+            />
         </div>
     )
 
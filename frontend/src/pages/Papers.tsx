@@ -19,7 +19,7 @@ export default function Papers() {
         <div>
             <Navbar />
             <h1 className="my-4 text-center font-bold text-3xl">Papers</h1>
-            <SearchAndTable items={links.reverse()} />
+            <SearchAndTable items={links.reverse()} searchIndexName="papers" />
         </div>
     )
 
@@ -19,7 +19,7 @@ export default function People() {
         <div>
             <Navbar />
             <h1 className="my-4 text-center font-bold text-3xl">People</h1>
-            <SearchAndTable items={pplinks.reverse()} />
+            <SearchAndTable items={pplinks.reverse()} searchIndexName="ppl" />
         </div>
     )
 
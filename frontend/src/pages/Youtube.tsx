@@ -1,26 +1,37 @@
 import Navbar from "@/components/Navbar";
 import { useMemo } from "react";
 import SearchAndTable from "@/components/SearchAndTable";
-import ytlinksRaw from "../data/yt.json";
+import { usePagedItems } from "@/lib/pages";
 import { Item } from "@/models";
 
 export default function Youtube() {
+    // pages hold the newest items first
+    const { items, listed, hasMore, loadMore, loadAll, loadItemsAt } = usePagedItems<any>("yt");
     const ytlinks: Item[] = useMemo(
         () =>
-            ytlinksRaw.map((entry: any) => ({
+            items.map((entry: any) => ({
                 id: entry.id,
                 title: entry.title,
                 url: entry.url,
                 summary: entry.summary,
+                summaryBlob: entry.summaryBlob,
                 addedAt: new Date(entry.addedAt),
             })),
-        []
+        [items]
     );
     return (
         <div>
             <Navbar />
             <h1 className="my-4 text-center font-bold text-3xl">Youtube Links</h1>
-            <SearchAndTable items={ytlinks.reverse()} />
+            <SearchAndTable
+                items={ytlinks}
+                searchIndexName="yt"
+                listed={listed}
+                hasMore={hasMore}
+                onLoadMore={loadMore}
+                onLoadAll={loadAll}
+                onLoadItemsAt={loadItemsAt}
+            />
         </div>
     )
 
@@ -0,0 +1,259 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from generate_summaries import GEMINI_MODEL, PROMPT_TEMPLATE, fit_single_call
+from metrics import get_metrics
+from progress_journal import atomic_write_json
+from resilience import get_service
+from summary_cache import cache_dir, get_default_cache, summary_cache_key
+
+# first poll delay; it grows by half each poll up to POLL_MAX_SECONDS
+POLL_SECONDS = float(os.getenv("TECHDEX_BATCH_POLL_SECONDS", "30"))
+POLL_MAX_SECONDS = 300.0
+# give up waiting before the CI job times out; the job keeps running and the
+# next run picks up its results
+MAX_WAIT_SECONDS = float(os.getenv("TECHDEX_BATCH_MAX_WAIT", str(5 * 3600)))
+# inline requests are capped at 20 MB per job; the rest waits for the next job
+MAX_JOB_BYTES = 19_000_000
+
+DONE_STATES = {
+    "JOB_STATE_SUCCEEDED",
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED",
+}
+
+# (item key, title, content)
+Entry = Tuple[str, str, str]
+
+
+class BatchJobPending(Exception):
+    """
+    A submitted job was still running after MAX_WAIT_SECONDS. Its state file
+    is kept, so the next run resumes it instead of submitting a new one.
+    """
+
+
+def job_label(path: str) -> str:
+    """
+    Job label for an index file: its name plus a hash of its absolute path,
+    so every file (even two of the same name) has its own job state
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    digest = hashlib.sha256(os.path.abspath(path).encode("utf-8")).hexdigest()
+    return f"{name}-{digest[:8]}"
+
+
+def job_state_path(label: str) -> str:
+    return os.path.join(cache_dir(), "batch_jobs", f"{label}.json")
+
+
+def _load_state(label: str) -> Optional[Dict]:
+    try:
+        with open(job_state_path(label), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _clear_state(label: str) -> None:
+    try:
+        os.remove(job_state_path(label))
+    except FileNotFoundError:
+        pass
+
+
+def _batch_call(client, method: str, **kwargs):
+    """
+    client.batches.<method>, retried like every other Gemini call and
+    recorded under the "gemini_batch" service
+    """
+
+    def attempt():
+        with get_metrics().track("gemini_batch") as call:
+            job = getattr(client.batches, method)(**kwargs)
+            call.status = 200
+        return job
+
+    return get_service("gemini").call(attempt)
+
+
+def submit_batch_job(client, label: str, entries: List[Entry], content_type: str):
+    """
+    Submit one job with a single-summary request per entry and persist its
+    handle under label
+
+    Returns:
+        The entries that did not fit into this job
+    """
+    requests = []
+    keys = []
+    cache_keys = []
+    size = 0
+    for key, title, content in entries:
+        prompt = PROMPT_TEMPLATE.format(
+            content_type=content_type,
+            content_type_label=content_type.capitalize(),
+            title=title,
+            content=content,
+        )
+        size += len(prompt.encode("utf-8"))
+        if requests and size > MAX_JOB_BYTES:
+            break
+        requests.append(
+            {
+                "contents": [{"parts": [{"text": prompt}], "role": "user"}],
+                "metadata": {"key": key},
+            }
+        )
+        keys.append(key)
+        cache_keys.append(
+            summary_cache_key(
+                content, title, content_type, PROMPT_TEMPLATE, GEMINI_MODEL
+            )
+        )
+
+    job = _batch_call(
+        client,
+        "create",
+        model=GEMINI_MODEL,
+        src=requests,
+        config={"display_name": f"techdex-{label}"},
+    )
+    atomic_write_json(
+        {
+            "name": job.name,
+            "model": GEMINI_MODEL,
+            "content_type": content_type,
+            "submitted_at": time.time(),
+            "keys": keys,
+            "cache_keys": cache_keys,
+        },
+        job_state_path(label),
+        indent=2,
+    )
+    print(f"✓ Submitted batch job {job.name} with {len(requests)} items")
+    return entries[len(requests) :]
+
+
+def wait_for_batch_job(client, label: str, max_wait: Optional[float] = None):
+    """
+    Poll the job persisted under label until it finishes
+
+    Raises:
+        BatchJobPending: The job is still running after max_wait seconds
+            (MAX_WAIT_SECONDS by default)
+    """
+    state = _load_state(label)
+    if max_wait is None:
+        max_wait = MAX_WAIT_SECONDS
+    deadline = time.monotonic() + max_wait
+    delay = POLL_SECONDS
+    while True:
+        job = _batch_call(client, "get", name=state["name"])
+        job_state = getattr(job.state, "value", job.state)
+        if job_state in DONE_STATES:
+            return job
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise BatchJobPending(f"batch job {state['name']} is still {job_state}")
+        print(f"  Batch job {state['name']} {job_state}, polling in {delay:.0f}s")
+        time.sleep(min(delay, remaining))
+        delay = min(POLL_MAX_SECONDS, delay * 1.5)
+
+
+def collect_batch_results(job, label: str) -> Dict[str, str]:
+    """
+    Summaries of a finished job by item key. Every answer also goes into the
+    summary cache, so nothing is lost if applying them fails.
+    """
+    state = _load_state(label)
+    job_state = getattr(job.state, "value", job.state)
+    if job_state != "JOB_STATE_SUCCEEDED":
+        print(f"✗ Batch job {state['name']} ended as {job_state}")
+        return {}
+
+    cache = get_default_cache()
+    cache_keys = dict(zip(state["keys"], state["cache_keys"]))
+    responses = (job.dest.inlined_responses if job.dest else None) or []
+    results: Dict[str, str] = {}
+    failed = 0
+    for position, answer in enumerate(responses):
+        # responses carry the request metadata; fall back to request order
+        key = (answer.metadata or {}).get("key")
+        if key is None and position < len(state["keys"]):
+            key = state["keys"][position]
+        response = answer.response
+        text = (response.text if response and not answer.error else None) or ""
+        if key not in cache_keys or not text.strip():
+            failed += 1
+            continue
+        results[key] = text.strip()
+        get_metrics().incr("summaries_generated")
+        if cache:
+            cache.put(cache_keys[key], results[key])
+    print(f"✓ Batch job {state['name']}: {len(results)} summaries, {failed} failed")
+    return results
+
+
+def resume_batch_job(client, label: str) -> Dict[str, str]:
+    """
+    Results of the job a previous run submitted under label, if any
+
+    Raises:
+        BatchJobPending: The job is still running
+    """
+    if _load_state(label) is None:
+        return {}
+    print(f"Resuming batch job for {label}")
+    results = collect_batch_results(wait_for_batch_job(client, label), label)
+    _clear_state(label)
+    return results
+
+
+def run_batch_job(
+    client, label: str, entries: List[Entry], content_type: str
+) -> Dict[str, str]:
+    """
+    Summarize entries as one Gemini batch job: submit, persist the job
+    handle, poll until it finishes and return the summaries by item key.
+    Entries already in the summary cache are not submitted.
+
+    Raises:
+        BatchJobPending: The job is still running after MAX_WAIT_SECONDS
+    """
+    results = resume_batch_job(client, label)
+    cache = get_default_cache()
+    pending = []
+    for key, title, content in entries:
+        if key in results:
+            continue
+        # same reduction as a direct call, so both share cache entries; a
+        # no-op for content the caller already fitted
+        content = fit_single_call(content, content_type)
+        cached = (
+            cache.get(
+                summary_cache_key(
+                    content, title, content_type, PROMPT_TEMPLATE, GEMINI_MODEL
+                )
+            )
+            if cache
+            else None
+        )
+        if cached:
+            get_metrics().incr("summary_cache_hits")
+            results[key] = cached
+        else:
+            pending.append((key, title, content))
+    if not pending:
+        return results
+
+    left_over = submit_batch_job(client, label, pending, content_type)
+    if left_over:
+        print(f"  {len(left_over)} items did not fit and wait for the next job")
+    results.update(collect_batch_results(wait_for_batch_job(client, label), label))
+    _clear_state(label)
+    return results
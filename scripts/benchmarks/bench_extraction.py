@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Benchmark the readable-text extractor backends on a corpus of saved pages.
+
+Usage:
+    python benchmarks/bench_extraction.py --save 30   # snapshot pages from articles.json
+    python benchmarks/bench_extraction.py            # compare bs4 vs lxml
+
+The corpus is the pages snapshotted with --save (fixtures/saved, not
+committed) if there are any, else the small set of real documentation pages
+committed in fixtures/ (see fixtures/README.md). --synthetic N benchmarks N
+generated pages instead, which mimic blog pages: navigation, cookie banner,
+long article body, sidebar and footer.
+"py heap MB" is the tracemalloc peak per page; it sees Python objects only,
+so memory held inside lxml's C tree is not included.
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from text_extraction import EXTRACTORS, extract_many
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SAVED_DIR = os.path.join(FIXTURE_DIR, "saved")
+ARTICLES_JSON = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..",
+    "..",
+    "frontend",
+    "src",
+    "data",
+    "articles.json",
+)
+
+WORDS = (
+    "latency throughput cache kernel scheduler database index replica consensus "
+    "compiler allocator thread socket buffer queue partition shard vector tensor"
+).split()
+
+
+def save_fixtures(count: int) -> None:
+    """
+    Snapshot the first `count` article pages into SAVED_DIR
+    """
+    from http_client import get_session
+
+    with open(ARTICLES_JSON, "r", encoding="utf-8") as f:
+        articles = json.load(f)
+    os.makedirs(SAVED_DIR, exist_ok=True)
+    saved = 0
+    for article in articles:
+        if saved >= count:
+            break
+        url = article.get("url", "")
+        try:
+            response = get_session().get(url, timeout=15)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"  skip {url}: {e}")
+            continue
+        path = os.path.join(SAVED_DIR, f"{article['id']}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(response.text)
+        saved += 1
+        print(f"  saved {url} ({len(response.text)} bytes)")
+
+
+def _sentence(rng: random.Random, words=WORDS) -> str:
+    return " ".join(rng.choice(words) for _ in range(rng.randint(8, 20))).capitalize()
+
+
+def synthetic_page(rng: random.Random, paragraphs: int, words=WORDS) -> str:
+    nav = "".join(f'<li><a href="/p{i}">Link {i}</a></li>' for i in range(40))
+    body = "".join(
+        f"<h2>{_sentence(rng, words)}</h2>"
+        f"<p>{' '.join(_sentence(rng, words) + '.' for _ in range(6))}</p>"
+        for _ in range(paragraphs)
+    )
+    return (
+        "<html><head><title>Post</title><style>body{color:red}</style>"
+        "<script>var tracking = 1;</script></head><body>"
+        f"<header><nav><ul>{nav}</ul></nav></header>"
+        '<div class="cookie-banner">We use cookies to improve your experience. Accept all?</div>'
+        f"<div class='layout'><article>{body}</article>"
+        f"<aside class='sidebar'><ul>{nav}</ul></aside></div>"
+        f"<footer><p>Copyright. {_sentence(rng)}</p><ul>{nav}</ul></footer>"
+        "</body></html>"
+    )
+
+
+def _read_pages(directory: str):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            pages.append(f.read())
+    return pages
+
+
+def load_corpus(synthetic: int):
+    if not synthetic:
+        for directory in (SAVED_DIR, FIXTURE_DIR):
+            pages = _read_pages(directory)
+            if pages:
+                return pages, f"{len(pages)} saved pages from {directory}"
+        synthetic = 60
+    rng = random.Random(42)
+    pages = [synthetic_page(rng, rng.choice((10, 50, 400))) for _ in range(synthetic)]
+    return pages, f"{len(pages)} synthetic pages"
+
+
+def bench_backend(name: str, pages, workers: int):
+    per_page = []
+    start = time.perf_counter()
+    if workers:
+        texts = extract_many(pages, name, workers)
+    else:
+        texts = []
+        for html in pages:
+            t0 = time.perf_counter()
+            texts.extend(extract_many([html], name))
+            per_page.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    # separate pass: tracemalloc slows allocation-heavy code down a lot
+    peak = 0
+    for html in pages:
+        tracemalloc.start()
+        extract_many([html], name)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return {
+        "backend": name,
+        "total_s": elapsed,
+        "pages_per_s": len(pages) / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(per_page) * 1000 if per_page else None,
+        "p95_ms": (
+            statistics.quantiles(per_page, n=20)[-1] * 1000
+            if len(per_page) >= 2
+            else None
+        ),
+        "peak_mb": peak / 1024 / 1024,
+        "output_chars": sum(len(t) for t in texts),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--save", type=int, default=0, help="snapshot N pages first")
+    parser.add_argument(
+        "--synthetic", type=int, default=0, help="benchmark N generated pages"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=0, help="process pool size (0 = inline)"
+    )
+    args = parser.parse_args()
+
+    if args.save:
+        save_fixtures(args.save)
+
+    pages, description = load_corpus(args.synthetic)
+    input_mb = sum(len(p) for p in pages) / 1024 / 1024
+    print(f"Corpus: {description}, {input_mb:.1f} MB of HTML")
+    print(
+        f"{'backend':<8} {'total s':>8} {'pages/s':>8} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {'py heap MB':>11} {'out chars':>10}"
+    )
+    for name in EXTRACTORS:
+        r = bench_backend(name, pages, args.workers)
+        p50 = f"{r['p50_ms']:.1f}" if r["p50_ms"] is not None else "-"
+        p95 = f"{r['p95_ms']:.1f}" if r["p95_ms"] is not None else "-"
+        print(
+            f"{r['backend']:<8} {r['total_s']:>8.2f} {r['pages_per_s']:>8.1f} "
+            f"{p50:>8} {p95:>8} {r['peak_mb']:>11.1f} {r['output_chars']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
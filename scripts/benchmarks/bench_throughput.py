@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput benchmark against the local fake services.
+
+For every corpus size the fake services (benchmarks/fake_services.py) are
+started in this process and each target runs in a fresh child process,
+pointed at them through the TECHDEX_* endpoint variables:
+    articles       fetch_and_summarize_articles.ensure_article_summaries (pipeline)
+    videos         fetch_youtube.fetch_all_videos
+    transcripts    fetch_yt_transcript.main
+    process_items  generate_summaries.process_items_summaries
+    batch_job      process_items_summaries(batch_job=True): one job that is
+                   submitted, polled and applied, then one that outlives its
+                   wait (BatchJobPending) and is resumed by the next call
+
+Reported per run: items/s, p50/p95 of the upstream calls as seen by the
+fakes (including the simulated latency), non-2xx answers and the child's
+peak RSS. Data files, blobs and caches live in a temporary directory, and the
+summary cache is disabled so every run does the full work.
+
+Usage:
+    python benchmarks/bench_throughput.py
+    python benchmarks/bench_throughput.py --sizes 100 --targets articles,videos
+    python benchmarks/bench_throughput.py --latency-scale 1 --rate-limit 15 --json out.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.dirname(BENCH_DIR)
+sys.path.append(SCRIPTS_DIR)
+from fake_services import FakeServices, env_for, make_server
+
+TARGETS = ("articles", "videos", "transcripts", "process_items", "batch_job")
+DEFAULT_SIZES = (100, 1000, 10000)
+
+
+def _write_json(path: str, data) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def run_target(target: str, size: int, base_url: str, workdir: str) -> dict:
+    """
+    Child side: prepare the corpus, run one target and measure it
+    """
+    # the scripts use paths relative to scripts/, mirror that layout
+    script_dir = os.path.join(workdir, "scripts")
+    data_dir = os.path.join(workdir, "frontend", "src", "data")
+    os.makedirs(script_dir, exist_ok=True)
+    os.chdir(script_dir)
+
+    import generate_summaries
+
+    generate_summaries.BLOB_ROOT = os.path.join(workdir, "frontend", "public")
+
+    if target == "articles":
+        from fetch_and_summarize_articles import ensure_article_summaries
+
+        path = os.path.join(data_dir, "articles.json")
+        _write_json(
+            path,
+            [
+                {
+                    "id": n,
+                    "title": f"Post {n}",
+                    "url": f"{base_url}/pages/{n}",
+                    "addedAt": "01/01/2024",
+                }
+                for n in range(size)
+            ],
+        )
+        run = lambda: ensure_article_summaries(
+            input_file=path, pipeline=True, requests_per_second=1000
+        )
+    elif target == "videos":
+        from fetch_youtube import fetch_all_videos
+
+        run = lambda: fetch_all_videos("fake-key", "PLbench")
+    elif target == "transcripts":
+        import fetch_yt_transcript
+
+        _write_json(
+            os.path.join(data_dir, "yt.json"),
+            [
+                {
+                    "id": f"v{n}",
+                    "title": f"Talk {n}",
+                    "url": f"https://www.youtube.com/watch?v=vid{n:08d}",
+                    "addedAt": "01/01/2024",
+                }
+                for n in range(size)
+            ],
+        )
+        run = fetch_yt_transcript.main
+    elif target in ("process_items", "batch_job"):
+        from fake_services import _item_rng, _text
+        from generate_summaries import process_items_summaries
+
+        items = []
+        for n in range(size):
+            rng = _item_rng("item", n)
+            chars = int(min(rng.lognormvariate(9.5, 1.0), 200_000))
+            items.append(
+                {"id": n, "title": f"Item {n}", "transcript": _text(rng, chars)}
+            )
+        if target == "process_items":
+            run = lambda: process_items_summaries(items, api_key="fake-key")
+        else:
+            run = lambda: _run_batch_jobs(items)
+    else:
+        raise ValueError(f"Unknown target '{target}'")
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - start
+
+    return {
+        "seconds": seconds,
+        # ru_maxrss is in KB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def _run_batch_jobs(items) -> None:
+    """
+    Summarize the first half of items as one batch job, then the second half
+    as a job that is still running when the wait runs out and is picked up
+    by the next call
+
+    Raises:
+        RuntimeError: The job was not left pending, or items ended up
+            without a summary
+    """
+    import batch_jobs
+    from generate_summaries import process_items_summaries
+
+    batch_jobs.POLL_SECONDS = 0.05
+    first, second = items[: len(items) // 2], items[len(items) // 2 :]
+    process_items_summaries(
+        first, api_key="fake-key", batch_job=True, batch_label="bench"
+    )
+
+    max_wait = batch_jobs.MAX_WAIT_SECONDS
+    batch_jobs.MAX_WAIT_SECONDS = 0
+    try:
+        process_items_summaries(
+            second, api_key="fake-key", batch_job=True, batch_label="bench"
+        )
+    finally:
+        batch_jobs.MAX_WAIT_SECONDS = max_wait
+    left = sum(1 for item in second if not item.get("summary"))
+    if second and not left:
+        raise RuntimeError("the second job finished before its wait ran out")
+    process_items_summaries(
+        second, api_key="fake-key", batch_job=True, batch_label="bench"
+    )
+
+    missing = sum(1 for item in items if not item.get("summary"))
+    if missing:
+        raise RuntimeError(f"{missing} of {len(items)} items have no summary")
+
+
+def _percentile(values, pct: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[pct - 1]
+
+
+def bench(target: str, size: int, services: FakeServices, base_url: str) -> dict:
+    """
+    Parent side: run target in a child process and collect the fakes' view
+    """
+    services.reset()
+    with tempfile.TemporaryDirectory(prefix="techdex-bench-") as workdir:
+        env = dict(os.environ)
+        env.update(env_for(base_url))
+        env.update(
+            {
+                "TECHDEX_CACHE_DIR": os.path.join(workdir, "cache"),
+                "TECHDEX_SUMMARY_CACHE": "0",
+                "TECHDEX_REQUEST_DELAY": "0",
+                "TECHDEX_METRICS": "0",
+                "PYTHONPATH": os.pathsep.join([SCRIPTS_DIR, BENCH_DIR]),
+            }
+        )
+        child = subprocess.run(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--run",
+                target,
+                "--sizes",
+                str(size),
+                "--base-url",
+                base_url,
+                "--workdir",
+                workdir,
+            ],
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+    if child.returncode != 0:
+        raise RuntimeError(f"{target} failed:\n{child.stderr[-2000:]}")
+    result = json.loads(child.stdout.strip().splitlines()[-1])
+
+    upstream = {}
+    for service, stats in services.stats().items():
+        seconds = stats["seconds"]
+        upstream[service] = {
+            "calls": len(seconds),
+            "p50_ms": _percentile(seconds, 50) * 1000,
+            "p95_ms": _percentile(seconds, 95) * 1000,
+            "errors": sum(
+                count
+                for status, count in stats["status"].items()
+                if status not in (200, 304)
+            ),
+        }
+    result.update(
+        {
+            "target": target,
+            "size": size,
+            "items_per_s": size / result["seconds"] if result["seconds"] else 0.0,
+            "upstream": upstream,
+        }
+    )
+    return result
+
+
+def print_result(r: dict) -> None:
+    upstream = ", ".join(
+        f"{service} {u['p50_ms']:.0f}/{u['p95_ms']:.0f}"
+        + (f" ({u['errors']} err)" if u["errors"] else "")
+        for service, u in sorted(r["upstream"].items())
+    )
+    print(
+        f"{r['target']:<14} {r['size']:>6} {r['seconds']:>9.2f} "
+        f"{r['items_per_s']:>9.1f} {r['peak_rss_mb']:>8.0f}  {upstream}",
+        flush=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="corpus sizes"
+    )
+    parser.add_argument("--targets", default=",".join(TARGETS))
+    parser.add_argument(
+        "--latency-scale",
+        type=float,
+        default=0.02,
+        help="multiplier on the fakes' realistic latencies (1 = production-like)",
+    )
+    parser.add_argument("--rate-limit", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--json", help="also write the results to this file")
+    # child mode
+    parser.add_argument("--run", choices=TARGETS, help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    if args.run:
+        print(json.dumps(run_target(args.run, sizes[0], args.base_url, args.workdir)))
+        return
+
+    targets = args.targets.split(",")
+    unknown = set(targets) - set(TARGETS)
+    if unknown:
+        parser.error(f"unknown targets {sorted(unknown)}")
+
+    print(
+        f"latency scale {args.latency_scale}, rate limit {args.rate_limit or 'off'}, "
+        f"error rate {args.error_rate}; upstream = p50/p95 ms per service"
+    )
+    print(
+        f"{'target':<14} {'items':>6} {'seconds':>9} {'items/s':>9} "
+        f"{'RSS MB':>8}  upstream"
+    )
+    results = []
+    for size in sizes:
+        services = FakeServices(
+            size, args.latency_scale, args.rate_limit, args.error_rate
+        )
+        server = make_server(services)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            for target in targets:
+                result = bench(target, size, services, base_url)
+                print_result(result)
+                results.append(result)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
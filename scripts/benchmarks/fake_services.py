@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for every external service the scripts talk to.
+
+One threaded HTTP server emulates, under separate path prefixes:
+    /v1beta/models/<model>:generateContent   Gemini (plain and JSON batch mode)
+    /v1beta/models/<model>:batchGenerateContent, /v1beta/batches/<id>
+                                             Gemini batch jobs with inline
+                                             requests, done after
+                                             BATCH_JOB_SECONDS
+    /youtube/v3/playlistItems                YouTube Data API, paged with
+                                             nextPageToken, ETag / 304 support
+    /spreadsheets/d/<id>/export              Google Sheets CSV export
+    /peekalink/                              peekalink title lookup
+    /transcripts/<video_id>                  transcript snippets
+    /pages/<n>                               article pages (ETag / 304 support)
+
+Latency is drawn per request from a log-normal distribution around a
+realistic median for each service (scaled by --latency-scale), payload sizes
+vary per item, and --rate-limit N answers with 429 + Retry-After once a
+service sees more than N requests in a second. --error-rate adds random 503s.
+/_stats returns the observed service times per service, /_reset clears them.
+
+Point the scripts at it with the environment variables printed on start:
+    TECHDEX_GEMINI_BASE_URL, TECHDEX_YOUTUBE_API_URL, TECHDEX_SHEETS_URL,
+    TECHDEX_PEEKALINK_URL, TECHDEX_TRANSCRIPT_URL
+
+Usage:
+    python benchmarks/fake_services.py --items 1000 --port 8765
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import random
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from bench_extraction import _sentence, synthetic_page
+
+# sheet id used by fetch_ctf.py; every other sheet is treated as the link sheet
+CTF_SHEET_ID = "1oIkCgQhaCqfphRslJC5LGQwcZtIWhEvipW9gc2B0nmU"
+
+# (median seconds, log-normal sigma) per service, before --latency-scale
+LATENCY = {
+    "gemini": (0.9, 0.5),
+    "youtube": (0.15, 0.3),
+    "sheets": (0.4, 0.3),
+    "peekalink": (0.35, 0.4),
+    "transcripts": (0.5, 0.4),
+    "pages": (0.25, 0.6),
+    "gemini_batch": (0.2, 0.3),
+}
+# how long a fake batch job runs, before --latency-scale
+BATCH_JOB_SECONDS = 60.0
+PAGE_SIZE_MAX = 50
+BATCH_ITEM_RE = re.compile(r'<item id="([^"]+)">')
+
+# a realistic vocabulary size, so unrelated fake documents do not look alike
+_vocab_rng = random.Random(1)
+VOCAB = [
+    "".join(
+        _vocab_rng.choice("aeioubcdfghklmnprstvz")
+        for _ in range(_vocab_rng.randint(2, 9))
+    )
+    for _ in range(5000)
+]
+
+
+def env_for(base_url: str) -> Dict[str, str]:
+    """
+    Environment variables that point every script at the server at base_url
+    """
+    return {
+        "TECHDEX_GEMINI_BASE_URL": base_url,
+        "TECHDEX_YOUTUBE_API_URL": base_url,
+        "TECHDEX_SHEETS_URL": base_url,
+        "TECHDEX_PEEKALINK_URL": f"{base_url}/peekalink/",
+        "TECHDEX_TRANSCRIPT_URL": f"{base_url}/transcripts",
+        "GEMINI_API_KEY": "fake-key",
+        "YT_API": "fake-key",
+        "PEEKLINK_KEY": "fake-key",
+    }
+
+
+def _item_rng(*parts) -> random.Random:
+    """
+    Deterministic per-item randomness, so an item has the same payload on
+    every request and across runs
+    """
+    digest = hashlib.sha1("/".join(map(str, parts)).encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def _text(rng: random.Random, chars: int) -> str:
+    sentences = []
+    total = 0
+    while total < chars:
+        sentence = _sentence(rng, VOCAB) + "."
+        sentences.append(sentence)
+        total += len(sentence) + 1
+    return " ".join(sentences)
+
+
+class FakeServices:
+    """
+    State shared by all request handlers of one server
+    """
+
+    def __init__(
+        self,
+        items: int = 1000,
+        latency_scale: float = 1.0,
+        rate_limit: int = 0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.items = items
+        self.latency_scale = latency_scale
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent: Dict[str, deque] = defaultdict(deque)
+        self.service_times: Dict[str, list] = defaultdict(list)
+        self.status_counts: Dict[str, Dict[int, int]] = defaultdict(
+            lambda: defaultdict(int)
+        )
+        # batch job id -> {"created", "display_name", "model", "requests"}
+        self.batches: Dict[str, dict] = {}
+
+    def delay(self, service: str) -> float:
+        median, sigma = LATENCY[service]
+        with self._lock:
+            return median * self.latency_scale * self._rng.lognormvariate(0, sigma)
+
+    def admit(self, service: str) -> Optional[int]:
+        """
+        Rate-limit and fault-injection check
+
+        Returns:
+            None to serve the request, otherwise the error status to answer with
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self.error_rate and self._rng.random() < self.error_rate:
+                return 503
+            if not self.rate_limit:
+                return None
+            recent = self._recent[service]
+            while recent and now - recent[0] > 1.0:
+                recent.popleft()
+            if len(recent) >= self.rate_limit:
+                return 429
+            recent.append(now)
+            return None
+
+    def record(self, service: str, seconds: float, status: int) -> None:
+        with self._lock:
+            self.service_times[service].append(seconds)
+            self.status_counts[service][status] += 1
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                service: {
+                    "seconds": list(times),
+                    "status": dict(self.status_counts[service]),
+                }
+                for service, times in self.service_times.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.service_times.clear()
+            self.status_counts.clear()
+            self._recent.clear()
+
+    # payloads
+
+    def video(self, n: int) -> dict:
+        rng = _item_rng("video", n)
+        published = time.gmtime(1_600_000_000 + n * 3600)
+        return {
+            "kind": "youtube#playlistItem",
+            "etag": hashlib.sha1(f"video{n}".encode()).hexdigest()[:27],
+            "id": f"item{n:08d}",
+            "snippet": {
+                "publishedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", published),
+                "title": f"Fake talk {n}: {_sentence(rng)}",
+                "description": _text(rng, rng.randint(200, 2000)),
+                "position": n,
+                "resourceId": {"kind": "youtube#video", "videoId": f"vid{n:08d}"},
+            },
+        }
+
+    def transcript(self, video_id: str) -> list:
+        rng = _item_rng("transcript", video_id)
+        # most talks are 10-60 minutes, a few are several hours
+        chars = int(min(rng.lognormvariate(10.4, 0.7), 400_000))
+        text = _text(rng, chars)
+        snippets = []
+        for i, start in enumerate(range(0, len(text), 80)):
+            snippets.append(
+                {"text": text[start : start + 80], "start": i * 4.0, "duration": 4.0}
+            )
+        return snippets
+
+    def page(self, n: int) -> str:
+        rng = _item_rng("page", n)
+        return synthetic_page(rng, rng.choice((10, 30, 60, 150, 400)), VOCAB)
+
+    def summary(self, prompt: str) -> str:
+        rng = _item_rng("summary", hashlib.sha1(prompt.encode()).hexdigest())
+        return _text(rng, rng.randint(800, 2500))
+
+    def link_sheet(self) -> str:
+        out = io.StringIO()
+        writer = csv.writer(out)
+        for n in range(self.items):
+            writer.writerow([f"https://example.com/posts/{n}"])
+        return out.getvalue()
+
+    def ctf_sheet(self) -> str:
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(["category", "name", "difficulty", "link"])
+        categories = ("web", "pwn", "crypto", "forensics", "reversing")
+        for n in range(self.items):
+            writer.writerow(
+                [
+                    categories[n % len(categories)],
+                    f"challenge {n}",
+                    ("easy", "medium", "hard")[n % 3],
+                    f"https://ctf.example.com/{n}",
+                ]
+            )
+        return out.getvalue()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    services: FakeServices  # set by make_server
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(
+        self,
+        status: int,
+        body: bytes = b"",
+        content_type: str = "application/json",
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _json(self, status: int, data, headers=None) -> None:
+        self._send(status, json.dumps(data).encode("utf-8"), headers=headers)
+
+    def _route(self) -> Tuple[Optional[str], Optional[Callable[[], int]]]:
+        path = urlparse(self.path).path
+        if self.command == "POST" and ":generateContent" in path:
+            return "gemini", self._gemini
+        if self.command == "POST" and ":batchGenerateContent" in path:
+            return "gemini_batch", self._batch_create
+        if path.startswith("/v1beta/batches/"):
+            return "gemini_batch", self._batch_get
+        if self.command == "POST" and path.startswith("/peekalink"):
+            return "peekalink", self._peekalink
+        if path == "/youtube/v3/playlistItems":
+            return "youtube", self._playlist_items
+        if path.startswith("/spreadsheets/d/"):
+            return "sheets", self._sheet
+        if path.startswith("/transcripts/"):
+            return "transcripts", self._transcript
+        if path.startswith("/pages/"):
+            return "pages", self._page
+        return None, None
+
+    def _handle(self) -> None:
+        path = urlparse(self.path).path
+        if path == "/_stats":
+            return self._json(200, self.services.stats())
+        if path == "/_reset":
+            self.services.reset()
+            return self._json(200, {})
+
+        length = int(self.headers.get("Content-Length") or 0)
+        self.body = self.rfile.read(length) if length else b""
+
+        service, handler = self._route()
+        if handler is None:
+            return self._json(404, {"error": f"no fake for {self.command} {path}"})
+
+        start = time.perf_counter()
+        time.sleep(self.services.delay(service))
+        status = self.services.admit(service)
+        if status == 429:
+            self._json(
+                429,
+                {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}},
+                headers={"Retry-After": "1"},
+            )
+        elif status:
+            self._json(status, {"error": {"code": status, "status": "UNAVAILABLE"}})
+        else:
+            status = handler() or 200
+        self.services.record(service, time.perf_counter() - start, status)
+
+    do_GET = _handle
+    do_POST = _handle
+
+    # services
+
+    def _gemini(self) -> int:
+        self._json(200, self._generate(json.loads(self.body or b"{}")))
+        return 200
+
+    def _generate(self, request: dict) -> dict:
+        prompt = "".join(
+            part.get("text", "")
+            for content in request.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        config = request.get("generationConfig") or {}
+        if config.get("responseMimeType") == "application/json":
+            text = json.dumps(
+                {
+                    label: self.services.summary(prompt + label)[:600]
+                    for label in BATCH_ITEM_RE.findall(prompt)
+                }
+            )
+        else:
+            text = self.services.summary(prompt)
+        return {
+            "candidates": [
+                {
+                    "content": {"parts": [{"text": text}], "role": "model"},
+                    "finishReason": "STOP",
+                    "index": 0,
+                }
+            ],
+            "usageMetadata": {
+                "promptTokenCount": len(prompt) // 4,
+                "candidatesTokenCount": len(text) // 4,
+                "totalTokenCount": (len(prompt) + len(text)) // 4,
+            },
+            "modelVersion": "gemini-2.0-flash",
+        }
+
+    def _batch_create(self) -> int:
+        batch = json.loads(self.body or b"{}").get("batch", {})
+        job = {
+            "created": time.time(),
+            "display_name": batch.get("displayName", ""),
+            "model": urlparse(self.path).path.split("/")[-1].split(":")[0],
+            "requests": batch.get("inputConfig", {})
+            .get("requests", {})
+            .get("requests", []),
+        }
+        job_id = hashlib.sha1(f"{job['created']}{id(job)}".encode()).hexdigest()[:12]
+        with self.services._lock:
+            self.services.batches[job_id] = job
+        self._json(200, self._batch_operation(job_id, job))
+        return 200
+
+    def _batch_get(self) -> int:
+        job_id = urlparse(self.path).path.rsplit("/", 1)[-1]
+        job = self.services.batches.get(job_id)
+        if job is None:
+            self._json(404, {"error": {"code": 404, "status": "NOT_FOUND"}})
+            return 404
+        self._json(200, self._batch_operation(job_id, job))
+        return 200
+
+    def _batch_operation(self, job_id: str, job: dict) -> dict:
+        run_seconds = BATCH_JOB_SECONDS * self.services.latency_scale
+        done = time.time() - job["created"] >= run_seconds
+        metadata = {
+            "@type": "type.googleapis.com/google.ai.generativelanguage.v1main.GenerateContentBatch",
+            "model": f"models/{job['model']}",
+            "displayName": job["display_name"],
+            "state": "BATCH_STATE_SUCCEEDED" if done else "BATCH_STATE_RUNNING",
+        }
+        if done:
+            metadata["output"] = {
+                "inlinedResponses": {
+                    "inlinedResponses": [
+                        {
+                            "response": self._generate(entry.get("request", {})),
+                            "metadata": entry.get("metadata", {}),
+                        }
+                        for entry in job["requests"]
+                    ]
+                }
+            }
+        return {"name": f"batches/{job_id}", "metadata": metadata, "done": done}
+
+    def _playlist_items(self) -> int:
+        query = parse_qs(urlparse(self.path).query)
+        page_size = min(int(query.get("maxResults", ["5"])[0]), PAGE_SIZE_MAX)
+        token = query.get("pageToken", [""])[0]
+        offset = int(token[1:]) if token.startswith("p") else 0
+        end = min(offset + page_size, self.services.items)
+
+        etag = f'"{self.services.items}-{offset}-{end}"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, headers={"ETag": etag})
+            return 304
+
+        data = {
+            "kind": "youtube#playlistItemListResponse",
+            "etag": etag,
+            "items": [self.services.video(n) for n in range(offset, end)],
+            "pageInfo": {
+                "totalResults": self.services.items,
+                "resultsPerPage": page_size,
+            },
+        }
+        if end < self.services.items:
+            data["nextPageToken"] = f"p{end}"
+        self._json(200, data, headers={"ETag": etag})
+        return 200
+
+    def _sheet(self) -> int:
+        sheet_id = urlparse(self.path).path.split("/")[3]
+        body = (
+            self.services.ctf_sheet()
+            if sheet_id == CTF_SHEET_ID
+            else self.services.link_sheet()
+        )
+        self._send(200, body.encode("utf-8"), "text/csv")
+        return 200
+
+    def _peekalink(self) -> int:
+        link = json.loads(self.body or b"{}").get("link", "")
+        rng = _item_rng("title", link)
+        self._json(200, {"url": link, "title": _sentence(rng), "type": "HTML"})
+        return 200
+
+    def _transcript(self) -> int:
+        video_id = urlparse(self.path).path.rsplit("/", 1)[-1]
+        self._json(200, self.services.transcript(video_id))
+        return 200
+
+    def _page(self) -> int:
+        try:
+            n = int(urlparse(self.path).path.rsplit("/", 1)[-1])
+        except ValueError:
+            self._json(404, {})
+            return 404
+        etag = f'"page-{n}"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, headers={"ETag": etag})
+            return 304
+        self._send(
+            200,
+            self.services.page(n).encode("utf-8"),
+            "text/html; charset=utf-8",
+            {"ETag": etag},
+        )
+        return 200
+
+
+def make_server(services: FakeServices, port: int = 0) -> ThreadingHTTPServer:
+    """
+    Bind a server for services on 127.0.0.1 (port 0 picks a free port)
+    """
+    handler = type("BoundHandler", (Handler,), {"services": services})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--items", type=int, default=1000, help="corpus size")
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument(
+        "--rate-limit", type=int, default=0, help="requests/s per service (0 = off)"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    services = FakeServices(
+        args.items, args.latency_scale, args.rate_limit, args.error_rate, args.seed
+    )
+    server = make_server(services, args.port)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    for name, value in env_for(base_url).items():
+        print(f"export {name}={value}")
+    print(f"Serving {args.items} items on {base_url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Split data files into small, precompressed pages so the frontend does not
+bundle (or download up front) every item of articles.json and yt.json.
+
+For every data file a manifest is written to frontend/public/pages/<name>.json
+and the pages to frontend/public/pages/<name>/<n>.<hash>.json, each with a
+.json.gz variant next to it, which is what the frontend fetches (and inflates
+itself, like the summary blobs). Page names carry a hash of their content, so
+they can be cached forever; only the manifest is revalidated.
+
+Page n holds items [n * PAGE_SIZE, (n + 1) * PAGE_SIZE) of the data file, so
+appending items only changes the last page and every full page keeps its
+name (and stays in the browser's cache) from one run to the next. The
+manifest lists the pages newest first and every page holds its items newest
+first, which is the order the frontend shows them in.
+
+Manifest format:
+    {
+      "v": 1,
+      "total": <item count>,
+      "pageSize": PAGE_SIZE,
+      "pages": [{"path": "pages/<name>/<n>.<hash>.json", "count": <items>}, ...]
+    }
+Page paths are relative to the site root, like blob paths.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+from typing import Any, Dict, Iterable, Iterator, List
+
+from build_search_index import DATA_DIR
+from generate_summaries import BLOB_ROOT, load_index_file
+from progress_journal import atomic_write_json
+
+PAGES_DIR = os.path.join(BLOB_ROOT, "pages")
+PAGED_FILES = ("articles", "yt")
+PAGE_SIZE = 100
+# fields the list views need; summaries are already previews in the data files
+PAGE_FIELDS = ("id", "title", "url", "addedAt", "summary", "summaryBlob")
+HASH_CHARS = 10
+
+
+def _blocks(items: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict]]:
+    block = []
+    for item in items:
+        block.append({field: item[field] for field in PAGE_FIELDS if field in item})
+        if len(block) == size:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+def _write_once(path: str, data: bytes) -> bool:
+    """
+    Write a content-addressed file; one that exists already holds these bytes
+
+    Returns:
+        bool: True if the file was written
+    """
+    if os.path.exists(path):
+        return False
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def write_page(name: str, number: int, items: List[Dict[str, Any]]) -> str:
+    """
+    Write one page and its gzip variant
+
+    Returns:
+        str: Page path relative to the site root
+    """
+    data = json.dumps(items, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()[:HASH_CHARS]
+    rel_path = f"pages/{name}/{number}.{digest}.json"
+    path = os.path.join(BLOB_ROOT, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _write_once(path, data)
+    # deterministic (mtime=0) like the summary blobs
+    _write_once(f"{path}.gz", gzip.compress(data, compresslevel=9, mtime=0))
+    return rel_path
+
+
+def _prune(name: str, keep: Iterable[str]) -> int:
+    """
+    Remove pages (and their variants) the manifest no longer lists
+    """
+    directory = os.path.join(PAGES_DIR, name)
+    kept = {os.path.basename(path) for path in keep}
+    removed = 0
+    for file_name in os.listdir(directory):
+        if file_name.split(".json")[0] + ".json" not in kept:
+            os.remove(os.path.join(directory, file_name))
+            removed += 1
+    return removed
+
+
+def write_pages(name: str, items: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Write the pages and manifest of one data file
+
+    Args:
+        name: Data file name, e.g. "articles"
+        items: Items in data-file order, in their index form (previews and
+            blob references rather than full summaries)
+
+    Returns:
+        dict: The manifest
+    """
+    os.makedirs(os.path.join(PAGES_DIR, name), exist_ok=True)
+    pages = []
+    total = 0
+    for number, block in enumerate(_blocks(items, PAGE_SIZE)):
+        block.reverse()
+        pages.append({"path": write_page(name, number, block), "count": len(block)})
+        total += len(block)
+    pages.reverse()
+
+    manifest = {"v": 1, "total": total, "pageSize": PAGE_SIZE, "pages": pages}
+    manifest_path = os.path.join(PAGES_DIR, f"{name}.json")
+    atomic_write_json(manifest, manifest_path, separators=(",", ":"))
+    removed = _prune(name, [page["path"] for page in pages])
+    first_kb = 0.0
+    if pages:
+        first_kb = os.path.getsize(os.path.join(BLOB_ROOT, pages[0]["path"] + ".gz"))
+        first_kb /= 1024
+    print(
+        f"✓ {name}: {total} items in {len(pages)} pages, first page "
+        f"{first_kb:.1f} KB gzipped, {removed} stale files removed"
+    )
+    return manifest
+
+
+def build_for_file(name: str) -> bool:
+    # streamed: only one page of items is held at a time
+    items = load_index_file(os.path.join(DATA_DIR, f"{name}.json"), stream=True)
+    if items is None:
+        return False
+    write_pages(name, items)
+    return True
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or PAGED_FILES
+    ok = all([build_for_file(name) for name in names])
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Build compact inverted search indexes for the frontend's SearchAndTable view.
+
+For every data file an index over title, url and the full summary is written
+to frontend/public/search/<name>.json. The frontend loads it lazily and answers
+queries with binary-searched prefix lookups instead of scanning every item.
+
+Format:
+    {
+      "v": 2,
+      "ids": [item ids in data-file order],
+      "terms": "<sorted unique terms, front-coded>",
+      "postings": "<one postings list per term, separated by spaces>"
+    }
+Terms are front-coded: every term is written as one letter, A plus the
+number of leading characters it shares with the term before it, followed by
+the rest of the term. A postings list is a run of (doc delta, weight)
+numbers written as base-32 varints (see encode_number); doc numbers are
+delta-encoded and weights are the field-weighted term frequency (title > url
+> summary), capped at MAX_WEIGHT. Terms are lightly stemmed (plural s) and
+ids and hashes are left out, see tokenize and is_noise.
+"""
+
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from progress_journal import atomic_write_json
+from record_store import RecordStore
+
+DATA_DIR = os.path.normpath(
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "frontend", "src", "data"
+    )
+)
+OUTPUT_DIR = os.path.normpath(
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "frontend", "public", "search"
+    )
+)
+INDEXED_FILES = ("articles", "yt", "papers", "ppl", "blogs")
+
+FIELD_WEIGHTS = {"title": 3, "url": 2, "summary": 1}
+# tokens that carry no signal in urls
+URL_STOPWORDS = {"http", "https", "www", "com", "org", "io", "html", "watch"}
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+MAX_TERM_LEN = 32
+# video ids, commit hashes and long numbers; nobody searches for these
+NOISE_RE = re.compile(r"\d{5,}|(?=(?:[a-z]*\d){3})(?=[a-z0-9]*[a-z])[a-z0-9]{8,}")
+
+INDEX_VERSION = 2
+# varint digits: the last 5-bit group of a number comes from TERMINAL, the
+# ones before it from CONTINUATION; both must match src/lib/search.ts
+TERMINAL = "0123456789abcdefghijklmnopqrstuv"
+CONTINUATION = "ABCDEFGHIJKLMNOPQRSTUVWXYZwxyz-_"
+MAX_WEIGHT = len(TERMINAL) - 1
+# shared prefix lengths are written as a single letter A-Z
+MAX_SHARED = 25
+
+
+def stem(token: str) -> str:
+    """
+    Strip a plural s, so "caches" and "cache" are one term
+    """
+    if len(token) > 3 and token[-1] == "s" and token[-2:] not in ("ss", "us", "is"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase, stemmed alphanumeric tokens; must match tokenize() in
+    src/lib/search.ts
+    """
+    return [stem(t[:MAX_TERM_LEN]) for t in TOKEN_RE.findall(text.lower())]
+
+
+def is_noise(token: str) -> bool:
+    return NOISE_RE.fullmatch(token) is not None
+
+
+def encode_number(n: int) -> str:
+    """
+    Base-32 varint, most significant group first; one character below 32
+    """
+    digits = [TERMINAL[n & 31]]
+    n >>= 5
+    while n:
+        digits.append(CONTINUATION[n & 31])
+        n >>= 5
+    return "".join(reversed(digits))
+
+
+def front_code(terms: List[str]) -> str:
+    coded = []
+    previous = ""
+    for term in terms:
+        shared = 0
+        limit = min(len(term), len(previous), MAX_SHARED)
+        while shared < limit and term[shared] == previous[shared]:
+            shared += 1
+        coded.append(chr(ord("A") + shared) + term[shared:])
+        previous = term
+    return "".join(coded)
+
+
+def build_index(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+    for doc, item in enumerate(items):
+        for field, weight in FIELD_WEIGHTS.items():
+            tokens = tokenize(str(item.get(field) or ""))
+            for token in tokens:
+                if is_noise(token) or (field == "url" and token in URL_STOPWORDS):
+                    continue
+                postings[token][doc] = postings[token].get(doc, 0) + weight
+
+    terms = sorted(postings)
+    encoded = []
+    for term in terms:
+        numbers = []
+        previous = 0
+        for doc in sorted(postings[term]):
+            numbers.append(encode_number(doc - previous))
+            numbers.append(encode_number(min(postings[term][doc], MAX_WEIGHT)))
+            previous = doc
+        encoded.append("".join(numbers))
+
+    return {
+        "v": INDEX_VERSION,
+        "ids": [item.get("id") for item in items],
+        "terms": front_code(terms),
+        "postings": " ".join(encoded),
+    }
+
+
+def write_index(name: str, items: List[Dict[str, Any]]) -> None:
+    """
+    Build and write the index for items whose summaries are hydrated
+    """
+    index = build_index(items)
+    out_path = os.path.join(OUTPUT_DIR, f"{name}.json")
+    atomic_write_json(index, out_path, separators=(",", ":"), ensure_ascii=False)
+    terms = index["postings"].count(" ") + 1 if index["postings"] else 0
+    print(
+        f"✓ {name}: {len(items)} items, {terms} terms, "
+        f"{os.path.getsize(out_path) / 1024:.1f} KB -> {out_path}"
+    )
+
+
+def build_for_file(name: str) -> bool:
+    store = RecordStore.load(
+        os.path.join(DATA_DIR, f"{name}.json"), hydrate=("summary",)
+    )
+    if store is None:
+        return False
+    write_index(name, store.items)
+    return True
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or INDEXED_FILES
+    ok = all([build_for_file(name) for name in names])
+    sys.exit(0 if ok else 1)
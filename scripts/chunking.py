@@ -0,0 +1,87 @@
+import re
+from typing import List
+
+# rough average for English text with Gemini's tokenizer
+CHARS_PER_TOKEN = 4
+
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])")
+# "[12:34]" / "[1:02:03]" markers at the start of a transcript segment, see
+# Transcript.timestamped_text
+TIMESTAMP_RE = re.compile(r"(?=\[\d{1,2}:\d{2}(?::\d{2})?\])")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate, good enough for budgeting prompts
+    """
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def timestamp_marker(seconds: float) -> str:
+    """
+    "[mm:ss]" (or "[h:mm:ss]") marker for a playback time
+    """
+    hours, rest = divmod(int(seconds), 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"[{hours}:{minutes:02d}:{seconds:02d}]"
+    return f"[{minutes:02d}:{seconds:02d}]"
+
+
+def _split_units(text: str) -> List[str]:
+    """
+    Split text into the smallest units we are willing to cut between:
+    timestamped segments when present, sentences otherwise.
+    """
+    if TIMESTAMP_RE.search(text):
+        units = TIMESTAMP_RE.split(text)
+    else:
+        units = SENTENCE_RE.split(text)
+    return [u.strip() for u in units if u.strip()]
+
+
+def _split_oversized(unit: str, max_chars: int) -> List[str]:
+    """
+    Break a unit that alone exceeds the budget on whitespace, falling back to
+    a hard cut for text without spaces.
+    """
+    pieces = []
+    while len(unit) > max_chars:
+        cut = unit.rfind(" ", 0, max_chars)
+        if cut <= max_chars // 2:
+            cut = max_chars
+        pieces.append(unit[:cut].strip())
+        unit = unit[cut:].strip()
+    if unit:
+        pieces.append(unit)
+    return pieces
+
+
+def split_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """
+    Split text into chunks of at most max_tokens (estimated), cutting only on
+    timestamp or sentence boundaries unless a single unit is too large
+
+    Args:
+        text: Transcript or page text
+        max_tokens: Token budget per chunk
+
+    Returns:
+        List of chunks in document order
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks: List[str] = []
+    current: List[str] = []
+    current_len = 0
+
+    for unit in _split_units(text):
+        for piece in _split_oversized(unit, max_chars):
+            if current and current_len + len(piece) + 1 > max_chars:
+                chunks.append(" ".join(current))
+                current, current_len = [], 0
+            current.append(piece)
+            current_len += len(piece) + 1
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
@@ -0,0 +1,209 @@
+import os
+import re
+from typing import Dict, List
+
+import numpy as np
+from scipy import sparse
+
+from chunking import CHARS_PER_TOKEN, _split_units, estimate_tokens
+from metrics import get_metrics
+
+# content a little over the single-call limit is reduced to fit it, as long as
+# that keeps at least this share of it; longer content is summarized
+# map-reduce style instead (see generate_summaries.py)
+MIN_KEPT_SHARE = float(os.getenv("TECHDEX_COMPRESS_MIN_KEPT", "0.5"))
+# last resort when map-reduce fails: the most central sentences within this
+# many tokens are summarized in one call; 0 turns the fallback off
+COMPRESS_TOKENS = int(os.getenv("TECHDEX_COMPRESS_TOKENS", "6000"))
+# auto-generated captions have no punctuation; cut them into word windows
+MAX_UNIT_CHARS = 600
+WINDOW_WORDS = 40
+# comparing sentences is quadratic in their count; merge neighbours above this
+MAX_UNITS = 4000
+# the similarity graph keeps each sentence's closest neighbours only, and is
+# computed this many rows at a time
+TOP_NEIGHBOURS = 50
+SIMILARITY_BLOCK = 256
+# sentences this similar to one already kept are repeats
+DUPLICATE_SIMILARITY = 0.85
+DAMPING = 0.85
+ITERATIONS = 50
+
+STOPWORDS = set(
+    "a an and are as at be but by can do for from has have how in is it its "
+    "of on or so than that the their then there these this to was we were "
+    "what when which who will with you your".split()
+)
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+# spoken filler as it appears in captions; only applied to transcripts
+FILLER_RE = re.compile(
+    r"\[(?i:music|applause|laughter|inaudible)\]"
+    r"|\b(?:um+|uh+|erm|hmm+)\b,?"
+    r"|(?:,\s*)?\b(?:you know|i mean),"
+)
+# "I think I think": a phrase of two to four words said again. Single words
+# are left alone, "had had", "that that" and "Walla Walla" are real text.
+REPEAT_RE = re.compile(r"\b(\w+(?:\s+\w+){1,3})(?:\s+\1\b)+", re.IGNORECASE)
+TRANSCRIPT_TYPES = ("transcript", "podcast")
+SPACES_RE = re.compile(r"[ \t]{2,}")
+
+
+def remove_filler(text: str) -> str:
+    """
+    Drop spoken filler, caption noise and immediately repeated phrases from
+    a transcript
+    """
+    text = FILLER_RE.sub("", text)
+    text = REPEAT_RE.sub(r"\1", text)
+    return SPACES_RE.sub(" ", text).strip()
+
+
+def split_sentences(text: str) -> List[str]:
+    units = []
+    for unit in _split_units(text):
+        if len(unit) <= MAX_UNIT_CHARS:
+            units.append(unit)
+            continue
+        words = unit.split()
+        units.extend(
+            " ".join(words[i : i + WINDOW_WORDS])
+            for i in range(0, len(words), WINDOW_WORDS)
+        )
+    while len(units) > MAX_UNITS:
+        units = [" ".join(units[i : i + 2]) for i in range(0, len(units), 2)]
+    return units
+
+
+def _similarity(sentences: List[str]) -> sparse.csr_matrix:
+    """
+    Cosine similarity of the sentences' tf-idf vectors, sparse, with each
+    sentence linked to at most TOP_NEIGHBOURS others (and to none of its own)
+    """
+    vocabulary: Dict[str, int] = {}
+    rows, columns = [], []
+    for row, sentence in enumerate(sentences):
+        for token in TOKEN_RE.findall(sentence.lower()):
+            if len(token) > 1 and token not in STOPWORDS:
+                rows.append(row)
+                columns.append(vocabulary.setdefault(token, len(vocabulary)))
+    n = len(sentences)
+    tf = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, columns)),
+        shape=(n, max(1, len(vocabulary))),
+    )
+    tf.data = 1 + np.log(tf.data)
+    df = np.bincount(tf.indices, minlength=tf.shape[1])
+    idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+    weighted = sparse.csr_matrix(tf @ sparse.diags(idf))
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1))).ravel()
+    norms[norms == 0] = 1
+    weighted = sparse.csr_matrix(sparse.diags(1 / norms) @ weighted)
+
+    # a block of rows at a time, so only SIMILARITY_BLOCK x n is ever dense
+    k = min(TOP_NEIGHBOURS, n - 1)
+    top_rows, top_columns, top_values = [], [], []
+    transposed = weighted.T.tocsc()
+    for start in range(0, n, SIMILARITY_BLOCK):
+        block = (weighted[start : start + SIMILARITY_BLOCK] @ transposed).toarray()
+        block[np.arange(len(block)), np.arange(start, start + len(block))] = 0
+        neighbours = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        values = np.take_along_axis(block, neighbours, axis=1)
+        top_rows.append(np.repeat(np.arange(start, start + len(block)), k))
+        top_columns.append(neighbours.ravel())
+        top_values.append(values.ravel())
+    similarity = sparse.csr_matrix(
+        (
+            np.concatenate(top_values),
+            (np.concatenate(top_rows), np.concatenate(top_columns)),
+        ),
+        shape=(n, n),
+    )
+    similarity.eliminate_zeros()
+    # j among the neighbours of i makes i one of j's
+    return sparse.csr_matrix(similarity.maximum(similarity.T))
+
+
+def textrank(similarity: sparse.csr_matrix) -> np.ndarray:
+    """
+    PageRank over the sentence similarity graph; central sentences, the ones
+    much of the text agrees with, score highest
+    """
+    n = similarity.shape[0]
+    totals = np.asarray(similarity.sum(axis=1)).ravel()
+    linked = totals > 0
+    transition = sparse.csr_matrix(
+        sparse.diags(np.where(linked, 1 / np.where(linked, totals, 1), 0)) @ similarity
+    ).T.tocsr()
+    scores = np.full(n, 1 / n)
+    for _ in range(ITERATIONS):
+        # a sentence sharing no words with any other links to all of them
+        spread = scores[~linked].sum() / n
+        updated = (1 - DAMPING) / n + DAMPING * (transition @ scores + spread)
+        if np.abs(updated - scores).sum() < 1e-6:
+            return updated
+        scores = updated
+    return scores
+
+
+def compress_text(text: str, max_tokens: int, spoken: bool = False) -> str:
+    """
+    Reduce text to its highest-ranked sentences within max_tokens
+
+    Text within the budget is returned untouched. Otherwise filler is removed
+    from spoken text first, and if that is not enough, sentences are ranked
+    with TextRank, repeats of a sentence already kept are skipped, and the
+    kept sentences are joined in their original order.
+    """
+    if max_tokens <= 0 or estimate_tokens(text) <= max_tokens:
+        return text
+    if spoken:
+        text = remove_filler(text)
+        if estimate_tokens(text) <= max_tokens:
+            return text
+    sentences = split_sentences(text)
+    if len(sentences) < 2:
+        return text
+
+    similarity = _similarity(sentences)
+    scores = textrank(similarity)
+    budget = max_tokens * CHARS_PER_TOKEN
+    kept: List[int] = []
+    is_kept = np.zeros(len(sentences), dtype=bool)
+    used = 0
+    for i in np.argsort(-scores, kind="stable"):
+        if used + len(sentences[i]) + 1 > budget:
+            continue
+        row = slice(similarity.indptr[i], similarity.indptr[i + 1])
+        close = similarity.indices[row][similarity.data[row] >= DUPLICATE_SIMILARITY]
+        if is_kept[close].any():
+            continue
+        kept.append(i)
+        is_kept[i] = True
+        used += len(sentences[i]) + 1
+    return " ".join(sentences[i] for i in sorted(kept))
+
+
+def compress_for_prompt(
+    content: str, content_type: str, max_tokens: int, min_kept: float = 0.0
+) -> str:
+    """
+    compress_text, reporting the ratio per item and in the run metrics.
+    Content within the budget is returned as is and not counted, so calling
+    this again on compressed content is free. So is content the budget would
+    keep less than min_kept of.
+    """
+    before = estimate_tokens(content)
+    if max_tokens <= 0 or before <= max_tokens or max_tokens < before * min_kept:
+        return content
+    spoken = any(kind in content_type.lower() for kind in TRANSCRIPT_TYPES)
+    compressed = compress_text(content, max_tokens, spoken)
+    after = estimate_tokens(compressed)
+    metrics = get_metrics()
+    metrics.incr("compression_tokens_in", before)
+    metrics.incr("compression_tokens_out", after)
+    if after < before:
+        print(
+            f"  Compressed {content_type} from ~{before} to ~{after} tokens "
+            f"({after / before:.0%})"
+        )
+    return compressed
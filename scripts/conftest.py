@@ -0,0 +1,16 @@
+import os
+
+import pytest
+
+# no run reports from the tests
+os.environ["TECHDEX_METRICS"] = "0"
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """
+    Every test gets its own empty cache directory
+    """
+    monkeypatch.setenv("TECHDEX_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("TECHDEX_REQUEST_DELAY", "0")
+    return tmp_path / "cache"
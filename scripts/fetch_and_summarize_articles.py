@@ -1,49 +1,437 @@
+import argparse
 import os
 import sys
-import time
-
-import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
 
 sys.path.append(os.path.dirname(__file__))
+from batch_jobs import BatchJobPending, resume_batch_job, run_batch_job
+from chunking import estimate_tokens
 from generate_summaries import (
+    MAX_SINGLE_CALL_TOKENS,
+    fit_single_call,
     generate_summary_with_gemini,
-    load_json_file,
-    save_json_file,
     setup_gemini_api,
 )
+from http_client import fetch_html, get_page_cache
+from near_duplicates import (
+    get_default_index,
+    index_texts,
+    near_duplicate_keys,
+    reuse_duplicate_summary,
+    share_summary,
+    summary_fields,
+    unindexed_items,
+)
+from progress_journal import (
+    ProgressJournal,
+    default_journal_path,
+    item_key,
+    resume_from_journal,
+)
+from rate_limiter import TokenBucket
+from record_store import RecordStore
+from summary_cache import get_default_cache
+from text_extraction import EXTRACTORS, extract_text
+
+# batch_jobs label for article jobs
+BATCH_LABEL = "articles"
+DEFAULT_EXTRACTOR = os.getenv("TECHDEX_EXTRACTOR") or (
+    "lxml" if "lxml" in EXTRACTORS else "bs4"
+)
 
 
-def extract_readable_text_from_url(url: str) -> str:
+def extract_readable_text_from_url(
+    url: str,
+    extractor: Optional[str] = None,
+    parse_pool: Optional[ProcessPoolExecutor] = None,
+) -> str:
     """
-    Fetch the HTML content from the URL and extract readable text using BeautifulSoup.
+    Fetch the HTML content from the URL and extract readable text.
+    Pages go through the shared pooled session and are revalidated against the
+    on-disk page cache; unchanged pages reuse their cached extracted text.
+
+    Args:
+        url: Page URL
+        extractor: Extractor backend name (see text_extraction.EXTRACTORS)
+        parse_pool: Optional process pool to run the CPU-heavy parsing in
     """
     try:
-        response = requests.get(url, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        # Remove script and style elements
-        for tag in soup(["script", "style", "noscript"]):
-            tag.decompose()
-        # Try to get main content if possible
-        main = soup.find("main")
-        if main:
-            text = main.get_text(separator=" ", strip=True)
+        extractor = extractor or DEFAULT_EXTRACTOR
+        html, from_cache = fetch_html(url, timeout=15)
+        cache = get_page_cache()
+        if from_cache:
+            cached_text = cache.text(url, extractor)
+            # empty text is extracted again rather than trusted
+            if cached_text:
+                return cached_text
+        if parse_pool:
+            text = parse_pool.submit(extract_text, html, extractor).result()
         else:
-            text = soup.get_text(separator=" ", strip=True)
+            text = extract_text(html, extractor)
+        cache.store_text(url, text, extractor)
         return text
     except Exception as e:
         print(f"  Error fetching/extracting from {url}: {e}")
         return ""
 
 
+def _summarize_article(
+    client,
+    article: dict,
+    text: str,
+    limiter: TokenBucket,
+    journal: ProgressJournal,
+    items_by_key: Optional[Dict[str, dict]] = None,
+) -> Optional[bool]:
+    """
+    Summarize already-extracted text and store the result on the article.
+    With items_by_key, near-duplicates of an already summarized article reuse
+    its summary instead of calling Gemini.
+
+    Returns:
+        True if a summary was generated or reused, False if summarizing
+        failed, None if there was no text to summarize
+    """
+    title = article.get("title", "Untitled")
+    if not text:
+        print(f"  No readable text extracted for {title}, skipping.")
+        article["summary"] = ""
+        return None
+    print(f"  Extracted {len(text)} characters from {article.get('url')}")
+    if items_by_key is not None and reuse_duplicate_summary(
+        article, text, "articles", items_by_key
+    ):
+        journal.record(item_key(article), summary_fields(article))
+        return True
+    limiter.acquire()
+    if article.get("summary", "").strip():
+        # a near-duplicate finished meanwhile and shared its summary
+        return True
+    summary = generate_summary_with_gemini(client, text, title, content_type="website")
+    if summary:
+        article["summary"] = summary
+        article.pop("duplicateOf", None)
+        journal.record(item_key(article), {"summary": summary})
+        print(f"  ✓ Summary generated for {title} ({len(summary)} chars)")
+        if items_by_key is not None:
+            _share_summary(article, journal, items_by_key)
+        return True
+    article["summary"] = ""
+    print(f"  ✗ Failed to generate summary for {title}")
+    return False
+
+
+def _share_summary(
+    article: dict, journal: ProgressJournal, items_by_key: Dict[str, dict]
+) -> None:
+    for other in share_summary(article, "articles", items_by_key):
+        journal.record(item_key(other), summary_fields(other))
+
+
+def _backfill_fingerprints(
+    articles: List[dict], fetch_workers: int, extractor: Optional[str] = None
+) -> None:
+    """
+    Fingerprint a slice of the already summarized articles, so re-added
+    copies of them are recognized (see near_duplicates.unindexed_items)
+    """
+    backfill = unindexed_items(articles, "articles")
+    if not backfill:
+        return
+    with ThreadPoolExecutor(
+        max_workers=fetch_workers, thread_name_prefix="fetch"
+    ) as fetch_pool:
+        texts = list(
+            fetch_pool.map(
+                lambda article: extract_readable_text_from_url(
+                    article["url"].strip(), extractor
+                ),
+                backfill,
+            )
+        )
+    index_texts("articles", backfill, texts)
+
+
+def _run_sequential(
+    client,
+    pending: List[Tuple[int, dict]],
+    total: int,
+    limiter: TokenBucket,
+    journal: ProgressJournal,
+    extractor: Optional[str] = None,
+    items_by_key: Optional[Dict[str, dict]] = None,
+) -> List[Optional[bool]]:
+    outcomes = []
+    for idx, article in pending:
+        print(f"\n[{idx + 1}/{total}] Processing: {article.get('title', 'Untitled')}")
+        text = extract_readable_text_from_url(article["url"].strip(), extractor)
+        outcomes.append(
+            _summarize_article(client, article, text, limiter, journal, items_by_key)
+        )
+    return outcomes
+
+
+def _run_pipeline(
+    client,
+    pending: List[Tuple[int, dict]],
+    limiter: TokenBucket,
+    journal: ProgressJournal,
+    fetch_workers: int,
+    summary_workers: int,
+    parse_workers: int = 0,
+    extractor: Optional[str] = None,
+    items_by_key: Optional[Dict[str, dict]] = None,
+) -> List[Optional[bool]]:
+    """
+    Run page fetching and summarization as two bounded thread pools.
+    With parse_workers > 0, HTML parsing is offloaded to a process pool.
+
+    Each finished fetch is handed straight to the summary pool, so slow pages
+    never hold up summarization of the ones that are ready. Summaries are
+    written onto the article dicts in place, which keeps the original order of
+    articles.json regardless of completion order.
+
+    Returns:
+        The outcome of _summarize_article for every article
+    """
+    parse_pool = (
+        ProcessPoolExecutor(max_workers=parse_workers) if parse_workers > 0 else None
+    )
+    with ThreadPoolExecutor(
+        max_workers=fetch_workers, thread_name_prefix="fetch"
+    ) as fetch_pool, ThreadPoolExecutor(
+        max_workers=summary_workers, thread_name_prefix="summarize"
+    ) as summary_pool:
+        fetches = {
+            fetch_pool.submit(
+                extract_readable_text_from_url,
+                article["url"].strip(),
+                extractor,
+                parse_pool,
+            ): article
+            for _, article in pending
+        }
+        summaries = []
+        for future in as_completed(fetches):
+            article = fetches[future]
+            summaries.append(
+                summary_pool.submit(
+                    _summarize_article,
+                    client,
+                    article,
+                    future.result(),
+                    limiter,
+                    journal,
+                    items_by_key,
+                )
+            )
+        outcomes = [future.result() for future in as_completed(summaries)]
+    if parse_pool:
+        parse_pool.shutdown()
+    return outcomes
+
+
+def _apply_batch_results(
+    articles: List[dict], results: Dict[str, str], journal: ProgressJournal
+) -> bool:
+    updated = False
+    for article in articles:
+        summary = results.get(item_key(article))
+        if summary:
+            article["summary"] = summary
+            journal.record(item_key(article), {"summary": summary})
+            updated = True
+    return updated
+
+
+def _run_batch_job(
+    client,
+    pending: List[Tuple[int, dict]],
+    limiter: TokenBucket,
+    journal: ProgressJournal,
+    fetch_workers: int,
+    extractor: Optional[str] = None,
+    items_by_key: Optional[Dict[str, dict]] = None,
+) -> List[Optional[bool]]:
+    """
+    Summarize all pending articles as one Gemini batch job (see batch_jobs.py)
+
+    A job left running by an earlier run is collected first, so its articles
+    are not fetched again. Pages are still fetched concurrently; articles too
+    long for a single request are summarized directly, map-reduce style.
+
+    Returns:
+        Outcomes like _summarize_article's; articles left for the next run
+        count as failed
+    """
+    articles = [article for _, article in pending]
+    try:
+        results = resume_batch_job(client, BATCH_LABEL)
+    except BatchJobPending as e:
+        print(f"{e}, leaving {len(articles)} articles for the next run")
+        return [False] * len(articles)
+    _apply_batch_results(articles, results, journal)
+    outcomes = [True for article in articles if item_key(article) in results]
+
+    remaining = [article for article in articles if item_key(article) not in results]
+    with ThreadPoolExecutor(
+        max_workers=fetch_workers, thread_name_prefix="fetch"
+    ) as fetch_pool:
+        texts = list(
+            fetch_pool.map(
+                lambda article: extract_readable_text_from_url(
+                    article["url"].strip(), extractor
+                ),
+                remaining,
+            )
+        )
+
+    entries = []
+    queued = set()
+    # articles whose summary comes from the job, queued ones and their copies
+    in_job = []
+    for article, text in zip(remaining, texts):
+        if (
+            text
+            and items_by_key is not None
+            and reuse_duplicate_summary(article, text, "articles", items_by_key)
+        ):
+            journal.record(item_key(article), summary_fields(article))
+            outcomes.append(True)
+            continue
+        if queued.intersection(near_duplicate_keys(article, "articles")):
+            # gets the summary of the copy already in the job, see below
+            in_job.append(article)
+            continue
+        # compressed first: what counts is the size of the request
+        text = fit_single_call(text, "website")
+        if not text or estimate_tokens(text) > MAX_SINGLE_CALL_TOKENS:
+            # nothing to send, or too long for a single request
+            outcomes.append(_summarize_article(client, article, text, limiter, journal))
+            continue
+        entries.append((item_key(article), article.get("title", "Untitled"), text))
+        queued.add(item_key(article))
+        in_job.append(article)
+
+    try:
+        results = run_batch_job(client, BATCH_LABEL, entries, "website")
+    except BatchJobPending as e:
+        print(f"{e}, its articles are left for the next run")
+        results = {}
+    _apply_batch_results(remaining, results, journal)
+    if items_by_key is not None:
+        for article in remaining:
+            if item_key(article) in results:
+                _share_summary(article, journal, items_by_key)
+    outcomes.extend(bool(article.get("summary", "").strip()) for article in in_job)
+    return outcomes
+
+
+def summarize_articles(
+    client,
+    articles: List[dict],
+    journal: ProgressJournal,
+    pipeline: bool = False,
+    fetch_workers: int = 8,
+    summary_workers: int = 4,
+    requests_per_second: float = 1.0,
+    parse_workers: int = 0,
+    extractor: Optional[str] = None,
+    batch_job: bool = False,
+) -> Tuple[bool, int]:
+    """
+    Fill in missing summaries on already loaded articles, in place.
+    With batch_job, they are summarized as one Gemini batch job instead of
+    one request each.
+
+    Returns:
+        (True if any summary was generated, number of articles whose text
+        was extracted but not summarized)
+    """
+    pending = []
+    for idx, article in enumerate(articles):
+        if article.get("summary", "").strip():
+            continue
+        if not article.get("url", "").strip():
+            print(f"[{idx + 1}/{len(articles)}] No URL found, skipping.")
+            article["summary"] = ""
+            continue
+        pending.append((idx, article))
+
+    print(f"{len(pending)} articles need summaries")
+    limiter = TokenBucket(requests_per_second)
+    # near-duplicate check runs between text extraction and summarization
+    items_by_key = (
+        {item_key(article): article for article in articles}
+        if get_default_index()
+        else None
+    )
+    if items_by_key is not None and pending:
+        _backfill_fingerprints(articles, fetch_workers, extractor)
+    if batch_job:
+        outcomes = _run_batch_job(
+            client, pending, limiter, journal, fetch_workers, extractor, items_by_key
+        )
+    elif pipeline:
+        outcomes = _run_pipeline(
+            client,
+            pending,
+            limiter,
+            journal,
+            fetch_workers,
+            summary_workers,
+            parse_workers,
+            extractor,
+            items_by_key,
+        )
+    else:
+        outcomes = _run_sequential(
+            client, pending, len(articles), limiter, journal, extractor, items_by_key
+        )
+    failed = outcomes.count(False)
+    if failed:
+        print(f"✗ {failed} articles could not be summarized")
+
+    cache = get_default_cache()
+    if cache:
+        print(cache.stats())
+    index = get_default_index()
+    if index:
+        print(index.stats("articles"))
+    return any(outcomes), failed
+
+
 def ensure_article_summaries(
-    input_file: str = "../frontend/src/data/articles.json", output_file: str = ""
+    input_file: str = "../frontend/src/data/articles.json",
+    output_file: str = "",
+    pipeline: bool = False,
+    fetch_workers: int = 8,
+    summary_workers: int = 4,
+    requests_per_second: float = 1.0,
+    parse_workers: int = 0,
+    extractor: Optional[str] = None,
+    batch_job: bool = False,
 ):
-    articles = load_json_file(input_file)
-    if not articles:
+    """
+    Fill in missing article summaries
+
+    Args:
+        input_file: Path to articles.json
+        output_file: Where to save the result (defaults to input_file)
+        pipeline: Fetch pages and summarize concurrently instead of one at a time
+        fetch_workers: Concurrent page fetches in pipeline mode
+        summary_workers: Concurrent Gemini calls in pipeline mode
+        requests_per_second: Gemini request rate shared by all workers
+        parse_workers: Processes for HTML parsing in pipeline mode (0 = inline)
+        extractor: Text extractor backend, "lxml" or "bs4"
+        batch_job: Summarize as one Gemini batch job and wait for it
+    """
+    store = RecordStore.load(input_file)
+    if not store:
         print("No articles loaded.")
         return False
+    articles = store.items
 
     api_key = os.getenv("GEMINI_API_KEY") or ""
     client = setup_gemini_api(api_key)
@@ -51,41 +439,62 @@ def ensure_article_summaries(
         print("Gemini API client setup failed.")
         return False
 
-    updated = False
-    for idx, article in enumerate(articles):
-        summary = article.get("summary", "").strip()
-        url = article.get("url", "").strip()
-        title = article.get("title", "Untitled")
-        if not summary:
-            print(f"\n[{idx + 1}/{len(articles)}] Processing: {title}")
-            if not url:
-                print("  No URL found, skipping.")
-                article["summary"] = ""
-                continue
-            text = extract_readable_text_from_url(url)
-            if not text:
-                print("  No readable text extracted, skipping.")
-                article["summary"] = ""
-                continue
-            print(f"  Extracted {len(text)} characters from {url}")
-            summary = generate_summary_with_gemini(
-                client, text, title, content_type="website"
-            )
-            if summary:
-                article["summary"] = summary
-                print(f"  ✓ Summary generated ({len(summary)} chars)")
-                updated = True
-            else:
-                article["summary"] = ""
-                print("  ✗ Failed to generate summary")
-            time.sleep(1)
     out_path = output_file or input_file
-    if updated:
-        save_json_file(articles, out_path)
+    journal = ProgressJournal(default_journal_path(out_path))
+    restored = resume_from_journal(articles, journal, "summary")
+
+    updated, _ = summarize_articles(
+        client,
+        articles,
+        journal,
+        pipeline,
+        fetch_workers,
+        summary_workers,
+        requests_per_second,
+        parse_workers,
+        extractor,
+        batch_job,
+    )
+
+    if updated or restored:
+        if store.save(out_path):
+            journal.clear()
     else:
         print("No new summaries generated.")
     return True
 
 
 if __name__ == "__main__":
-    ensure_article_summaries()
+    parser = argparse.ArgumentParser(description="Generate missing article summaries")
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="fetch pages and summarize concurrently",
+    )
+    parser.add_argument("--fetch-workers", type=int, default=8)
+    parser.add_argument("--summary-workers", type=int, default=4)
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        help="processes for HTML parsing in pipeline mode (0 parses in-thread)",
+    )
+    parser.add_argument("--extractor", choices=sorted(EXTRACTORS), default=None)
+    parser.add_argument(
+        "--rps", type=float, default=1.0, help="Gemini requests per second"
+    )
+    parser.add_argument(
+        "--batch-job",
+        action="store_true",
+        help="summarize as one Gemini batch job and poll until it finishes",
+    )
+    args = parser.parse_args()
+    ensure_article_summaries(
+        pipeline=args.pipeline,
+        fetch_workers=args.fetch_workers,
+        summary_workers=args.summary_workers,
+        requests_per_second=args.rps,
+        parse_workers=args.parse_workers,
+        extractor=args.extractor,
+        batch_job=args.batch_job,
+    )
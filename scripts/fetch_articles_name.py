@@ -1,51 +1,168 @@
-import requests
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
 from dotenv import load_dotenv
-from fetch_articles_sheets import get_links_from_csv
-import json
+from http_client import canonicalize_url, fetch_html
+from progress_journal import atomic_write_json
+from record_store import RecordStore
+from resilience import CircuitOpenError, request
+from summary_cache import cache_dir
+from text_extraction import extract_title
 
 load_dotenv()
 
-api_counter = 0
+PEEKALINK_URL = os.getenv("TECHDEX_PEEKALINK_URL", "https://api.peekalink.io/")
+NO_TITLE = "No title found"
 
 
 def get_title(url):
+    """
+    Title from the peekalink API (paid, one hit per call)
+
+    Returns:
+        The title, NO_TITLE if peekalink has none, or None if the
+        request failed so the article can be retried next run
+    """
     PEEKLINK_KEY = os.getenv("PEEKLINK_KEY")
-    response = requests.post(
-        "https://api.peekalink.io/",
-        json={"link": url},
-        headers={"Authorization": f"Bearer {PEEKLINK_KEY}"},
-    )
-    title = response.json().get("title", "No title found")
+    try:
+        response = request(
+            "peekalink",
+            "POST",
+            PEEKALINK_URL,
+            json={"link": url},
+            headers={"Authorization": f"Bearer {PEEKLINK_KEY}"},
+            timeout=15,
+        )
+        response.raise_for_status()
+        title = response.json().get("title", NO_TITLE)
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        print(f"  peekalink lookup failed for {url}: {e}")
+        return None
     print("title from api", title)
     return title
 
 
-JSON_PATH = "../frontend/src/data/articles.json"
-with open(JSON_PATH) as f:
-    articles = json.load(f)
-    print("OLD ARTICLES", articles)
-
-new_articles = []
-for article in articles:
-    if article.get("title") == "":
-        print("article ", article)
-        title = get_title(article.get("url"))
-        api_counter += 1
-        new_articles.append(
-            {
-                "id": article.get("id"),
-                "title": title,
-                "url": article.get("url"),
-                "addedAt": article.get("addedAt"),
-            }
-        )
-    else:
-        new_articles.append(article)
+def get_local_title(url) -> Optional[str]:
+    """
+    Title read from the page itself (<title>, og:title, twitter:title).
+    The page lands in the shared page cache, so the summarizer reuses it.
+    """
+    try:
+        html, _ = fetch_html(url, timeout=15)
+    except Exception as e:
+        print(f"  could not fetch {url}: {e}")
+        return None
+    return extract_title(html)
+
+
+def _title_cache_path():
+    return os.path.join(cache_dir(), "titles.json")
+
+
+def _load_title_cache() -> Dict[str, str]:
+    try:
+        with open(_title_cache_path(), "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    # older runs cached misses too; look those up again
+    return {url: title for url, title in cache.items() if title != NO_TITLE}
+
+
+def resolve_titles(urls: Iterable[str], workers: int = 8) -> Dict[str, str]:
+    """
+    Resolve titles for many URLs, cheapest source first: the persistent title
+    cache (keyed by canonical URL), then the page's own metadata, then
+    peekalink. Uncached URLs are resolved concurrently. Misses (NO_TITLE) are
+    returned but not cached, so they are looked up again next run.
+
+    Args:
+        urls: Article URLs
+        workers: Concurrent lookups
+
+    Returns:
+        dict: url -> title for every URL that could be resolved
+    """
+    urls = list(urls)
+    cache = _load_title_cache()
+    titles = {}
+    pending = {}
+    for url in urls:
+        canonical = canonicalize_url(url)
+        if canonical in cache:
+            titles[url] = cache[canonical]
+        else:
+            pending.setdefault(canonical, url)
+
+    def resolve(url):
+        title = get_local_title(url)
+        if title:
+            print("title from page", title)
+            return title, False
+        return get_title(url), True
+
+    api_hits = 0
+    resolved = {}
+    if pending:
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = pool.map(resolve, pending.values())
+                for canonical, (title, from_api) in zip(pending, results):
+                    api_hits += from_api
+                    if title:
+                        resolved[canonical] = title
+                    if title and title != NO_TITLE:
+                        cache[canonical] = title
+        finally:
+            # peekalink hits are paid for, keep them even if a CircuitOpenError
+            # stops the run
+            atomic_write_json(cache, _title_cache_path(), indent=2)
+        for url in urls:
+            canonical = canonicalize_url(url)
+            if url not in titles and canonical in resolved:
+                titles[url] = resolved[canonical]
+
+    print(
+        f"{len(pending)} new links: {len(pending) - api_hits} titles from pages, "
+        f"{api_hits} peekalink hits"
+    )
+    return titles
+
+
+def fill_missing_titles(articles, workers: int = 8):
+    """
+    Look up titles for articles whose title field is empty, in place
+
+    Returns:
+        int: Number of articles that got a title
+    """
+    missing = [article for article in articles if article.get("title") == ""]
+    if not missing:
+        return 0
+    titles = resolve_titles([article.get("url", "") for article in missing], workers)
+    filled = 0
+    for article in missing:
+        title = titles.get(article.get("url", ""))
+        if title:
+            article["title"] = title
+            filled += 1
+    return filled
+
+
+def main():
+    store = RecordStore.load("../frontend/src/data/articles.json")
+    if store is None:
+        return
+
+    filled = fill_missing_titles(store.items)
+    print(f"Filled {filled} missing titles")
+
+    store.save()
 
-print("NUMBER OF API HITS ", api_counter)
-print("NEW ARTICLES ", new_articles)
 
-os.makedirs(os.path.dirname(JSON_PATH), exist_ok=True)
-with open(JSON_PATH, "w") as f:
-    json.dump(new_articles, f, indent=2)
+if __name__ == "__main__":
+    main()
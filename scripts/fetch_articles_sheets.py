@@ -1,67 +1,123 @@
-import requests
 import csv
-import io
-import json
-import random
+import hashlib
+import os
 from datetime import datetime
+from typing import Iterable, Iterator, List, Set
+
+from http_client import dedupe_key
+from metrics import get_metrics
+from record_store import RecordStore
+from resilience import request
+
+# point at a local stand-in with TECHDEX_SHEETS_URL (see benchmarks/fake_services.py)
+SHEETS_BASE_URL = os.getenv("TECHDEX_SHEETS_URL", "https://docs.google.com")
+SHEET_ID = "1aVrLxB2e1EUb-1AR8nTHOfifFx1IMC-Z_YcWMpF2YKU"
+GID = "0"  # default tab
+
+# hex digits of the link hash used as article id, grown only on a collision
+ID_LENGTH = 10
+
+
+def iter_links_from_csv() -> Iterator[str]:
+    """
+    Stream the link sheet row by row; every non-empty cell is a link.
+    The response is closed once the links have been consumed.
+    """
+    CSV_URL = f"{SHEETS_BASE_URL}/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={GID}"
+    response = request("sheets", "GET", CSV_URL, stream=True, timeout=30)
+    response.raise_for_status()
+    response.encoding = response.encoding or "utf-8"
+    received = 0
+
+    def lines() -> Iterator[str]:
+        nonlocal received
+        for line in response.iter_lines(decode_unicode=True):
+            received += len(line.encode("utf-8")) + 1
+            yield line
+
+    with response:
+        for row in csv.reader(lines()):
+            for cell in row:
+                cell = cell.strip()
+                if cell:
+                    yield cell
+    # without Content-Length the size is only known once the body is read
+    if not response.headers.get("Content-Length", "").isdigit():
+        get_metrics().add_bytes_in("sheets", received)
 
 
 def get_links_from_csv():
-    SHEET_ID = "1aVrLxB2e1EUb-1AR8nTHOfifFx1IMC-Z_YcWMpF2YKU"
-    GID = "0"  # default tab
-
-    CSV_URL = (
-        f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={GID}"
-    )
-
     try:
-        response = requests.get(CSV_URL)
-        response.raise_for_status()
-
-        links = []
-        content = io.StringIO(response.text)
-        reader = csv.reader(content)
-
-        for row in reader:
-            for cell in row:
-                links.append(cell.strip())
-
-        print("GSHEET LINKS ", links)
+        links = list(iter_links_from_csv())
+        print(f"GSHEET LINKS {len(links)}")
         return links
     except Exception as e:
         print(e)
 
 
-to_append_articles = []
+def link_id(key: str, taken: Set[str]) -> str:
+    """
+    Stable id for a link: a prefix of the sha1 of its dedupe key, lengthened
+    until it does not clash with an id in taken
+    """
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    for length in range(ID_LENGTH, len(digest) + 1):
+        if digest[:length] not in taken:
+            return digest[:length]
+    raise ValueError(f"No free id for {key}")
+
+
+def new_articles_for_links(articles, incoming_links: Iterable[str]) -> List[dict]:
+    """
+    Article stubs (empty title) for every link not already in articles.
+
+    Links are compared by dedupe_key, so tracking parameters, trailing
+    slashes, http/https and www variants of a known article are skipped.
+    incoming_links is consumed lazily, so it can be a stream.
+    """
+    seen = {dedupe_key(article.get("url", "")) for article in articles}
+    taken = {str(article.get("id")) for article in articles}
+    added_at = datetime.now().strftime("%m/%d/%Y")
+    to_append_articles = []
+    skipped = 0
+    for link in incoming_links or []:
+        key = dedupe_key(link)
+        if not key or key in seen:
+            skipped += 1
+            continue
+        seen.add(key)
+        article_id = link_id(key, taken)
+        taken.add(article_id)
+        to_append_articles.append(
+            {
+                "id": article_id,
+                "title": "",
+                # as submitted: the canonical form is only for matching
+                "url": link.strip(),
+                "addedAt": added_at,
+            }
+        )
+    print(f"{len(to_append_articles)} new links, {skipped} duplicates or non-links")
+    return to_append_articles
 
 
 def merge_new_links_to_json():
     """if link exists in json -> skip, else add item to json and keep title empty"""
-    JSON_PATH = "../frontend/src/data/articles.json"
-    with open(JSON_PATH) as f:
-        articles = json.load(f)
-        print("OLD ARTICLES", articles)
-
-    incoming_links = get_links_from_csv()
-    existing_links = [article["url"] for article in articles]
-
-    for link in incoming_links:
-        if link not in existing_links:
-            to_append_articles.append(
-                {
-                    "id": random.randint(100000, 999999),
-                    "title": "",
-                    "url": link,
-                    "addedAt": datetime.now().strftime("%m/%d/%Y"),
-                }
-            )
-    print("TO APPEND ", to_append_articles)
-
-    merged = articles + to_append_articles
-    with open(JSON_PATH, "w") as f:
-        json.dump(merged, f, indent=2)
-    print(f"Saved updated articles to {JSON_PATH}")
+    store = RecordStore.load("../frontend/src/data/articles.json")
+    if store is None:
+        return
+    print(f"OLD ARTICLES {len(store)}")
+
+    try:
+        to_append_articles = new_articles_for_links(store.items, iter_links_from_csv())
+    except Exception as e:
+        print(f"Could not read the link sheet: {e}")
+        return
+
+    store.extend(to_append_articles)
+    if store.save():
+        print(f"Saved updated articles to {store.path}")
 
 
 if __name__ == "__main__":
-    links = merge_new_links_to_json()
+    merge_new_links_to_json()
@@ -4,7 +4,9 @@ import json
 import os
 from datetime import datetime
 
-import requests
+from fetch_articles_sheets import SHEETS_BASE_URL
+from progress_journal import atomic_write_json
+from resilience import request
 
 
 def get_ctf_from_csv():
@@ -13,14 +15,12 @@ def get_ctf_from_csv():
     )
     GID = "0"  # default tab
 
-    CSV_URL = (
-        f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={GID}"
-    )
+    CSV_URL = f"{SHEETS_BASE_URL}/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={GID}"
 
     print(f"Fetching data from: {CSV_URL}")
 
     try:
-        response = requests.get(CSV_URL)
+        response = request("sheets", "GET", CSV_URL, timeout=30)
         print(f"Response: {response.text}")
         response.raise_for_status()
 
@@ -80,8 +80,9 @@ def update_ctf_json():
 
     # Save to JSON file
     try:
-        with open(JSON_PATH, "w") as f:
-            json.dump(ctf_data, f, indent=2)
+        if not atomic_write_json(ctf_data, JSON_PATH, indent=2):
+            print(f"CTF data unchanged ({len(ctf_data)} categories)")
+            return
 
         print(f"Successfully updated CTF data with {len(ctf_data)} categories")
         print(f"Total challenges: {sum(len(cat['challenges']) for cat in ctf_data)}")
@@ -1,103 +1,243 @@
+import argparse
 import hashlib
 import json
 import os
 from datetime import datetime
 
-import requests
 from dotenv import load_dotenv
+from progress_journal import atomic_write_json
+from record_store import RecordStore
+from resilience import request
+from summary_cache import cache_dir
 
 load_dotenv()
 
-
-def fetch_all_videos(api_key, playlist_id):
+YOUTUBE_API_URL = os.getenv("TECHDEX_YOUTUBE_API_URL", "https://youtube.googleapis.com")
+PLAYLIST_ITEMS_URL = f"{YOUTUBE_API_URL}/youtube/v3/playlistItems"
+PLAYLIST_ID = "PLkoraQhs622SHMColalnQDomOlcMz9bzX"
+
+
+def _video_from_item(item):
+    snippet = item["snippet"]
+    title = snippet["title"]
+    video_id = snippet["resourceId"]["videoId"]
+    yt_url = f"https://www.youtube.com/watch?v={video_id}"
+    added_at_iso = snippet["publishedAt"]
+    added_at_formatted = datetime.strptime(added_at_iso, "%Y-%m-%dT%H:%M:%SZ").strftime(
+        "%m/%d/%Y"
+    )
+
+    obj_id = hashlib.sha1(title.encode("utf-8")).hexdigest()
+    return {
+        "id": obj_id[:6],
+        "title": title,
+        "url": yt_url,
+        "addedAt": added_at_formatted,
+    }
+
+
+def _fetch_page(api_key, playlist_id, page_token=None, etag=None):
+    """
+    Fetch one page of playlist items through the shared session
+
+    Returns:
+        tuple: (data, etag); data is None when the server answered
+            304 Not Modified for the supplied etag
+    """
+    params = {
+        "part": "snippet",
+        "playlistId": playlist_id,
+        "maxResults": 50,
+        "key": api_key,
+    }
+    if page_token:
+        params["pageToken"] = page_token
+    headers = {"If-None-Match": etag} if etag else {}
+
+    response = request(
+        "youtube", "GET", PLAYLIST_ITEMS_URL, params=params, headers=headers, timeout=10
+    )
+    if response.status_code == 304:
+        return None, etag
+    if response.status_code != 200:
+        raise Exception(f"Error: {response.status_code} {response.text}")
+    data = response.json()
+    return data, response.headers.get("ETag") or data.get("etag")
+
+
+def fetch_all_videos(api_key, playlist_id, cursor=None):
+    """
+    Page through the whole playlist
+
+    Args:
+        api_key: YouTube Data API key
+        playlist_id: Playlist to read
+        cursor: Optional dict that is filled with the page tokens, page ETags
+            and playlist order, to seed later incremental syncs
+    """
     all_videos = []
     page_token = None
+    page_tokens = []
+    etags = {}
+    published = []
 
     while True:
-        url = (
-            f"https://youtube.googleapis.com/youtube/v3/playlistItems"
-            f"?part=snippet&playlistId={playlist_id}&maxResults=50&key={api_key}"
-        )
-        if page_token:
-            url += f"&pageToken={page_token}"
-
-        response = requests.get(url, timeout=10)
-        if response.status_code != 200:
-            raise Exception(f"Error: {response.status_code} {response.text}")
-
-        data = response.json()
+        data, etag = _fetch_page(api_key, playlist_id, page_token)
+        page_tokens.append(page_token or "")
+        etags[page_token or ""] = etag
         items = data.get("items", [])
 
         for item in items:
-            snippet = item["snippet"]
-            title = snippet["title"]
-            video_id = snippet["resourceId"]["videoId"]
-            yt_url = f"https://www.youtube.com/watch?v={video_id}"
-            added_at_iso = snippet["publishedAt"]
-            added_at_formatted = datetime.strptime(
-                added_at_iso, "%Y-%m-%dT%H:%M:%SZ"
-            ).strftime("%m/%d/%Y")
-
-            obj_id = hashlib.sha1(title.encode("utf-8")).hexdigest()
-            all_videos.append(
-                {
-                    "id": obj_id[:6],
-                    "title": title,
-                    "url": yt_url,
-                    "addedAt": added_at_formatted,
-                }
-            )
+            all_videos.append(_video_from_item(item))
+            published.append(item["snippet"]["publishedAt"])
 
         page_token = data.get("nextPageToken")
         if not page_token:
             break
 
+    if cursor is not None:
+        newest_first = len(published) > 1 and published[0] > published[-1]
+        cursor.update(
+            {
+                "playlist_id": playlist_id,
+                "order": "newest_first" if newest_first else "oldest_first",
+                "page_tokens": page_tokens,
+                "etags": etags,
+            }
+        )
     return all_videos
 
 
-def main():
-    api_key = os.environ.get("YT_API")
-    playlist_id = "PLkoraQhs622SHMColalnQDomOlcMz9bzX"
+def sync_new_videos(api_key, playlist_id, cursor, known_urls):
+    """
+    Fetch only the part of the playlist that can contain unseen videos.
 
-    output_path = "../frontend/src/data/yt.json"
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    For playlists where new videos are added at the top, paging starts at the
+    first page and stops at the first page with no unknown videos. For
+    playlists that grow at the bottom, paging starts at the last known page
+    token. Either way a 304 for a stored page ETag ends the sync immediately.
 
-    # Load existing videos if file exists
-    existing_videos = []
-    if os.path.exists(output_path):
-        try:
-            with open(output_path, "r") as f:
-                existing_videos = json.load(f)
-            print(f"Loaded {len(existing_videos)} existing videos.")
-        except (json.JSONDecodeError, FileNotFoundError):
-            print("No existing videos file found or invalid JSON, starting fresh.")
-            existing_videos = []
+    Args:
+        api_key: YouTube Data API key
+        playlist_id: Playlist to read
+        cursor: Sync state from a previous run, updated in place
+        known_urls: URLs already present in yt.json
+
+    Returns:
+        list: Videos not in known_urls, in playlist order
+    """
+    new_videos = []
+    etags = cursor.setdefault("etags", {})
+    page_tokens = cursor.setdefault("page_tokens", [""])
+    newest_first = cursor.get("order") == "newest_first"
+    page_token = "" if newest_first else page_tokens[-1]
+    pages = 0
+
+    while True:
+        data, etag = _fetch_page(
+            api_key, playlist_id, page_token, etags.get(page_token)
+        )
+        pages += 1
+        if data is None:
+            break
+        etags[page_token] = etag
+
+        page_new = []
+        for item in data.get("items", []):
+            video = _video_from_item(item)
+            if video["url"] not in known_urls:
+                page_new.append(video)
+        new_videos.extend(page_new)
+
+        if newest_first and not page_new:
+            break
+        page_token = data.get("nextPageToken")
+        if not page_token:
+            break
+        if page_token not in page_tokens:
+            page_tokens.append(page_token)
+
+    print(f"Incremental sync read {pages} page(s)")
+    return new_videos
+
+
+def _cursor_path(playlist_id):
+    return os.path.join(cache_dir(), f"yt_sync_{playlist_id}.json")
+
+
+def _load_cursor(playlist_id):
+    try:
+        with open(_cursor_path(playlist_id), "r") as f:
+            cursor = json.load(f)
+        if cursor.get("playlist_id") == playlist_id:
+            return cursor
+    except (OSError, json.JSONDecodeError):
+        pass
+    return None
+
+
+def find_new_videos(existing_videos, full_resync=False):
+    """
+    Sync the playlist and return the videos missing from existing_videos.
+    The sync cursor is persisted so the next run can stay incremental.
+    """
+    api_key = os.environ.get("YT_API")
+    playlist_id = PLAYLIST_ID
 
     # Create a set of existing video URLs for quick lookup
     existing_urls = {video["url"] for video in existing_videos}
 
-    # Fetch all videos from YouTube
-    all_videos = fetch_all_videos(api_key, playlist_id)
+    cursor = None if full_resync else _load_cursor(playlist_id)
+    if cursor:
+        new_videos = sync_new_videos(api_key, playlist_id, cursor, existing_urls)
+    else:
+        # No sync state yet (or a repair run): read everything and seed it
+        cursor = {}
+        all_videos = fetch_all_videos(api_key, playlist_id, cursor)
 
-    # Filter out videos that already exist
-    new_videos = []
-    for video in all_videos:
-        if video["url"] not in existing_urls:
-            new_videos.append(video)
+        # Filter out videos that already exist
+        new_videos = []
+        for video in all_videos:
+            if video["url"] not in existing_urls:
+                new_videos.append(video)
+    atomic_write_json(cursor, _cursor_path(playlist_id), indent=2)
+    return new_videos
+
+
+def main(full_resync=False):
+    output_path = "../frontend/src/data/yt.json"
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    # Load existing videos if file exists
+    store = RecordStore.load(output_path) if os.path.exists(output_path) else None
+    if store is None:
+        print("No existing videos file found or invalid JSON, starting fresh.")
+        store = RecordStore(output_path)
+    else:
+        print(f"Loaded {len(store)} existing videos.")
+
+    new_videos = find_new_videos(store.items, full_resync)
 
     # Append new videos to existing list
-    if new_videos:
-        existing_videos.extend(new_videos)
-        print(f"Added {len(new_videos)} new videos.")
+    added = store.extend(new_videos)
+    if added:
+        print(f"Added {added} new videos.")
     else:
         print("No new videos found.")
+        return
 
     # Save the combined list back to file
-    with open(output_path, "w") as f:
-        json.dump(existing_videos, f, indent=2)
+    store.save()
 
-    print(f"Total videos in file: {len(existing_videos)}")
+    print(f"Total videos in file: {len(store)}")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Sync playlist videos into yt.json")
+    parser.add_argument(
+        "--full-resync",
+        action="store_true",
+        help="page through the whole playlist instead of syncing incrementally",
+    )
+    args = parser.parse_args()
+    main(full_resync=args.full_resync)
@@ -1,28 +1,115 @@
-import json
 import os
 import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional
 
 from generate_summaries import generate_summary_with_gemini, setup_gemini_api
+from progress_journal import (
+    ProgressJournal,
+    default_journal_path,
+    item_key,
+    resume_from_journal,
+)
+from metrics import get_metrics
+from near_duplicates import (
+    get_default_index,
+    index_texts,
+    reuse_duplicate_summary,
+    share_summary,
+    summary_fields,
+    unindexed_items,
+)
+from record_store import RecordStore
+from resilience import CircuitOpenError, get_service, request
+from summary_cache import get_default_cache
+from transcript_store import Transcript, get_default_store
 from youtube_transcript_api import YouTubeTranscriptApi
 
+# If set, transcripts are read as JSON snippet lists from <url>/<video_id>
+# instead of YouTube itself (see benchmarks/fake_services.py)
+TRANSCRIPT_URL = os.getenv("TECHDEX_TRANSCRIPT_URL")
+TRANSCRIPT_WORKERS = int(os.getenv("TECHDEX_TRANSCRIPT_WORKERS", "4"))
 
-def get_video_transcript(video_id):
+
+def _fetch_transcript(video_id) -> Transcript:
+    if TRANSCRIPT_URL:
+        response = request(
+            "transcripts", "GET", f"{TRANSCRIPT_URL}/{video_id}", timeout=15
+        )
+        response.raise_for_status()
+        return Transcript.from_snippets(
+            (s["text"], s.get("start", 0.0), s.get("duration", 0.0))
+            for s in response.json()
+        )
+
+    def fetch():
+        with get_metrics().track("transcripts") as call:
+            transcript = Transcript.from_snippets(
+                (s.text, s.start, s.duration)
+                for s in YouTubeTranscriptApi().fetch(video_id)
+            )
+            # the library hides the HTTP response; count the text it returned
+            call.add_bytes_in(len(transcript.text.encode("utf-8")))
+        return transcript
+
+    return get_service("transcripts").call(fetch)
+
+
+def get_transcript(video_id) -> Optional[Transcript]:
     """
-    Get transcript for a YouTube video with error handling
+    Transcript of a video with its snippet timings, from the transcript cache
+    or YouTube
+
+    Returns:
+        The transcript, or None if it could not be fetched
     """
+    if not video_id:
+        return None
+    store = get_default_store()
+    transcript = store.get(video_id) if store else None
+    if transcript is not None:
+        return transcript
     try:
-        # Get transcript
-        ytt_api = YouTubeTranscriptApi()
-        transcript = ytt_api.fetch(video_id)
-        formatted_transcript = ""
-        for snippet in transcript:
-            formatted_transcript += snippet.text
-        print(f"Formatted transcript for video {video_id} succesfully fetched")
-        return formatted_transcript
-
+        transcript = _fetch_transcript(video_id)
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error getting transcript for video {video_id}: {e}")
         return None
+    if store:
+        store.put(video_id, transcript)
+    print(f"Formatted transcript for video {video_id} succesfully fetched")
+    return transcript
+
+
+def get_video_transcript(video_id):
+    """
+    Get transcript text for a YouTube video with error handling
+    """
+    transcript = get_transcript(video_id)
+    return transcript.text if transcript else None
+
+
+def prefetch_transcripts(
+    urls: Iterable[str], workers: int = TRANSCRIPT_WORKERS
+) -> Iterator[Optional[Transcript]]:
+    """
+    Transcripts for urls, in order. Up to 2 * workers are fetched ahead of
+    the consumer, so fetching overlaps with summarizing without holding the
+    whole backlog in memory.
+    """
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="transcript"
+    ) as pool:
+        pending = deque()
+        for url in urls:
+            video_id = extract_video_id_from_url(url or "")
+            pending.append(pool.submit(get_transcript, video_id))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
 
 
 def extract_video_id_from_url(url):
@@ -55,16 +142,11 @@ def load_transcripts_from_json(json_file_path, output_file_path=None):
     """
     Load transcripts for all videos in the JSON file and add them as transcript fields
     """
-    # Read the JSON file
-    try:
-        with open(json_file_path, "r", encoding="utf-8") as f:
-            videos = json.load(f)
-    except FileNotFoundError:
-        print(f"Error: File {json_file_path} not found")
-        return
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON in {json_file_path}: {e}")
+    # Read the index file; transcripts already in blobs stay there
+    store = RecordStore.load(json_file_path)
+    if store is None:
         return
+    videos = store.items
 
     print(f"Found {len(videos)} videos in {json_file_path}")
 
@@ -74,8 +156,8 @@ def load_transcripts_from_json(json_file_path, output_file_path=None):
             f"\nProcessing video {i}/{len(videos)}: {video.get('title', 'Unknown title')}"
         )
 
-        # Skip if already has a summary
-        if "transcript" in video:
+        # Skip if already has a transcript (inline or in a blob)
+        if "transcript" in video or "transcriptBlob" in video:
             print("  Skipping - already has transcript")
             continue
 
@@ -100,47 +182,61 @@ def load_transcripts_from_json(json_file_path, output_file_path=None):
             video["transcript"] = None
             print("✗ Failed to get transcript")
 
-    # Save the updated JSON
-    output_path = output_file_path or json_file_path
-    try:
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(videos, f, indent=2, ensure_ascii=False)
-        print(f"\n✓ Updated JSON saved to: {output_path}")
-    except Exception as e:
-        print(f"Error saving file: {e}")
-
+    # Save the updated index, transcripts go to per-video blobs
+    store.save(output_file_path)
 
-def main():
-    # Default paths
-    json_file_path = "../frontend/src/data/yt.json"
-
-    # Check if file exists
-    if not os.path.exists(json_file_path):
-        print(f"Error: {json_file_path} not found")
-        print(
-            "Please make sure the yt_with_transcripts.json file exists in the frontend/src/data/ directory"
-        )
-        return
-
-    # for each video, we will fetch transcript -> send it to gemini,
-    # get the summary as save as json in one flow
 
+def summarize_videos(
+    yt_vids,
+    journal: ProgressJournal,
+    checkpoint: Optional[RecordStore] = None,
+    checkpoint_every: int = 10,
+    transcript_workers: int = TRANSCRIPT_WORKERS,
+    client=None,
+):
+    """
+    Fetch transcripts and summaries for videos with an empty summary, in place
+
+    Args:
+        yt_vids: Video items, already resumed from the journal
+        journal: Journal that every new summary is recorded in
+        checkpoint: If set, this store (holding yt_vids) is saved every
+            checkpoint_every videos
+        checkpoint_every: Checkpoint interval
+        transcript_workers: Transcripts fetched concurrently ahead of the
+            summaries
+        client: Gemini client, created once on first use if not given
+
+    Returns:
+        int: Number of videos whose transcript was fetched but not summarized
+    """
     # get vids that need summary
     yt_vids_to_get_summary = []
-    with open(json_file_path, "r", encoding="utf-8") as f:
-        yt_vids = json.load(f)
-        for vids in yt_vids:
-            if vids.get("summary") == None:
-                vids["summary"] = ""
-            if vids.get("summary") == "":
-                yt_vids_to_get_summary.append(vids)
+    for vids in yt_vids:
+        if vids.get("summary") == None:
+            vids["summary"] = ""
+        if vids.get("summary") == "":
+            yt_vids_to_get_summary.append(vids)
 
     print(f"attempting to fetch summaries for {len(yt_vids_to_get_summary)}")
+    # re-uploads are caught on the transcript before it is summarized
+    vids_by_key = {item_key(vid): vid for vid in yt_vids}
+    backfill = unindexed_items(yt_vids, "yt") if yt_vids_to_get_summary else []
+    if backfill:
+        # fingerprint already summarized videos, so re-uploads of them match
+        transcripts = prefetch_transcripts(
+            [vid.get("url") for vid in backfill], transcript_workers
+        )
+        index_texts("yt", backfill, [t.text if t else None for t in transcripts])
 
     # now we can process all the videos without summary, or summary field missing
     total_vids = len(yt_vids_to_get_summary)
+    transcripts = prefetch_transcripts(
+        [vid.get("url") for vid in yt_vids_to_get_summary], transcript_workers
+    )
     i = 1
-    for vid in yt_vids_to_get_summary:
+    failed = 0
+    for vid, transcript in zip(yt_vids_to_get_summary, transcripts):
         print(vid)
         try:
             url = vid.get("url")
@@ -151,35 +247,81 @@ def main():
             print("url/title not present in vid object")
             raise e from e
 
-        transcript = get_transcript_for_url(url)
-        if not transcript:
+        text = transcript.text if transcript else None
+        if not text:
             print(f"could not fetch transcript for video {title}")
         print(f"fetching summary for {title} {i}/{total_vids}")
         summary = ""
-        if transcript:
-            gemini_client = setup_gemini_api()
+        if text and reuse_duplicate_summary(vid, text, "yt", vids_by_key):
+            summary = vid["summary"]
+        elif text:
+            client = client or setup_gemini_api()
+            # with markers, so long transcripts are chunked between snippets
             summary = generate_summary_with_gemini(
-                client=gemini_client,
-                content=transcript,
+                client=client,
+                content=transcript.timestamped_text(),
                 title=title,
                 content_type="Youtube transcript",
             )
             print(summary)
+            if summary:
+                vid["summary"] = summary
+                vid.pop("duplicateOf", None)
+                # copies checked while this one had no summary yet
+                for other in share_summary(vid, "yt", vids_by_key):
+                    journal.record(item_key(other), summary_fields(other))
+            else:
+                failed += 1
         vid["summary"] = summary
+        if summary:
+            journal.record(item_key(vid), summary_fields(vid))
+        if checkpoint and i % checkpoint_every == 0:
+            # the store holds the same dicts, so this persists progress so far
+            checkpoint.save()
         i += 1
 
-    # update only the objects that need summary update and write to file
-    with open(json_file_path, "r+", encoding="utf-8") as f:
-        yt_vids = json.load(f)
-        for vids in yt_vids:
-            for new_vids in yt_vids_to_get_summary:
-                if vids["url"] == new_vids["url"]:
-                    if vids.get("summary") is None:
-                        vids["summary"] = ""
-                    vids["summary"] = new_vids["summary"]
-
-    with open(json_file_path, "w", encoding="utf-8") as f:
-        json.dump(yt_vids, f, indent=2)
+    transcript_cache = get_default_store()
+    if transcript_cache:
+        print(transcript_cache.stats())
+    index = get_default_index()
+    if index:
+        print(index.stats("yt"))
+    if failed:
+        print(f"✗ {failed} videos could not be summarized")
+    return failed
+
+
+def main(checkpoint_every: int = 10):
+    # Default paths
+    json_file_path = "../frontend/src/data/yt.json"
+
+    # Check if file exists
+    if not os.path.exists(json_file_path):
+        print(f"Error: {json_file_path} not found")
+        print(
+            "Please make sure the yt_with_transcripts.json file exists in the frontend/src/data/ directory"
+        )
+        return
+
+    # for each video, we will fetch transcript -> send it to gemini,
+    # get the summary as save as json in one flow
+
+    # summaries finished by a previous, interrupted run
+    journal = ProgressJournal(default_journal_path(json_file_path))
+
+    store = RecordStore.load(json_file_path)
+    if store is None:
+        return
+    resume_from_journal(store.items, journal, "summary")
+    # summaries are written onto the store's items in place
+    summarize_videos(store.items, journal, store, checkpoint_every)
+
+    cache = get_default_cache()
+    if cache:
+        print(cache.stats())
+
+    if store.save():
+        journal.clear()
 
 
 if __name__ == "__main__":
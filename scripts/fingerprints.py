@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional, Union
+
+from progress_journal import atomic_write_json
+from summary_cache import cache_dir
+
+# a fingerprint older than this no longer lets a stage skip, so items that
+# failed on earlier nights (dead pages, missing transcripts) get retried
+MAX_AGE_DAYS = float(os.getenv("TECHDEX_FINGERPRINT_MAX_AGE_DAYS", "7"))
+
+
+def content_hash(parts: Iterable[Union[str, bytes, None]]) -> str:
+    """
+    sha256 over parts, length-prefixed so ("ab", "c") and ("a", "bc") differ
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        data = b"" if part is None else part
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    return h.hexdigest()
+
+
+def file_hash(path: str) -> Optional[str]:
+    """
+    sha256 of a file's bytes, or None if it does not exist
+    """
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    except FileNotFoundError:
+        return None
+    return h.hexdigest()
+
+
+class FingerprintStore:
+    """
+    Content hashes of the inputs each pipeline branch last completed with.
+
+    A branch records the hash of its upstream data (sheet links, playlist
+    sync result) together with the hash of the output it wrote. When both
+    match on the next run, nothing upstream or on disk changed and the
+    branch can be skipped.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_age_days: float = MAX_AGE_DAYS):
+        self.path = path or os.path.join(cache_dir(), "fingerprints.json")
+        self.max_age_seconds = max_age_days * 86400
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries: Dict[str, Dict] = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self._entries = {}
+
+    def unchanged(self, name: str, digest: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(name)
+        return bool(
+            entry
+            and entry.get("hash") == digest
+            and time.time() - entry.get("recorded_at", 0) < self.max_age_seconds
+        )
+
+    def record(self, name: str, digest: str) -> None:
+        """
+        Store digest for name and persist the store
+        """
+        with self._lock:
+            self._entries[name] = {"hash": digest, "recorded_at": time.time()}
+            atomic_write_json(self._entries, self.path, indent=2, sort_keys=True)
+
+    def forget(self, name: str) -> None:
+        with self._lock:
+            if self._entries.pop(name, None) is not None:
+                atomic_write_json(self._entries, self.path, indent=2, sort_keys=True)
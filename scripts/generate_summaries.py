@@ -1,68 +1,391 @@
+import gzip
+import hashlib
 import json
 import os
+import re
 import time
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from chunking import estimate_tokens, split_into_chunks
+from compression import COMPRESS_TOKENS, MIN_KEPT_SHARE, compress_for_prompt
 from dotenv import load_dotenv
 from google import genai
+from json_stream import iter_json_array, write_json_array
+from metrics import get_metrics
+from progress_journal import (
+    ProgressJournal,
+    atomic_write_json,
+    item_key,
+    resume_from_journal,
+)
+from resilience import CircuitOpenError, get_service
+from summary_cache import get_default_cache, summary_cache_key
 
 # Load environment variables from .env file
 load_dotenv()
 
+GEMINI_MODEL = "gemini-2.0-flash"
+# unset means the public endpoint; see benchmarks/fake_services.py
+GEMINI_BASE_URL = os.getenv("TECHDEX_GEMINI_BASE_URL")
+# pause between sequential Gemini calls to stay under the free-tier limits
+REQUEST_DELAY = float(os.getenv("TECHDEX_REQUEST_DELAY", "1"))
+
+PROMPT_TEMPLATE = """
+        Please provide a concise summary of the following {content_type}. 
+        Focus on the key points, main ideas, and important insights.
+        
+        Title: {title}
+        
+        {content_type_label}:
+        {content}  
+        
+        Please provide a summary in 2-3 paragraphs (around 200-300 words) that captures the main content and value.
+        """
+
+# Map step for long content: one part of a longer document
+CHUNK_PROMPT_TEMPLATE = """
+        The following is one part of a longer {content_type} titled "{title}".
+        Write concise notes (at most 150 words) on the key points, ideas and
+        insights in this part only. Do not add an introduction or conclusion.
+
+        {content_type_label} part:
+        {content}
+        """
+
+# Reduce step: combine the per-part notes into the final summary
+REDUCE_PROMPT_TEMPLATE = """
+        Below are notes taken on consecutive parts of a {content_type}.
+        Combine them into a single concise summary of the whole {content_type}.
+        Focus on the key points, main ideas, and important insights.
+
+        Title: {title}
+
+        Notes:
+        {content}
+
+        Please provide a summary in 2-3 paragraphs (around 200-300 words) that captures the main content and value.
+        """
+
+# Several short items packed into one request, answered as a JSON object
+BATCH_PROMPT_TEMPLATE = """
+        Please provide a concise summary of each of the following {content_type} items.
+        Focus on the key points, main ideas, and important insights of each item.
+        Summarize every item independently, in 2-3 paragraphs (around 200-300 words).
+
+        Respond with a JSON object that maps each item id (e.g. "item1") to its
+        summary string, with exactly one entry per item and nothing else.
+
+        {content}
+        """
+
+# content above this size is summarized map-reduce style
+MAX_SINGLE_CALL_TOKENS = 30_000
+CHUNK_TOKENS = 8_000
+
 
 def setup_gemini_api(api_key=os.getenv("GEMINI_API_KEY")):
     """
     Setup Gemini API with the provided API key
     """
     try:
-        client = genai.Client(api_key=api_key)
+        http_options = {"base_url": GEMINI_BASE_URL} if GEMINI_BASE_URL else None
+        client = genai.Client(api_key=api_key, http_options=http_options)
         return client
     except Exception as e:
         print(f"Error setting up Gemini API: {e}")
         return None
 
 
-def generate_summary_with_gemini(
-    client, content: str, title: str, content_type: str = "content"
-) -> Optional[str]:
+def _generate_content(client, prompt: str, config: Optional[Dict] = None):
+    """
+    client.models.generate_content, retried on throttling and server errors
+    (see resilience.py) and recorded under the "gemini" service with
+    prompt/response sizes and the token counts Gemini reports
     """
-    Generate a summary using Gemini API
 
-    Args:
-        client: Gemini API client
-        content: The content to summarize (transcript, text, etc.)
-        title: Title of the content
-        content_type: Type of content (e.g., "transcript", "article", "text")
+    def attempt():
+        with get_metrics().track("gemini") as call:
+            response = client.models.generate_content(
+                model=GEMINI_MODEL, contents=prompt, config=config
+            )
+            call.status = 200
+            call.bytes_out = len(prompt.encode("utf-8"))
+            text = (response.text if response else None) or ""
+            call.bytes_in = len(text.encode("utf-8"))
+            call.count("prompt_chars", len(prompt))
+            call.count("response_chars", len(text))
+            usage = getattr(response, "usage_metadata", None)
+            if usage:
+                call.count("prompt_tokens", usage.prompt_token_count or 0)
+                call.count("response_tokens", usage.candidates_token_count or 0)
+        return response
+
+    return get_service("gemini").call(attempt)
+
+
+def _generate_with_template(
+    client,
+    template: str,
+    content: str,
+    title: str,
+    content_type: str,
+    use_cache: bool = True,
+) -> Optional[str]:
+    """
+    Fill a prompt template, call Gemini and cache the result under a key
+    derived from the template, so every prompt kind is cached independently.
     """
+    cache = get_default_cache() if use_cache else None
+    key = summary_cache_key(content, title, content_type, template, GEMINI_MODEL)
+    if cache:
+        cached = cache.get(key)
+        if cached:
+            print("  Summary served from cache")
+            get_metrics().incr("summary_cache_hits")
+            return cached
+
     try:
         # Create a prompt for summarization
-        prompt = f"""
-        Please provide a concise summary of the following {content_type}. 
-        Focus on the key points, main ideas, and important insights.
-        
-        Title: {title}
-        
-        {content_type.capitalize()}:
-        {content}  
-        
-        Please provide a summary in 2-3 paragraphs (around 200-300 words) that captures the main content and value.
-        """
-
-        response = client.models.generate_content(
-            model="gemini-2.0-flash", contents=prompt
+        prompt = template.format(
+            content_type=content_type,
+            content_type_label=content_type.capitalize(),
+            title=title,
+            content=content,
         )
 
+        response = _generate_content(client, prompt)
+
         if response and response.text:
-            return response.text.strip()
+            summary = response.text.strip()
+            if cache:
+                cache.put(key, summary)
+            get_metrics().incr("summaries_generated")
+            return summary
         else:
             print("  Warning: Empty response from Gemini API")
             return None
 
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"  Error generating summary with Gemini: {e}")
         return None
 
 
+def _map_reduce_summary(
+    client,
+    content: str,
+    title: str,
+    content_type: str,
+    use_cache: bool,
+    chunk_tokens: int,
+    workers: int,
+) -> Optional[str]:
+    """
+    Summarize each chunk in parallel, then combine the chunk summaries.
+    Every chunk result is cached on its own, so a failure part-way through
+    only costs the chunks that had not finished yet.
+    """
+    chunks = split_into_chunks(content, chunk_tokens)
+    print(f"  Long {content_type}: map-reduce over {len(chunks)} chunks")
+
+    def summarize_chunk(chunk: str) -> Optional[str]:
+        return _generate_with_template(
+            client, CHUNK_PROMPT_TEMPLATE, chunk, title, content_type, use_cache
+        )
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chunk") as pool:
+        chunk_summaries = list(pool.map(summarize_chunk, chunks))
+
+    failed = sum(1 for summary in chunk_summaries if not summary)
+    if failed:
+        print(f"  ✗ {failed}/{len(chunks)} chunk summaries failed")
+        return None
+
+    notes = "\n\n".join(
+        f"Part {i}:\n{summary}" for i, summary in enumerate(chunk_summaries, 1)
+    )
+    return _generate_with_template(
+        client, REDUCE_PROMPT_TEMPLATE, notes, title, content_type, use_cache
+    )
+
+
+def fit_single_call(
+    content: str, content_type: str, max_tokens: int = MAX_SINGLE_CALL_TOKENS
+) -> str:
+    """
+    Content as it is sent in a single prompt: reduced to max_tokens when that
+    keeps at least MIN_KEPT_SHARE of it (see compression.py), otherwise
+    unchanged. Content still over max_tokens needs map-reduce.
+    """
+    return compress_for_prompt(content, content_type, max_tokens, MIN_KEPT_SHARE)
+
+
+def generate_summary_with_gemini(
+    client,
+    content: str,
+    title: str,
+    content_type: str = "content",
+    use_cache: bool = True,
+    max_single_call_tokens: int = MAX_SINGLE_CALL_TOKENS,
+    chunk_tokens: int = CHUNK_TOKENS,
+    map_workers: int = 4,
+    compress_tokens: int = COMPRESS_TOKENS,
+) -> Optional[str]:
+    """
+    Generate a summary using Gemini API
+
+    Content that fits in max_single_call_tokens, or that fit_single_call can
+    bring within it, is summarized in one call; longer content is split on
+    sentence/timestamp boundaries and summarized map-reduce style. If that
+    fails, its most central sentences within compress_tokens are summarized
+    in one call instead.
+
+    Args:
+        client: Gemini API client
+        content: The content to summarize (transcript, text, etc.)
+        title: Title of the content
+        content_type: Type of content (e.g., "transcript", "article", "text")
+        use_cache: Look up / store the result in the on-disk summary cache
+        max_single_call_tokens: Largest content sent as a single prompt
+        chunk_tokens: Token budget per chunk in map-reduce mode
+        map_workers: Chunks summarized concurrently
+        compress_tokens: Token budget of the fallback when map-reduce fails,
+            0 to give up instead
+    """
+    content = fit_single_call(content, content_type, max_single_call_tokens)
+    if estimate_tokens(content) > max_single_call_tokens:
+        summary = _map_reduce_summary(
+            client, content, title, content_type, use_cache, chunk_tokens, map_workers
+        )
+        if summary or compress_tokens <= 0:
+            return summary
+        print("  Falling back to a summary of the most central sentences")
+        content = compress_for_prompt(content, content_type, compress_tokens)
+    return _generate_with_template(
+        client, PROMPT_TEMPLATE, content, title, content_type, use_cache
+    )
+
+
+def generate_summaries_batch(
+    client,
+    entries: List[Tuple[str, str]],
+    content_type: str = "content",
+    use_cache: bool = True,
+) -> List[Optional[str]]:
+    """
+    Summarize several short items with a single Gemini request
+
+    Args:
+        client: Gemini API client
+        entries: (title, content) pairs
+        content_type: Type of content for the prompt
+        use_cache: Look up / store per-item results in the summary cache
+
+    Returns:
+        Summaries aligned with entries; None for items that were missing or
+        malformed in the response, so the caller can fall back to single calls
+    """
+    cache = get_default_cache() if use_cache else None
+    keys = [
+        summary_cache_key(
+            content, title, content_type, BATCH_PROMPT_TEMPLATE, GEMINI_MODEL
+        )
+        for title, content in entries
+    ]
+    results: List[Optional[str]] = [cache.get(k) if cache else None for k in keys]
+    missing = [i for i, summary in enumerate(results) if not summary]
+    if not missing:
+        return results
+
+    labels = {f"item{n}": i for n, i in enumerate(missing, 1)}
+    body = "\n\n".join(
+        f'<item id="{label}">\nTitle: {entries[i][0]}\n{entries[i][1]}\n</item>'
+        for label, i in labels.items()
+    )
+    prompt = BATCH_PROMPT_TEMPLATE.format(content_type=content_type, content=body)
+
+    try:
+        response = _generate_content(
+            client, prompt, config={"response_mime_type": "application/json"}
+        )
+        parsed = json.loads(response.text) if response and response.text else None
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        print(f"  Error generating batch summaries with Gemini: {e}")
+        return results
+
+    if not isinstance(parsed, dict):
+        print("  Warning: Batch response was not a JSON object")
+        return results
+
+    for label, i in labels.items():
+        summary = parsed.get(label)
+        if isinstance(summary, str) and summary.strip():
+            results[i] = summary.strip()
+            get_metrics().incr("summaries_generated")
+            if cache:
+                cache.put(keys[i], results[i])
+    return results
+
+
+def _summarize_in_batches(
+    client,
+    items: List[Dict[str, Any]],
+    content_field: str,
+    title_field: str,
+    content_type: str,
+    token_budget: int,
+    max_items: int,
+) -> Dict[int, str]:
+    """
+    Pack short items into batch requests of up to token_budget each
+
+    Returns:
+        Mapping of id(item) -> summary for every item the batches answered
+    """
+    # an item must leave room for a few neighbours to be worth packing
+    item_limit = token_budget // 4
+    small = [
+        item
+        for item in items
+        if estimate_tokens(str(item.get(content_field, ""))) <= item_limit
+    ]
+
+    batches: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    used = 0
+    for item in small:
+        cost = estimate_tokens(str(item[content_field]))
+        if current and (used + cost > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += cost
+    if current:
+        batches.append(current)
+
+    summaries: Dict[int, str] = {}
+    for n, batch in enumerate(batches, 1):
+        print(f"Batch {n}/{len(batches)}: {len(batch)} items in one request")
+        results = generate_summaries_batch(
+            client,
+            [
+                (item.get(title_field, "Unknown title"), str(item[content_field]))
+                for item in batch
+            ],
+            content_type,
+        )
+        for item, summary in zip(batch, results):
+            if summary:
+                summaries[id(item)] = summary
+        # Add a small delay to avoid rate limiting
+        time.sleep(REQUEST_DELAY)
+    return summaries
+
+
 def process_items_summaries(
     items: List[Dict[str, Any]],
     content_field: str = "transcript",
@@ -70,6 +393,13 @@ def process_items_summaries(
     summary_field: str = "summary",
     content_type: str = "transcript",
     api_key: Optional[str] = None,
+    journal_path: Optional[str] = None,
+    checkpoint_file: Optional[str] = None,
+    checkpoint_every: int = 10,
+    batch_token_budget: int = 0,
+    batch_max_items: int = 10,
+    batch_job: bool = False,
+    batch_label: Optional[str] = None,
 ) -> bool:
     """
     Process a list of items and generate summaries for those that need them
@@ -81,6 +411,21 @@ def process_items_summaries(
         summary_field: Field name to store the generated summary
         content_type: Type of content for the prompt (e.g., "transcript", "article")
         api_key: Gemini API key (will use environment variable if not provided)
+        journal_path: Append-only journal of finished items; journaled
+            summaries are restored instead of regenerated on restart
+        checkpoint_file: If set, items are saved here as an index file (heavy
+            fields in blobs) every checkpoint_every summaries
+        checkpoint_every: Number of generated summaries between checkpoints
+        batch_token_budget: If > 0, short items are packed into shared
+            requests of up to this many tokens; items missing from a batch
+            response fall back to a single-item call
+        batch_max_items: Maximum number of items per batch request
+        batch_job: Submit every item that fits a single request as one
+            Gemini batch job and wait for it (see batch_jobs.py); items the
+            job does not answer are left for the next run
+        batch_label: Name the batch job is kept under until it is collected,
+            one per index file; defaults to one derived from checkpoint_file
+            or journal_path
 
     Returns:
         bool: True if successful, False otherwise
@@ -94,6 +439,18 @@ def process_items_summaries(
             )
             return False
 
+    if batch_job:
+        # imported here, batch_jobs builds on this module
+        from batch_jobs import BatchJobPending, job_label, run_batch_job
+
+        index_file = checkpoint_file or journal_path
+        if not batch_label and not index_file:
+            print(
+                "Error: batch_job needs a batch_label, checkpoint_file or journal_path"
+            )
+            return False
+        batch_label = batch_label or job_label(index_file)
+
     # Setup Gemini API
     client = setup_gemini_api(api_key)
     if not client:
@@ -101,6 +458,9 @@ def process_items_summaries(
 
     print(f"Found {len(items)} items to process")
 
+    journal = ProgressJournal(journal_path) if journal_path else None
+    resume_from_journal(items, journal, summary_field)
+
     # Count items that need summaries - only summarize items that have content to summarize
     items_to_process = []
     for item in items:
@@ -115,6 +475,52 @@ def process_items_summaries(
 
     print(f"Processing {len(items_to_process)} items that need summaries...")
 
+    batched: Dict[int, str] = {}
+    if batch_token_budget > 0:
+        batched = _summarize_in_batches(
+            client,
+            items_to_process,
+            content_field,
+            title_field,
+            content_type,
+            batch_token_budget,
+            batch_max_items,
+        )
+
+    in_job = set()
+    if batch_job:
+        # compressed first: what counts is the size of the request
+        compressed = {
+            id(item): fit_single_call(str(item[content_field]), content_type)
+            for item in items_to_process
+        }
+        fits = [
+            item
+            for item in items_to_process
+            if estimate_tokens(compressed[id(item)]) <= MAX_SINGLE_CALL_TOKENS
+        ]
+        in_job = {id(item) for item in fits}
+        try:
+            results = run_batch_job(
+                client,
+                batch_label,
+                [
+                    (
+                        item_key(item),
+                        item.get(title_field, "Unknown title"),
+                        compressed[id(item)],
+                    )
+                    for item in fits
+                ],
+                content_type,
+            )
+        except BatchJobPending as e:
+            print(f"{e}, its items are left for the next run")
+            results = {}
+        for item in fits:
+            if results.get(item_key(item)):
+                batched[id(item)] = results[item_key(item)]
+
     # Process each item
     success_count = 0
     for i, item in enumerate(items_to_process, 1):
@@ -130,36 +536,57 @@ def process_items_summaries(
 
         print(f"  Content length: {len(content)} characters")
 
-        # Generate summary
-        summary = generate_summary_with_gemini(client, content, title, content_type)
+        # Generate summary, unless a batch request already produced it
+        summary = batched.get(id(item))
+        if summary:
+            print("  Summary generated in batch")
+        elif id(item) in in_job:
+            print("  No answer from the batch job, left for the next run")
+            continue
+        else:
+            summary = generate_summary_with_gemini(client, content, title, content_type)
+            # Add a small delay to avoid rate limiting
+            time.sleep(REQUEST_DELAY)
 
         if summary:
             item[summary_field] = summary
             success_count += 1
             print(f"✓ Summary generated ({len(summary)} characters)")
+            if journal:
+                journal.record(item_key(item), {summary_field: summary})
+            if checkpoint_file and success_count % checkpoint_every == 0:
+                save_index_file(items, checkpoint_file)
         else:
             item[summary_field] = ""
             print("✗ Failed to generate summary")
 
-        # Add a small delay to avoid rate limiting
-        time.sleep(1)
-
     print(
         f"\n✓ Successfully generated {success_count}/{len(items_to_process)} summaries"
     )
+    cache = get_default_cache()
+    if cache:
+        print(cache.stats())
     return True
 
 
-def load_json_file(file_path: str) -> Optional[List[Dict[str, Any]]]:
+def load_json_file(file_path: str, stream: bool = False):
     """
     Load items from a JSON file
 
     Args:
         file_path: Path to the JSON file
+        stream: Return an iterator that decodes the items of the top-level
+            array one at a time (see json_stream.py) instead of a list;
+            decoding errors are then raised while iterating
 
     Returns:
-        List of items or None if error
+        List (or iterator) of items or None if error
     """
+    if stream:
+        if not os.path.exists(file_path):
+            print(f"Error: File {file_path} not found")
+            return None
+        return iter_json_array(file_path)
     try:
         with open(file_path, "r", encoding="utf-8") as f:
             return json.load(f)
@@ -171,22 +598,187 @@ def load_json_file(file_path: str) -> Optional[List[Dict[str, Any]]]:
         return None
 
 
-def save_json_file(items: List[Dict[str, Any]], file_path: str) -> bool:
+def save_json_file(
+    items: Iterable[Dict[str, Any]], file_path: str, stream: bool = False
+) -> bool:
     """
     Save items to a JSON file
 
     Args:
         items: List of items to save
         file_path: Path to save the JSON file
+        stream: Serialize and write one item at a time instead of the whole
+            document at once; items may then be any iterable. The file is
+            byte-identical either way.
 
     Returns:
         bool: True if successful, False otherwise
     """
     try:
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(items, f, indent=2, ensure_ascii=False)
-        print(f"✓ Updated JSON saved to: {file_path}")
+        if stream:
+            written = write_json_array(items, file_path)
+        else:
+            written = atomic_write_json(items, file_path, indent=2, ensure_ascii=False)
+        if written:
+            print(f"✓ Updated JSON saved to: {file_path}")
+        else:
+            print(f"✓ {file_path} unchanged")
         return True
     except Exception as e:
         print(f"Error saving file: {e}")
         return False
+
+
+# Heavy per-item payloads live in gzip blobs next to the frontend's static
+# files; the JSON data files only keep lightweight index fields.
+BLOB_ROOT = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "frontend", "public")
+)
+HEAVY_FIELDS = ("summary", "transcript", "text")
+# summaries stay visible in the index as a short preview
+PREVIEW_FIELDS = ("summary",)
+PREVIEW_CHARS = 200
+PREVIEW_SUFFIX = "…"
+BLOB_SUFFIX = "Blob"
+_SAFE_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def _blob_id(item: Dict[str, Any]) -> str:
+    item_id = str(item.get("id", ""))
+    if _SAFE_ID_RE.match(item_id):
+        return item_id
+    key = item_id or str(item.get("url", ""))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def _preview(text: str) -> str:
+    return text[:PREVIEW_CHARS].rstrip() + PREVIEW_SUFFIX
+
+
+def _is_preview(value: Any) -> bool:
+    return (
+        isinstance(value, str)
+        and value.endswith(PREVIEW_SUFFIX)
+        and len(value) <= PREVIEW_CHARS + len(PREVIEW_SUFFIX)
+    )
+
+
+def blob_path(kind: str, field: str, item: Dict[str, Any]) -> str:
+    """
+    Blob location relative to BLOB_ROOT (and to the site root)
+    """
+    return f"blobs/{kind}/{field}/{_blob_id(item)}.json.gz"
+
+
+def save_blob(rel_path: str, value: Any) -> None:
+    """
+    Write a gzip-compressed JSON blob. Compression is deterministic
+    (mtime=0), and unchanged blobs are not rewritten.
+    """
+    path = os.path.join(BLOB_ROOT, rel_path)
+    data = gzip.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"), mtime=0)
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def load_blob(rel_path: str) -> Any:
+    with gzip.open(os.path.join(BLOB_ROOT, rel_path), "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def hydrate_item(item: Dict[str, Any], fields=HEAVY_FIELDS) -> Dict[str, Any]:
+    """
+    Replace blob references on one item with the full values, in place
+    """
+    for field in fields:
+        rel_path = item.get(field + BLOB_SUFFIX)
+        if rel_path:
+            item[field] = load_blob(rel_path)
+            del item[field + BLOB_SUFFIX]
+    return item
+
+
+def offload_item(
+    item: Dict[str, Any], kind: str, fields=HEAVY_FIELDS
+) -> Dict[str, Any]:
+    """
+    Build the index form of an item: heavy fields are written to blobs and
+    replaced by a reference (plus a preview for summaries). Fields that still
+    hold an untouched preview keep their existing blob.
+    """
+    index = dict(item)
+    for field in fields:
+        value = index.get(field)
+        if not isinstance(value, str) or not value.strip():
+            continue
+        if index.get(field + BLOB_SUFFIX) and _is_preview(value):
+            continue
+        if field in PREVIEW_FIELDS and len(value) <= PREVIEW_CHARS:
+            # short enough to stay inline
+            index.pop(field + BLOB_SUFFIX, None)
+            continue
+        rel_path = blob_path(kind, field, item)
+        save_blob(rel_path, value)
+        index[field + BLOB_SUFFIX] = rel_path
+        if field in PREVIEW_FIELDS:
+            index[field] = _preview(value)
+        else:
+            del index[field]
+    return index
+
+
+def index_kind(file_path: str) -> str:
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+def load_index_file(file_path: str, hydrate=(), stream: bool = False):
+    """
+    Load an index data file (e.g. yt.json, articles.json)
+
+    Args:
+        file_path: Path to the JSON file
+        hydrate: Heavy fields to load back from their blobs; fields that are
+            not hydrated keep their preview / blob reference
+        stream: Return an iterator over the items, see load_json_file
+
+    Returns:
+        List (or iterator) of items or None if error
+    """
+    items = load_json_file(file_path, stream)
+    if items is not None and stream and hydrate:
+        return (hydrate_item(item, hydrate) for item in items)
+    if items and hydrate:
+        for item in items:
+            hydrate_item(item, hydrate)
+    return items
+
+
+def save_index_file(
+    items: Iterable[Dict[str, Any]], file_path: str, kind: Optional[str] = None
+) -> bool:
+    """
+    Save items as a lightweight index, moving heavy fields into blobs
+
+    Args:
+        items: Items, hydrated or not; any iterable, e.g. from
+            load_index_file(..., stream=True)
+        file_path: Path to save the JSON file
+        kind: Blob namespace, defaults to the file name without extension
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    kind = kind or index_kind(file_path)
+    # items are offloaded as they are written, so neither the index list nor
+    # the serialized document is ever held in memory as a whole
+    return save_json_file(
+        (offload_item(item, kind) for item in items), file_path, stream=True
+    )
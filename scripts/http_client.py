@@ -0,0 +1,197 @@
+import glob
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from metrics import get_metrics
+from progress_journal import atomic_write_text
+from requests.adapters import HTTPAdapter
+from summary_cache import cache_dir
+
+USER_AGENT = (
+    "Mozilla/5.0 (compatible; TechdexBot/1.0; +https://github.com/tren03/Techdex)"
+)
+
+# cached pages younger than this are served without touching the network
+DEFAULT_MAX_AGE = int(os.getenv("TECHDEX_PAGE_MAX_AGE", str(7 * 86400)))
+
+# query parameters that only track where a click came from
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "igshid", "ref", "ref_src"}
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session(pool_maxsize: int = 16) -> requests.Session:
+    """
+    Process-wide requests.Session with a keep-alive connection pool per host.
+    requests.Session is safe to share between threads for plain GETs.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=32, pool_maxsize=pool_maxsize)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            _session = session
+        return _session
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so trivially different spellings of the same link share
+    one cache entry: lowercase scheme and host, no default port, no fragment,
+    no utm_* / click-tracking parameters, sorted query and no trailing slash.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") if parts.path != "/" else ""
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def dedupe_key(url: str) -> str:
+    """
+    Identity of a link for de-duplication: the canonical URL without its
+    scheme and without a leading "www.", so http/https and www variants of
+    one article collapse. Empty for anything that is not an http(s) URL.
+    """
+    canonical = canonicalize_url(url)
+    scheme, _, rest = canonical.partition("://")
+    if scheme not in ("http", "https") or not rest:
+        return ""
+    return rest[4:] if rest.startswith("www.") else rest
+
+
+class PageCache:
+    """
+    On-disk cache of fetched pages for conditional revalidation.
+
+    Each URL gets a sharded directory entry holding gzip-compressed raw HTML,
+    gzip-compressed extracted text (one file per extractor backend) and a
+    small JSON file with the validators (ETag / Last-Modified) needed for the
+    next conditional GET.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.path.join(cache_dir(), "pages")
+
+    def _base(self, url: str) -> str:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.root, digest[:2], digest)
+
+    def _read_gz(self, path: str) -> Optional[str]:
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return f.read()
+        except (OSError, EOFError):
+            return None
+
+    def _write_gz(self, path: str, text: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def meta(self, url: str) -> Dict[str, str]:
+        try:
+            with open(self._base(url) + ".json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def html(self, url: str) -> Optional[str]:
+        return self._read_gz(self._base(url) + ".html.gz")
+
+    def text(self, url: str, extractor: str = "") -> Optional[str]:
+        return self._read_gz(self._text_path(url, extractor))
+
+    def _text_path(self, url: str, extractor: str) -> str:
+        suffix = f".{extractor}" if extractor else ""
+        return self._base(url) + suffix + ".txt.gz"
+
+    def store_html(self, url: str, html: str, headers) -> None:
+        base = self._base(url)
+        self._write_gz(base + ".html.gz", html)
+        meta = {"url": url, "fetched_at": time.time()}
+        for header in ("ETag", "Last-Modified"):
+            if headers.get(header):
+                meta[header] = headers[header]
+        atomic_write_text(json.dumps(meta), base + ".json")
+        # extracted text belongs to the old HTML, drop it
+        for stale in glob.glob(glob.escape(base) + "*.txt.gz"):
+            os.remove(stale)
+
+    def mark_fresh(self, url: str, meta: Dict[str, str]) -> None:
+        meta["fetched_at"] = time.time()
+        atomic_write_text(json.dumps(meta), self._base(url) + ".json")
+
+    def store_text(self, url: str, text: str, extractor: str = "") -> None:
+        self._write_gz(self._text_path(url, extractor), text)
+
+
+_page_cache = PageCache()
+
+
+def get_page_cache() -> PageCache:
+    return _page_cache
+
+
+def fetch_html(url: str, timeout: int = 15, max_age: int = DEFAULT_MAX_AGE) -> tuple:
+    """
+    GET a page through the shared session, revalidating any cached copy
+
+    Args:
+        url: Page URL
+        timeout: Request timeout in seconds
+        max_age: Serve the cached copy without revalidating if it is younger
+            than this many seconds
+
+    Returns:
+        tuple: (html, from_cache) where from_cache is True when the stored
+            copy was still fresh or the server answered 304 Not Modified
+    """
+    cache = get_page_cache()
+    meta = cache.meta(url)
+    cached_html = cache.html(url) if meta else None
+    if cached_html is not None and time.time() - meta.get("fetched_at", 0) < max_age:
+        get_metrics().incr("page_cache_hits")
+        return cached_html, True
+
+    headers = {}
+    if cached_html is not None:
+        if meta.get("ETag"):
+            headers["If-None-Match"] = meta["ETag"]
+        if meta.get("Last-Modified"):
+            headers["If-Modified-Since"] = meta["Last-Modified"]
+
+    # resilience builds on this module, import it late
+    from resilience import request
+
+    response = request(
+        "pages", "GET", url, key=urlsplit(url).netloc, timeout=timeout, headers=headers
+    )
+    if response.status_code == 304 and cached_html is not None:
+        cache.mark_fresh(url, meta)
+        get_metrics().incr("page_cache_hits")
+        return cached_html, True
+    response.raise_for_status()
+    html = response.text
+    cache.store_html(url, html, response.headers)
+    return html, False
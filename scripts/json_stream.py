@@ -0,0 +1,119 @@
+import json
+from typing import Any, Iterable, Iterator, Optional
+
+from progress_journal import atomic_write_chunks
+
+# characters read per step; a record larger than this grows the read size
+CHUNK_CHARS = 1 << 16
+WHITESPACE = " \t\n\r"
+
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(file_path: str, chunk_chars: int = CHUNK_CHARS) -> Iterator[Any]:
+    """
+    Yield the elements of a file holding one top-level JSON array, one at a
+    time. Only the element being decoded and one read chunk are held in
+    memory, however large the file is.
+
+    Raises:
+        json.JSONDecodeError: The file is not a well-formed JSON array
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        buffer = ""
+        pos = 0
+        eof = False
+
+        def fill() -> None:
+            nonlocal buffer, pos, eof
+            # read at least as much as is buffered, so re-decoding a large
+            # record after each read stays linear overall
+            chunk = f.read(max(chunk_chars, len(buffer) - pos))
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+        def peek() -> Optional[str]:
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                    pos += 1
+                if pos < len(buffer):
+                    return buffer[pos]
+                if eof:
+                    return None
+                fill()
+
+        def expect(chars: str) -> str:
+            nonlocal pos
+            char = peek()
+            if char is None or char not in chars:
+                raise json.JSONDecodeError(
+                    f"Expected one of {chars!r} in {file_path}", buffer, pos
+                )
+            pos += 1
+            return char
+
+        expect("[")
+        if peek() == "]":
+            pos += 1
+        else:
+            while True:
+                peek()
+                while True:
+                    try:
+                        value, end = _decoder.raw_decode(buffer, pos)
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                        fill()
+                        continue
+                    # a number at the end of the buffer may continue
+                    if end < len(buffer) or eof:
+                        break
+                    fill()
+                pos = end
+                yield value
+                if expect(",]") == "]":
+                    break
+        if peek() is not None:
+            raise json.JSONDecodeError(f"Extra data in {file_path}", buffer, pos)
+
+
+def dump_json_array(
+    items: Iterable[Any], indent: Optional[int] = 2, ensure_ascii: bool = False
+) -> Iterator[str]:
+    """
+    json.dumps(list(items), indent=indent, ensure_ascii=ensure_ascii), one
+    element at a time; the joined chunks are byte-identical to it
+    """
+    pad = " " * indent if indent is not None else ""
+    empty = True
+    for item in items:
+        body = json.dumps(item, indent=indent, ensure_ascii=ensure_ascii)
+        if indent is None:
+            yield ("[" if empty else ", ") + body
+        else:
+            # newlines inside strings are escaped, so these are all structural
+            yield ("[\n" if empty else ",\n") + pad + body.replace("\n", "\n" + pad)
+        empty = False
+    if empty:
+        yield "[]"
+    else:
+        yield "]" if indent is None else "\n]"
+
+
+def write_json_array(
+    items: Iterable[Any],
+    file_path: str,
+    indent: Optional[int] = 2,
+    ensure_ascii: bool = False,
+) -> bool:
+    """
+    Write items as a JSON array without building the whole document in
+    memory, atomically and only if the bytes change
+
+    Returns:
+        bool: True if the file was written
+    """
+    return atomic_write_chunks(dump_json_array(items, indent, ensure_ascii), file_path)
@@ -0,0 +1,257 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from summary_cache import cache_dir
+
+# upper bounds (ms) of the latency histogram buckets; the last one is open
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class ServiceStats:
+    """
+    Everything recorded for one external service
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.status: Dict[str, int] = defaultdict(int)
+        self.latencies_ms: List[float] = []
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.counters: Dict[str, int] = defaultdict(int)
+
+    def to_dict(self) -> Dict[str, Any]:
+        histogram = dict.fromkeys([f"le_{b}" for b in LATENCY_BUCKETS_MS] + ["inf"], 0)
+        for ms in self.latencies_ms:
+            bucket = next((b for b in LATENCY_BUCKETS_MS if ms <= b), None)
+            histogram[f"le_{bucket}" if bucket else "inf"] += 1
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "status": dict(self.status),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "latency_ms": {
+                "p50": _percentile(self.latencies_ms, 50),
+                "p95": _percentile(self.latencies_ms, 95),
+                "max": max(self.latencies_ms, default=0.0),
+                "total": sum(self.latencies_ms),
+                "histogram": histogram,
+            },
+            **self.counters,
+        }
+
+
+class Call:
+    """
+    One outbound call, filled in by the caller inside Metrics.track
+    """
+
+    def __init__(self):
+        self.status: Optional[Any] = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.counters: Dict[str, int] = defaultdict(int)
+
+    def response(self, response, streamed: bool = False) -> None:
+        """
+        Take status and sizes from a requests.Response: Content-Length when
+        the server sent one, otherwise the size of the body. The body of a
+        streamed response is not read here; without Content-Length, count
+        its bytes with add_bytes_in instead.
+        """
+        self.status = response.status_code
+        body = response.request.body if response.request is not None else None
+        self.bytes_out += len(body) if body else 0
+        length = response.headers.get("Content-Length", "")
+        if length.isdigit():
+            self.bytes_in += int(length)
+        elif not streamed:
+            self.bytes_in += len(response.content)
+
+    def add_bytes_in(self, n: int) -> None:
+        self.bytes_in += n
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] += n
+
+
+class Metrics:
+    """
+    Thread-safe per-service call metrics for one run of a script
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.services: Dict[str, ServiceStats] = defaultdict(ServiceStats)
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def track(self, service: str) -> "_Tracker":
+        """
+        Context manager timing one call to service:
+
+            with metrics.track("youtube") as call:
+                response = session.get(...)
+                call.response(response)
+        """
+        return _Tracker(self, service)
+
+    def _finish(self, service: str, call: Call, seconds: float, failed: bool):
+        with self._lock:
+            stats = self.services[service]
+            stats.calls += 1
+            stats.latencies_ms.append(seconds * 1000)
+            stats.bytes_in += call.bytes_in
+            stats.bytes_out += call.bytes_out
+            if call.status is not None:
+                stats.status[str(call.status)] += 1
+            if failed or (isinstance(call.status, int) and call.status >= 400):
+                stats.errors += 1
+            for name, n in call.counters.items():
+                stats.counters[name] += n
+
+    def add_bytes_in(self, service: str, n: int) -> None:
+        """
+        Bytes of a streamed body, read after its call was recorded
+        """
+        with self._lock:
+            self.services[service].bytes_in += n
+
+    def retry(self, service: str) -> None:
+        with self._lock:
+            self.services[service].retries += 1
+
+    def incr(self, name: str, n: int = 1) -> None:
+        """
+        Run-level counter, e.g. summaries generated or cache hits
+        """
+        with self._lock:
+            self.counters[name] += n
+
+    def stage(self, name: str, seconds: float, status: str) -> None:
+        with self._lock:
+            self.stages[name] = {"seconds": seconds, "status": status}
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "script": os.path.basename(sys.argv[0]) or "python",
+                "started_at": time.strftime(
+                    "%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started_at)
+                ),
+                "wall_seconds": time.time() - self.started_at,
+                "services": {
+                    name: stats.to_dict() for name, stats in self.services.items()
+                },
+                "counters": dict(self.counters),
+                "stages": dict(self.stages),
+            }
+
+    def write_report(self, path: Optional[str] = None) -> Optional[str]:
+        """
+        Write the JSON report (default: <cache dir>/reports/<time>-<script>.json)
+
+        Returns:
+            The path written, or None if nothing was recorded
+        """
+        report = self.report()
+        if not report["services"] and not report["stages"]:
+            return None
+        if not path:
+            script = os.path.splitext(report["script"])[0]
+            stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(self.started_at))
+            path = os.path.join(cache_dir(), "reports", f"{stamp}-{script}.json")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        return path
+
+    def summary(self) -> str:
+        report = self.report()
+        lines = [
+            f"{'service':<12} {'calls':>6} {'errors':>6} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'total s':>8} {'MB in':>7} {'MB out':>7}"
+        ]
+        for name, s in sorted(report["services"].items()):
+            latency = s["latency_ms"]
+            lines.append(
+                f"{name:<12} {s['calls']:>6} {s['errors']:>6} {latency['p50']:>8.0f} "
+                f"{latency['p95']:>8.0f} {latency['total'] / 1000:>8.1f} "
+                f"{s['bytes_in'] / 1e6:>7.2f} {s['bytes_out'] / 1e6:>7.2f}"
+            )
+        for name, value in sorted(report["counters"].items()):
+            lines.append(f"{name}: {value}")
+        return "\n".join(lines)
+
+
+class _Tracker:
+    def __init__(self, metrics: Metrics, service: str):
+        self.metrics = metrics
+        self.service = service
+        self.call = Call()
+
+    def __enter__(self) -> Call:
+        self.start = time.perf_counter()
+        return self.call
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc is not None and self.call.status is None:
+            # requests' HTTPError, google-genai's APIError, ...
+            response = getattr(exc, "response", None)
+            self.call.status = (
+                getattr(exc, "code", None)
+                or getattr(response, "status_code", None)
+                or type(exc).__name__
+            )
+        self.metrics._finish(
+            self.service, self.call, time.perf_counter() - self.start, exc is not None
+        )
+        return False
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    return _metrics
+
+
+def _write_at_exit() -> None:
+    """
+    Every script writes its report when it exits. TECHDEX_METRICS=0 turns
+    reports off, TECHDEX_METRICS_REPORT picks the path and
+    TECHDEX_METRICS_CONSOLE=1 also prints a summary table.
+    """
+    if os.getenv("TECHDEX_METRICS", "1") == "0":
+        return
+    try:
+        path = _metrics.write_report(os.getenv("TECHDEX_METRICS_REPORT"))
+    except OSError as e:
+        print(f"Warning: could not write metrics report: {e}")
+        return
+    if path:
+        if os.getenv("TECHDEX_METRICS_CONSOLE") == "1":
+            print(_metrics.summary())
+        print(f"Metrics report written to {path}")
+
+
+atexit.register(_write_at_exit)
@@ -0,0 +1,366 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from generate_summaries import hydrate_item
+from metrics import get_metrics
+from progress_journal import item_key
+from summary_cache import cache_dir
+
+FINGERPRINT_BITS = 64
+BAND_BITS = 8
+BANDS = FINGERPRINT_BITS // BAND_BITS
+# syndicated copies with a different intro/outro or light edits land within a
+# few bits; unrelated texts are ~32 bits apart and practically never below 10
+DEFAULT_MAX_DISTANCE = 6
+# too little text makes fingerprints of unrelated pages collide
+MIN_TOKENS = 50
+SHINGLE_SIZE = 3
+TOKEN_RE = re.compile(r"\w+")
+# summarized items fingerprinted per run until the whole corpus is indexed
+BACKFILL_LIMIT = int(os.getenv("TECHDEX_NEAR_DUPLICATE_BACKFILL", "50"))
+
+
+def simhash(text: str) -> Optional[int]:
+    """
+    64-bit SimHash over the set of word 3-gram shingles of text
+
+    Returns:
+        The fingerprint, or None if the text is too short to fingerprint
+    """
+    tokens = TOKEN_RE.findall(text.lower())
+    if len(tokens) < MIN_TOKENS:
+        return None
+    shingles = {
+        " ".join(tokens[i : i + SHINGLE_SIZE])
+        for i in range(len(tokens) - SHINGLE_SIZE + 1)
+    }
+    digests = [
+        hashlib.blake2b(s.encode("utf-8"), digest_size=FINGERPRINT_BITS // 8).digest()
+        for s in shingles
+    ]
+    # count byte values per position instead of looping over every bit of
+    # every shingle; zip and Counter do the heavy lifting in C
+    half = len(digests) / 2
+    fingerprint = 0
+    for position, column in enumerate(zip(*digests)):
+        counts = Counter(column)
+        for bit in range(8):
+            ones = sum(n for value, n in counts.items() if value >> bit & 1)
+            if ones > half:
+                fingerprint |= 1 << (position * 8 + bit)
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _bands(fingerprint: int) -> List[int]:
+    mask = (1 << BAND_BITS) - 1
+    return [fingerprint >> (i * BAND_BITS) & mask for i in range(BANDS)]
+
+
+def _to_signed(fingerprint: int) -> int:
+    # SQLite integers are signed 64-bit
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+class NearDuplicateIndex:
+    """
+    Persistent SimHash index backed by SQLite.
+
+    Fingerprints are split into eight 8-bit bands, each indexed. Two
+    fingerprints less than eight bits apart share at least one band exactly,
+    so a lookup reads only the rows that match a band instead of scanning
+    every fingerprint. Inserts are incremental: each run only adds the items
+    it fetched, plus a backfill of already summarized items. Items whose text
+    was too short to fingerprint are remembered as checked, so the backfill
+    does not fetch them again.
+    """
+
+    def __init__(
+        self, path: Optional[str] = None, max_distance: int = DEFAULT_MAX_DISTANCE
+    ):
+        if max_distance >= BANDS:
+            raise ValueError(f"max_distance must be below {BANDS} for band lookups")
+        self.path = path or os.path.join(cache_dir(), "near_duplicates.sqlite")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.max_distance = max_distance
+        self.duplicates = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                fingerprint INTEGER NOT NULL,
+                {bands},
+                created_at REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            )
+            """.format(
+                bands=", ".join(f"b{band} INTEGER NOT NULL" for band in range(BANDS))
+            )
+        )
+        for band in range(BANDS):
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_fingerprints_b{band} "
+                f"ON fingerprints(kind, b{band})"
+            )
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS checked (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (kind, key)
+            )
+            """)
+        self._conn.commit()
+
+    def find(self, kind: str, fingerprint: int) -> List[Tuple[str, int]]:
+        """
+        Keys of indexed items within max_distance of fingerprint
+
+        Returns:
+            list: (key, distance) pairs, closest first
+        """
+        bands = _bands(fingerprint)
+        where = " OR ".join(f"b{band} = ?" for band in range(BANDS))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, fingerprint FROM fingerprints WHERE kind = ? AND ({where})",
+                (kind, *bands),
+            ).fetchall()
+        matches = []
+        for key, stored in rows:
+            distance = hamming_distance(fingerprint, stored & ((1 << 64) - 1))
+            if distance <= self.max_distance:
+                matches.append((key, distance))
+        return sorted(matches, key=lambda match: match[1])
+
+    def add(self, kind: str, key: str, fingerprint: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fingerprints VALUES "
+                f"(?, ?, ?, {', '.join('?' * BANDS)}, ?)",
+                (kind, key, _to_signed(fingerprint), *_bands(fingerprint), time.time()),
+            )
+            self._conn.commit()
+
+    def get(self, kind: str, key: str) -> Optional[int]:
+        """
+        Fingerprint indexed under key, if any
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint FROM fingerprints WHERE kind = ? AND key = ?",
+                (kind, key),
+            ).fetchone()
+        return row[0] & ((1 << 64) - 1) if row else None
+
+    def mark_checked(self, kind: str, key: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO checked VALUES (?, ?)", (kind, key)
+            )
+            self._conn.commit()
+
+    def known_keys(self, kind: str) -> set:
+        """
+        Keys that are indexed or were found too short to fingerprint
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM fingerprints WHERE kind = ? "
+                "UNION SELECT key FROM checked WHERE kind = ?",
+                (kind, kind),
+            ).fetchall()
+        return {key for (key,) in rows}
+
+    def mark_duplicate(self) -> None:
+        with self._lock:
+            self.duplicates += 1
+
+    def count(self, kind: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM fingerprints WHERE kind = ?", (kind,)
+            ).fetchone()[0]
+
+    def stats(self, kind: str) -> str:
+        return (
+            f"near-duplicate index: {self.count(kind)} {kind} fingerprints, "
+            f"{self.duplicates} duplicates reused this run"
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_default_index: Optional[NearDuplicateIndex] = None
+_default_lock = threading.Lock()
+
+
+def get_default_index() -> Optional[NearDuplicateIndex]:
+    """
+    Process-wide index. Returns None when disabled with TECHDEX_NEAR_DUPLICATES=0.
+    """
+    global _default_index
+    if os.getenv("TECHDEX_NEAR_DUPLICATES", "1") == "0":
+        return None
+    with _default_lock:
+        if _default_index is None:
+            try:
+                _default_index = NearDuplicateIndex()
+            except sqlite3.Error as e:
+                print(f"Warning: near-duplicate index unavailable: {e}")
+                return None
+        return _default_index
+
+
+def reuse_duplicate_summary(
+    item: Dict, text: str, kind: str, items_by_key: Dict[str, Dict]
+) -> bool:
+    """
+    Check text against the index before it is summarized.
+
+    If it is a near-duplicate of an item that already has a summary, that
+    summary is copied onto item, item["duplicateOf"] is set to the original's
+    id and True is returned. Otherwise the text is indexed under item's key
+    (so later copies find it) and False is returned.
+
+    Args:
+        item: Item about to be summarized
+        text: Its extracted text or transcript
+        kind: Index namespace, e.g. "articles" or "yt"
+        items_by_key: Items of the same data file by item_key, to read the
+            original's summary from
+    """
+    index = get_default_index()
+    fingerprint = simhash(text) if index else None
+    if fingerprint is None:
+        return False
+
+    key = item_key(item)
+    for match_key, distance in index.find(kind, fingerprint):
+        original = items_by_key.get(match_key)
+        if match_key == key or not original:
+            continue
+        if not (original.get("summary") or "").strip():
+            continue
+        summary = hydrate_item(dict(original), ("summary",))["summary"]
+        item["summary"] = summary
+        item["duplicateOf"] = original.get("id", match_key)
+        index.mark_duplicate()
+        get_metrics().incr("near_duplicates_reused")
+        print(f"  Near-duplicate of {match_key} ({distance} bits), reusing its summary")
+        return True
+
+    index.add(kind, key, fingerprint)
+    return False
+
+
+def summary_fields(item: Dict) -> Dict:
+    """
+    Fields to journal for a finished item: its summary and, for a reused
+    summary, the item it was copied from
+    """
+    fields = {"summary": item["summary"]}
+    if item.get("duplicateOf") is not None:
+        fields["duplicateOf"] = item["duplicateOf"]
+    return fields
+
+
+def unindexed_items(
+    items: Iterable[Dict], kind: str, limit: int = BACKFILL_LIMIT
+) -> List[Dict]:
+    """
+    Up to limit summarized items the index has not seen yet. Their texts are
+    passed to index_texts, so re-added copies of them are caught.
+    """
+    index = get_default_index()
+    if not index or limit <= 0:
+        return []
+    known = index.known_keys(kind)
+    todo = []
+    for item in items:
+        if not (item.get("summary") or "").strip() or item.get("duplicateOf"):
+            continue
+        key = item_key(item)
+        if key and key not in known:
+            todo.append(item)
+            if len(todo) >= limit:
+                break
+    return todo
+
+
+def index_texts(kind: str, items: List[Dict], texts: Iterable[Optional[str]]) -> int:
+    """
+    Fingerprint already summarized items from their texts. Items whose text
+    could not be fetched are left for the next backfill.
+
+    Returns:
+        int: Number of items fingerprinted
+    """
+    index = get_default_index()
+    if not index:
+        return 0
+    added = 0
+    for item, text in zip(items, texts):
+        if not text:
+            continue
+        fingerprint = simhash(text)
+        if fingerprint is None:
+            index.mark_checked(kind, item_key(item))
+            continue
+        index.add(kind, item_key(item), fingerprint)
+        added += 1
+    if added:
+        print(f"  Backfilled {added} {kind} fingerprints")
+    return added
+
+
+def near_duplicate_keys(item: Dict, kind: str) -> List[str]:
+    """
+    Keys of other indexed items that are near-duplicates of item, which must
+    have been indexed already (see reuse_duplicate_summary)
+    """
+    index = get_default_index()
+    key = item_key(item)
+    fingerprint = index.get(kind, key) if index else None
+    if fingerprint is None:
+        return []
+    return [match for match, _ in index.find(kind, fingerprint) if match != key]
+
+
+def share_summary(item: Dict, kind: str, items_by_key: Dict[str, Dict]) -> List[Dict]:
+    """
+    Check for duplicates again once item has its summary: near-duplicates
+    from the same run that were checked while it had none get it too.
+
+    Returns:
+        list: The items that received the summary
+    """
+    summary = (item.get("summary") or "").strip()
+    if not summary:
+        return []
+    shared = []
+    for match_key in near_duplicate_keys(item, kind):
+        other = items_by_key.get(match_key)
+        if other is None or (other.get("summary") or "").strip():
+            continue
+        other["summary"] = item["summary"]
+        other["duplicateOf"] = item.get("id", item_key(item))
+        get_default_index().mark_duplicate()
+        get_metrics().incr("near_duplicates_reused")
+        print(f"  {match_key} is a near-duplicate, sharing its new summary")
+        shared.append(other)
+    return shared
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Move heavy fields (summaries, transcripts, extracted text) of data files into
+per-item gzip blobs, leaving a lightweight index behind.
+
+Usage:
+    python offload_blobs.py ../frontend/src/data/yt.json ../frontend/src/data/articles.json
+"""
+
+import sys
+
+from generate_summaries import load_index_file, save_index_file
+
+
+def offload_file(file_path: str) -> bool:
+    # items are streamed from the old file into the new one, so memory use
+    # does not depend on the size of the file
+    items = load_index_file(file_path, stream=True)
+    if items is None:
+        return False
+    return save_index_file(items, file_path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    ok = all([offload_file(path) for path in sys.argv[1:]])
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Nightly ingestion pipeline.
+
+Runs every fetcher in a single process as a dependency graph instead of one
+workflow (and one pip install) per source. Independent branches (CTF,
+articles, YouTube) run concurrently; items are passed between stages in
+memory, so every data file is loaded once and written once at the end of its
+branch. Each stage reports its wall time; stage timings and per-service call
+metrics (see metrics.py) are also written to a JSON report at exit.
+
+Stages, in dependency order (see build_stages for the exact graph):
+
+    articles:  sheets, articles_check, articles_load, articles_merge, titles,
+               article_summaries, articles_save, then articles_search and
+               articles_pages
+    youtube:   yt_sync, yt_load, yt_summaries, yt_save, then yt_search and
+               yt_pages
+    shared:    related, once both search indexes are built
+    finish:    articles_done and yt_done, once their branch's outputs and
+               related are written
+    ctf:       runs on its own
+
+The check stages compare the upstream data (sheet links, playlist sync) and
+the data file on disk with the fingerprints recorded the last time the
+branch finished (see fingerprints.py). If nothing changed, the stage returns
+UNCHANGED and the rest of its branch is skipped. A branch's fingerprint is
+only recorded by its *_done stage, once every output (search index, pages
+and related items) has been written, and only if no summary failed, so
+failed outputs and summaries are retried on the next run. Items without
+content (dead pages, videos without transcripts) do not block it; the
+fingerprints expire after a week so those still get retried. Outputs are
+only rewritten when their bytes change.
+
+Usage:
+    python pipeline.py [--full-resync] [--force] [--batch-job] [--rps 1.0]
+"""
+
+import argparse
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Tuple
+
+from build_pages import build_for_file as build_pages
+from build_search_index import DATA_DIR, write_index
+from fetch_and_summarize_articles import DEFAULT_EXTRACTOR, summarize_articles
+from fetch_articles_name import fill_missing_titles
+from fetch_articles_sheets import get_links_from_csv, new_articles_for_links
+from fetch_ctf import update_ctf_json
+from fetch_youtube import find_new_videos
+from fetch_yt_transcript import summarize_videos
+from fingerprints import FingerprintStore, content_hash, file_hash
+from generate_summaries import setup_gemini_api
+from metrics import get_metrics
+from progress_journal import ProgressJournal, default_journal_path, resume_from_journal
+from record_store import RecordStore
+from related_items import update_related
+
+ARTICLES_PATH = os.path.join(DATA_DIR, "articles.json")
+YT_PATH = os.path.join(DATA_DIR, "yt.json")
+
+# name -> (function, names of the stages whose results it takes as arguments)
+Stages = Dict[str, Tuple[Callable[..., Any], Tuple[str, ...]]]
+
+# returned by a stage whose inputs did not change; its dependents are skipped
+UNCHANGED = object()
+
+
+def _load(path: str, hydrate=()) -> RecordStore:
+    store = RecordStore.load(path, hydrate)
+    if store is None:
+        raise RuntimeError(f"could not load {path}")
+    return store
+
+
+def _save(store: RecordStore) -> RecordStore:
+    if not store.save():
+        raise RuntimeError(f"could not save {store.path}")
+    # everything the journal held is in the data file now
+    ProgressJournal(default_journal_path(store.path)).clear()
+    return store
+
+
+def build_stages(args: argparse.Namespace) -> Stages:
+    """
+    The nightly refresh as a DAG of stages
+    """
+    fingerprints = FingerprintStore()
+    # one Gemini client for both branches
+    client = setup_gemini_api(os.getenv("GEMINI_API_KEY") or "")
+    # upstream digests of this run, recorded once their branch has finished
+    upstream: Dict[str, str] = {}
+    # summaries that failed this run; a branch with any is not fingerprinted
+    failed: Dict[str, int] = {}
+
+    def unchanged(name: str, digest: str, path: str) -> bool:
+        upstream[name] = digest
+        if args.force:
+            return False
+        if not fingerprints.unchanged(name, content_hash([digest, file_hash(path)])):
+            return False
+        print(f"{name}: upstream and data file unchanged since the last run")
+        return True
+
+    def finish_branch(name: str, path: str) -> None:
+        if failed.get(name):
+            # the next run must not skip the items that failed
+            print(f"{name}: {failed[name]} summaries failed, branch not fingerprinted")
+            fingerprints.forget(name)
+            return
+        # the digest the next run will compute if nothing changes meanwhile
+        fingerprints.record(name, content_hash([upstream[name], file_hash(path)]))
+
+    def check_articles(links):
+        if links is None:
+            raise RuntimeError("could not read the link sheet")
+        if unchanged("articles", content_hash(["\n".join(links)]), ARTICLES_PATH):
+            return UNCHANGED
+        return links
+
+    def merge_links(articles, links):
+        added = articles.extend(new_articles_for_links(articles.items, links))
+        print(f"{added} new links from the sheet")
+        return articles
+
+    def titles(articles):
+        fill_missing_titles(articles.items)
+        return articles
+
+    def article_summaries(articles):
+        journal = ProgressJournal(default_journal_path(ARTICLES_PATH))
+        resume_from_journal(articles.items, journal, "summary")
+        if not client:
+            # still save the merged links and titles
+            print("Gemini API client setup failed, skipping article summaries.")
+            failed["articles"] = sum(
+                1 for article in articles.items if not article.get("summary")
+            )
+            return articles
+        _, failed["articles"] = summarize_articles(
+            client,
+            articles.items,
+            journal,
+            pipeline=True,
+            fetch_workers=args.fetch_workers,
+            summary_workers=args.summary_workers,
+            requests_per_second=args.rps,
+            extractor=DEFAULT_EXTRACTOR,
+            batch_job=args.batch_job,
+        )
+        return articles
+
+    def yt_sync():
+        # the lightweight index is enough to tell which videos are new
+        videos = _load(YT_PATH)
+        new_videos = find_new_videos(videos.items, args.full_resync)
+        print(f"Added {len(new_videos)} new videos.")
+        # the sync itself is the upstream check: nothing new means no change
+        if not new_videos and unchanged("yt", "", YT_PATH):
+            return UNCHANGED
+        upstream["yt"] = ""
+        videos.extend(new_videos)
+        return videos
+
+    def articles_search(articles):
+        write_index("articles", articles.items)
+
+    def yt_search(videos):
+        write_index("yt", videos.items)
+
+    def pages(name: str) -> None:
+        # built from the saved index file: previews, not full summaries
+        if not build_pages(name):
+            raise RuntimeError(f"could not build the {name} pages")
+
+    def related(*_):
+        # reads every data file itself, papers and podcasts included
+        if not update_related(full=args.force):
+            raise RuntimeError("could not update related items")
+
+    def yt_summaries(videos):
+        journal = ProgressJournal(default_journal_path(YT_PATH))
+        resume_from_journal(videos.items, journal, "summary")
+        # no checkpoints: the journal already covers a crash mid-branch
+        failed["yt"] = summarize_videos(videos.items, journal, client=client)
+        return videos
+
+    return {
+        "ctf": (update_ctf_json, ()),
+        "sheets": (get_links_from_csv, ()),
+        "articles_check": (check_articles, ("sheets",)),
+        # summaries are hydrated so the search index sees the full text
+        "articles_load": (
+            lambda _: _load(ARTICLES_PATH, hydrate=("summary",)),
+            ("articles_check",),
+        ),
+        "articles_merge": (merge_links, ("articles_load", "articles_check")),
+        "titles": (titles, ("articles_merge",)),
+        "article_summaries": (article_summaries, ("titles",)),
+        "articles_save": (_save, ("article_summaries",)),
+        "articles_search": (articles_search, ("articles_save",)),
+        "articles_pages": (lambda _: pages("articles"), ("articles_save",)),
+        "yt_sync": (yt_sync, ()),
+        "yt_load": (lambda videos: videos.hydrate(("summary",)), ("yt_sync",)),
+        "yt_summaries": (yt_summaries, ("yt_load",)),
+        "yt_save": (_save, ("yt_summaries",)),
+        "yt_search": (yt_search, ("yt_save",)),
+        "yt_pages": (lambda _: pages("yt"), ("yt_save",)),
+        "related": (related, ("articles_search", "yt_search")),
+        # record the fingerprint only once every output of the branch is done
+        "articles_done": (
+            lambda *_: finish_branch("articles", ARTICLES_PATH),
+            ("articles_search", "articles_pages", "related"),
+        ),
+        "yt_done": (
+            lambda *_: finish_branch("yt", YT_PATH),
+            ("yt_search", "yt_pages", "related"),
+        ),
+    }
+
+
+def run_stages(stages: Stages, max_workers: int = 0) -> Dict[str, Dict[str, Any]]:
+    """
+    Run stages as soon as all their dependencies have finished
+
+    A failing stage does not stop unrelated branches; everything downstream
+    of it is skipped. A stage that returns UNCHANGED counts as done, and
+    everything downstream of it is skipped as unchanged too, unless it also
+    depends on a branch that did change: then it runs with None for the
+    unchanged inputs.
+
+    Args:
+        stages: Stage graph, see build_stages
+        max_workers: Thread count, defaults to one per stage
+
+    Returns:
+        dict: name -> {"status", "seconds", "result"} for every stage
+    """
+    for name, (_, deps) in stages.items():
+        unknown = [dep for dep in deps if dep not in stages]
+        if unknown:
+            raise ValueError(f"Stage '{name}' depends on unknown {unknown}")
+
+    report: Dict[str, Dict[str, Any]] = {}
+    running = {}
+
+    def timed(name, fn, inputs):
+        start = time.perf_counter()
+        try:
+            return fn(*inputs)
+        finally:
+            report[name] = {"seconds": time.perf_counter() - start}
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(stages)) as pool:
+        while True:
+            for name, (fn, deps) in stages.items():
+                if name in report or name in running.values():
+                    continue
+                statuses = [report.get(dep, {}).get("status") for dep in deps]
+                if any(status in ("failed", "skipped") for status in statuses):
+                    report[name] = {"status": "skipped", "seconds": 0.0}
+                    print(f"- {name} skipped")
+                    continue
+                if statuses and all(status == "unchanged" for status in statuses):
+                    report[name] = {"status": "unchanged", "seconds": 0.0}
+                    continue
+                if all(status in ("ok", "unchanged") for status in statuses):
+                    inputs = [report[dep].get("result") for dep in deps]
+                    print(f"→ {name} started")
+                    running[pool.submit(timed, name, fn, inputs)] = name
+
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    result = future.result()
+                    if result is UNCHANGED:
+                        report[name]["status"] = "unchanged"
+                        print(f"= {name} unchanged, skipping its dependents")
+                        continue
+                    report[name]["result"] = result
+                    report[name]["status"] = "ok"
+                    print(f"✓ {name} finished in {report[name]['seconds']:.1f}s")
+                except Exception:
+                    report[name]["status"] = "failed"
+                    print(f"✗ {name} failed after {report[name]['seconds']:.1f}s")
+                    traceback.print_exc()
+
+    return {name: report[name] for name in stages}
+
+
+def print_report(report: Dict[str, Dict[str, Any]], wall_seconds: float) -> None:
+    print("\nStage                  Status      Seconds")
+    for name, entry in report.items():
+        print(f"{name:<22} {entry['status']:<10} {entry['seconds']:>8.1f}")
+    stage_total = sum(entry["seconds"] for entry in report.values())
+    print(f"Wall time {wall_seconds:.1f}s (stages add up to {stage_total:.1f}s)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the nightly data refresh")
+    parser.add_argument(
+        "--full-resync",
+        action="store_true",
+        help="page through the whole YouTube playlist instead of syncing incrementally",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="run every stage even if its inputs have not changed",
+    )
+    parser.add_argument("--fetch-workers", type=int, default=8)
+    parser.add_argument("--summary-workers", type=int, default=4)
+    parser.add_argument(
+        "--rps", type=float, default=1.0, help="Gemini requests per second"
+    )
+    parser.add_argument(
+        "--batch-job",
+        action="store_true",
+        help="summarize articles as one Gemini batch job",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = run_stages(build_stages(args))
+    print_report(report, time.perf_counter() - start)
+
+    metrics = get_metrics()
+    for name, entry in report.items():
+        metrics.stage(name, entry["seconds"], entry["status"])
+    print(f"\n{metrics.summary()}")
+    done = ("ok", "unchanged")
+    return 0 if all(entry["status"] in done for entry in report.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+import filecmp
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from summary_cache import cache_dir
+
+
+def _has_contents(file_path: str, data: bytes) -> bool:
+    try:
+        if os.path.getsize(file_path) != len(data):
+            return False
+        with open(file_path, "rb") as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+
+def atomic_write_text(text: str, file_path: str) -> bool:
+    """
+    Write text to file_path via a temp file in the same directory and
+    os.replace, so readers only ever see the old or the complete new file.
+    A file that already holds exactly these bytes is left untouched.
+
+    Returns:
+        bool: True if the file was written
+    """
+    data = text.encode("utf-8")
+    if _has_contents(file_path, data):
+        return False
+    return atomic_write_chunks((text,), file_path)
+
+
+def atomic_write_chunks(chunks: Iterable[str], file_path: str) -> bool:
+    """
+    atomic_write_text for text produced piece by piece: chunks go to the temp
+    file as they come, so the whole text is never held in memory. A file that
+    already holds exactly these bytes is left untouched.
+
+    Returns:
+        bool: True if the file was written
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(file_path)}.", suffix=".tmp"
+    )
+    try:
+        # mkstemp creates 0600 files; keep the target's mode, or the usual default
+        try:
+            mode = os.stat(file_path).st_mode & 0o777
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp_path, mode)
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(file_path) and filecmp.cmp(
+            tmp_path, file_path, shallow=False
+        ):
+            os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
+
+
+def atomic_write_json(data: Any, file_path: str, **dump_kwargs) -> bool:
+    """
+    Serialize data with json.dumps(**dump_kwargs) and write it atomically
+
+    Returns:
+        bool: True if the file was written, False if it was already identical
+    """
+    return atomic_write_text(json.dumps(data, **dump_kwargs), file_path)
+
+
+def default_journal_path(data_file: str) -> str:
+    """
+    Journal location for a data file, kept next to the other caches
+    """
+    name = os.path.basename(data_file)
+    return os.path.join(cache_dir(), "journals", f"{name}.jsonl")
+
+
+def item_key(item: Dict[str, Any]) -> str:
+    """
+    Stable key used to match journal entries back to items
+    """
+    for field in ("url", "id", "title"):
+        if item.get(field):
+            return f"{field}:{item[field]}"
+    return ""
+
+
+class ProgressJournal:
+    """
+    Append-only JSONL log of finished items.
+
+    Every completed item is appended and fsynced immediately, so a crash loses
+    at most the item in flight. On restart `load()` returns the recorded
+    fields per key and the runner re-applies them instead of calling the API.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        entries: Dict[str, Dict[str, Any]] = {}
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # the last line may be torn if we died mid-write
+                    continue
+                entries.setdefault(entry["key"], {}).update(entry["fields"])
+        return entries
+
+    def record(self, key: str, fields: Dict[str, Any]) -> None:
+        line = json.dumps({"key": key, "fields": fields}, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def clear(self) -> None:
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+def resume_from_journal(items, journal: Optional[ProgressJournal], field: str) -> int:
+    """
+    Copy journaled values of `field` onto items that are still missing it,
+    together with the fields journaled alongside it (e.g. duplicateOf)
+
+    Returns:
+        int: Number of items restored
+    """
+    if not journal:
+        return 0
+    entries = journal.load()
+    restored = 0
+    for item in items:
+        entry = entries.get(item_key(item))
+        if entry and entry.get(field) and not str(item.get(field) or "").strip():
+            item.update(entry)
+            restored += 1
+    if restored:
+        print(f"Resumed {restored} items from journal {journal.path}")
+    return restored
@@ -0,0 +1,85 @@
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by every worker that talks to the same API.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. A caller
+    that finds the bucket empty reserves its token anyway (the balance goes
+    negative) and sleeps outside the lock, so waiting workers queue up in
+    arrival order instead of spinning on the lock.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last
+        self._last = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take `tokens` from the bucket, blocking until they are available
+
+        Args:
+            tokens: Number of tokens the call costs
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Caps the number of calls in flight to one service, AIMD style.
+
+    Every success raises the limit by 1/limit (so roughly +1 per full window
+    of successes); every throttle or server error halves it. The limit
+    settles just below the concurrency the upstream tolerates and climbs back
+    once it recovers.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        if max_limit < min_limit or min_limit < 1:
+            raise ValueError("need 1 <= min_limit <= max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, overloaded: bool = False) -> None:
+        """
+        Args:
+            overloaded: The call was throttled or hit a server error
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if overloaded:
+                self.limit = max(self.min_limit, self.limit / 2)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._cond.notify_all()
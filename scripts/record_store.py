@@ -0,0 +1,120 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from generate_summaries import (
+    hydrate_item,
+    index_kind,
+    load_index_file,
+    save_index_file,
+)
+from progress_journal import item_key
+
+
+class RecordStore:
+    """
+    The items of one data file (articles.json, yt.json), loaded once and
+    saved once.
+
+    Items stay in file order in `items` and are shared with the caller, so
+    in-place edits land in the store. Hash indexes by id, url and item_key
+    make lookups and merges O(1) per record instead of a scan over the
+    whole file. Saving goes through save_index_file: heavy fields are
+    offloaded to blobs and the file is only rewritten if its bytes change.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        items: Optional[List[Dict[str, Any]]] = None,
+        kind: Optional[str] = None,
+    ):
+        self.path = path
+        self.kind = kind or index_kind(path)
+        self.items: List[Dict[str, Any]] = []
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_url: Dict[str, Dict[str, Any]] = {}
+        self._by_key: Dict[str, Dict[str, Any]] = {}
+        # loaded items are kept as they are, even if the file has duplicates
+        for item in items or []:
+            self.items.append(item)
+            self._index(item)
+
+    @classmethod
+    def load(cls, path: str, hydrate=()) -> Optional["RecordStore"]:
+        """
+        Args:
+            path: Data file
+            hydrate: Heavy fields to load back from their blobs
+
+        Returns:
+            The store, or None if the file could not be read
+        """
+        items = load_index_file(path, hydrate)
+        if items is None:
+            return None
+        if not isinstance(items, list):
+            print(f"Error: {path} is not a list of items")
+            return None
+        return cls(path, items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.items)
+
+    def _index(self, item: Dict[str, Any]) -> None:
+        if item.get("id") not in (None, ""):
+            self._by_id.setdefault(str(item["id"]), item)
+        if item.get("url"):
+            self._by_url.setdefault(item["url"], item)
+        key = item_key(item)
+        if key:
+            self._by_key.setdefault(key, item)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Item by its item_key ("url:...", "id:...")
+        """
+        return self._by_key.get(key)
+
+    def by_id(self, item_id: Any) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(str(item_id))
+
+    def by_url(self, url: str) -> Optional[Dict[str, Any]]:
+        return self._by_url.get(url)
+
+    def add(self, item: Dict[str, Any]) -> bool:
+        """
+        Append item unless one with the same url or id is already stored
+
+        Returns:
+            bool: True if it was added
+        """
+        if item.get("url") and item["url"] in self._by_url:
+            return False
+        if item.get("id") not in (None, "") and str(item["id"]) in self._by_id:
+            return False
+        self.items.append(item)
+        self._index(item)
+        return True
+
+    def extend(self, items: Iterable[Dict[str, Any]]) -> int:
+        """
+        Returns:
+            int: Number of items added
+        """
+        return sum(self.add(item) for item in items)
+
+    def hydrate(self, fields) -> "RecordStore":
+        """
+        Load heavy fields back from their blobs, e.g. ("summary",)
+        """
+        for item in self.items:
+            hydrate_item(item, fields)
+        return self
+
+    def save(self, path: Optional[str] = None) -> bool:
+        """
+        Write the items back, to path if given (blobs keep the store's kind)
+        """
+        return save_index_file(self.items, path or self.path, self.kind)
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Build the "related items" table: the top-k most similar items for every
+article, video, paper and podcast chapter, across all of them.
+
+Items are vectorized from their title and full summary as hashed unigram +
+bigram counts (sublinear tf, idf-weighted, L2-normalized), so a vector only
+depends on its own text and old vectors stay valid as the corpus grows.
+Vectors and neighbour lists are kept in cache_dir()/related.npz between runs;
+a run only vectorizes new or edited items and compares them against the
+corpus, then merges them into the existing neighbour lists. The cost is
+O(new items * N) instead of a full N^2 recompute. Because idf drifts as items
+are added, everything is rebuilt once the corpus has grown by REBUILD_GROWTH
+since the last full build (or with --full).
+
+Output, frontend/public/search/related.json (lists are parallel):
+    {
+      "v": 1,
+      "ids": ["<file>:<item id>", ...],
+      "neighbours": [[item, score, item, score, ...] per item]
+    }
+where item is a position in ids and score the cosine similarity in percent,
+best first.
+"""
+
+import argparse
+import os
+import sys
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from build_search_index import DATA_DIR, OUTPUT_DIR, tokenize
+from compression import STOPWORDS
+from fingerprints import content_hash
+from generate_summaries import hydrate_item, load_json_file
+from progress_journal import atomic_write_json
+from summary_cache import cache_dir
+
+RELATED_FILES = ("articles", "yt", "papers", "podcasts")
+TOP_K = 8
+# hashed feature space; collisions at this size are rare enough not to matter
+DIMENSIONS = 1 << 18
+TITLE_WEIGHT = 2
+# weaker matches than this are noise, not related items
+MIN_SCORE = 0.03
+# rebuild everything once the corpus grew by this fraction since the last
+# full build, so stale idf weights don't accumulate
+REBUILD_GROWTH = 0.25
+# items compared per block; bounds the dense block*N score matrix
+CHUNK_SIZE = 512
+
+
+def features(text: str) -> List[str]:
+    tokens = [t for t in tokenize(text) if len(t) > 1 and t not in STOPWORDS]
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def vectorize(title: str, summary: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hashed term frequencies of one item
+
+    Returns:
+        (feature indices, sublinear tf weights), sorted by index
+    """
+    counts: Counter = Counter()
+    for feature in features(title):
+        counts[zlib.crc32(feature.encode("utf-8")) % DIMENSIONS] += TITLE_WEIGHT
+    for feature in features(summary):
+        counts[zlib.crc32(feature.encode("utf-8")) % DIMENSIONS] += 1
+    indices = np.array(sorted(counts), dtype=np.int32)
+    weights = np.array([1 + np.log(counts[i]) for i in indices], dtype=np.float32)
+    return indices, weights
+
+
+def _collect(data: Any) -> Iterator[Dict[str, Any]]:
+    # data files are lists of items, podcasts.json nests them in books
+    if isinstance(data, list):
+        for value in data:
+            yield from _collect(value)
+    elif isinstance(data, dict):
+        if "title" in data and "url" in data:
+            yield data
+        else:
+            for value in data.values():
+                yield from _collect(value)
+
+
+def load_corpus(names=RELATED_FILES) -> Optional[Dict[str, Tuple[str, str]]]:
+    """
+    Returns:
+        key -> (title, summary) for every item in the data files, in file
+        order, or None if a data file could not be read
+    """
+    corpus: Dict[str, Tuple[str, str]] = {}
+    for name in names:
+        data = load_json_file(os.path.join(DATA_DIR, f"{name}.json"))
+        if data is None:
+            return None
+        for item in _collect(data):
+            hydrate_item(item, ("summary",))
+            key = f"{name}:{item.get('id') or item['url']}"
+            corpus.setdefault(
+                key, (str(item.get("title") or ""), str(item.get("summary") or ""))
+            )
+    return corpus
+
+
+class RelatedIndex:
+    """
+    Term-frequency vectors and top-k neighbour lists of every item, with
+    rows in corpus order.
+    """
+
+    def __init__(
+        self,
+        keys: List[str],
+        hashes: List[str],
+        tf: sparse.csr_matrix,
+        neighbours: np.ndarray,
+        scores: np.ndarray,
+        full_size: int,
+    ):
+        self.keys = keys
+        self.hashes = hashes
+        self.tf = tf
+        self.neighbours = neighbours
+        self.scores = scores
+        # corpus size at the last full build
+        self.full_size = full_size
+
+    @classmethod
+    def empty(cls, k: int = TOP_K) -> "RelatedIndex":
+        return cls(
+            [],
+            [],
+            sparse.csr_matrix((0, DIMENSIONS), dtype=np.float32),
+            np.full((0, k), -1, dtype=np.int32),
+            np.zeros((0, k), dtype=np.float32),
+            0,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> Optional["RelatedIndex"]:
+        try:
+            with np.load(path, allow_pickle=False) as state:
+                return cls(
+                    state["keys"].tolist(),
+                    state["hashes"].tolist(),
+                    sparse.csr_matrix(
+                        (state["tf_data"], state["tf_indices"], state["tf_indptr"]),
+                        shape=(len(state["keys"]), DIMENSIONS),
+                    ),
+                    state["neighbours"],
+                    state["scores"],
+                    int(state["full_size"]),
+                )
+        except (OSError, KeyError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Warning: ignoring unreadable related index {path}: {e}")
+            return None
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            keys=np.array(self.keys, dtype=str),
+            hashes=np.array(self.hashes, dtype=str),
+            tf_data=self.tf.data,
+            tf_indices=self.tf.indices,
+            tf_indptr=self.tf.indptr,
+            neighbours=self.neighbours,
+            scores=self.scores,
+            full_size=np.int64(self.full_size),
+        )
+        os.replace(tmp_path, path)
+
+    def to_json(self) -> Dict[str, Any]:
+        table = []
+        for row, scores in zip(self.neighbours.tolist(), self.scores.tolist()):
+            flat = []
+            for neighbour, score in zip(row, scores):
+                if neighbour >= 0:
+                    flat.extend((neighbour, round(score * 100)))
+            table.append(flat)
+        return {"v": 1, "ids": self.keys, "neighbours": table}
+
+
+def _weigh(tf: sparse.csr_matrix) -> sparse.csr_matrix:
+    """
+    idf-weighted, L2-normalized rows of tf
+    """
+    df = np.bincount(tf.indices, minlength=DIMENSIONS)
+    idf = np.log((1 + tf.shape[0]) / (1 + df)).astype(np.float32) + 1
+    weighted = sparse.csr_matrix(tf @ sparse.diags(idf))
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1))).ravel()
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ weighted)
+
+
+def _top_k(
+    scores: np.ndarray, candidates: np.ndarray, k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Best k candidates per row, best first; weak matches become -1 / 0
+
+    Args:
+        scores: rows x candidates similarity matrix
+        candidates: Item index of every column, 1-d or per row
+    """
+    candidates = np.broadcast_to(candidates, scores.shape)
+    if scores.shape[1] > k:
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, best, axis=1)
+        candidates = np.take_along_axis(candidates, best, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    scores = np.take_along_axis(scores, order, axis=1)
+    candidates = np.take_along_axis(candidates, order, axis=1)
+    pad = k - scores.shape[1]
+    if pad > 0:
+        scores = np.pad(scores, ((0, 0), (0, pad)))
+        candidates = np.pad(candidates, ((0, 0), (0, pad)))
+    weak = scores < MIN_SCORE
+    return (
+        np.where(weak, -1, candidates).astype(np.int32),
+        np.where(weak, 0, scores).astype(np.float32),
+    )
+
+
+def update_index(
+    old: RelatedIndex,
+    corpus: Dict[str, Tuple[str, str]],
+    k: int = TOP_K,
+    full: bool = False,
+) -> Tuple[RelatedIndex, int]:
+    """
+    Bring old up to date with corpus
+
+    Returns:
+        (the new index, number of items whose neighbours were recomputed)
+    """
+    keys = list(corpus)
+    hashes = [content_hash(corpus[key])[:16] for key in keys]
+    old_rows = {key: row for row, key in enumerate(old.keys)}
+    # old row of every item whose text is unchanged, -1 for new or edited ones
+    reused = np.full(len(keys), -1, dtype=np.int64)
+    for row, (key, digest) in enumerate(zip(keys, hashes)):
+        old_row = old_rows.get(key)
+        if old_row is not None and old.hashes[old_row] == digest:
+            reused[row] = old_row
+    fresh = np.flatnonzero(reused < 0)
+    full = (
+        full
+        or old.neighbours.shape[1] != k
+        or len(keys) > old.full_size * (1 + REBUILD_GROWTH)
+    )
+
+    kept = np.flatnonzero(reused >= 0)
+    parts = [old.tf[reused[kept]]]
+    for row in fresh:
+        indices, weights = vectorize(*corpus[keys[row]])
+        parts.append(
+            sparse.csr_matrix(
+                (weights, indices, [0, len(indices)]), shape=(1, DIMENSIONS)
+            )
+        )
+    # parts hold the kept rows, then the fresh ones; put them in corpus order
+    order = np.argsort(np.concatenate([kept, fresh]), kind="stable")
+    tf = sparse.csr_matrix(sparse.vstack(parts, format="csr")[order], dtype=np.float32)
+    weighted = _weigh(tf)
+    everything = np.arange(len(keys))
+
+    if full:
+        dirty = everything
+        neighbours = np.full((len(keys), k), -1, dtype=np.int32)
+        scores = np.zeros((len(keys), k), dtype=np.float32)
+    else:
+        # old neighbour lists, renumbered; a list that pointed at a removed
+        # or edited item is recomputed from scratch
+        renumber = np.full(len(old.keys) + 1, -2, dtype=np.int32)
+        renumber[-1] = -1
+        renumber[reused[kept]] = kept
+        neighbours = np.full((len(keys), k), -1, dtype=np.int32)
+        scores = np.zeros((len(keys), k), dtype=np.float32)
+        neighbours[kept] = renumber[old.neighbours[reused[kept]]]
+        scores[kept] = old.scores[reused[kept]]
+        stale = (neighbours == -2).any(axis=1)
+        stale[fresh] = True
+        dirty = np.flatnonzero(stale)
+
+    for start in range(0, len(dirty), CHUNK_SIZE):
+        chunk = dirty[start : start + CHUNK_SIZE]
+        block = (weighted[chunk] @ weighted.T).toarray()
+        block[np.arange(len(chunk)), chunk] = 0
+        neighbours[chunk], scores[chunk] = _top_k(block, everything, k)
+        if full:
+            continue
+        # new items may displace old neighbours of everything else
+        new_in_chunk = np.isin(chunk, fresh)
+        if not new_in_chunk.any():
+            continue
+        clean = np.flatnonzero(~stale)
+        columns = chunk[new_in_chunk]
+        candidates = np.hstack(
+            [neighbours[clean], np.broadcast_to(columns, (len(clean), len(columns)))]
+        )
+        candidate_scores = np.hstack([scores[clean], block[new_in_chunk][:, clean].T])
+        neighbours[clean], scores[clean] = _top_k(candidate_scores, candidates, k)
+
+    index = RelatedIndex(
+        keys,
+        hashes,
+        tf,
+        neighbours,
+        scores,
+        len(keys) if full else old.full_size,
+    )
+    return index, len(dirty)
+
+
+def update_related(full: bool = False, k: int = TOP_K) -> bool:
+    """
+    Update the cached index with the current data files and write
+    related.json
+
+    Returns:
+        bool: True if successful
+    """
+    corpus = load_corpus()
+    if corpus is None:
+        return False
+    state_path = os.path.join(cache_dir(), "related.npz")
+    old = None if full else RelatedIndex.load(state_path)
+    index, recomputed = update_index(old or RelatedIndex.empty(k), corpus, k, full)
+    index.save(state_path)
+
+    out_path = os.path.join(OUTPUT_DIR, "related.json")
+    atomic_write_json(
+        index.to_json(), out_path, separators=(",", ":"), ensure_ascii=False
+    )
+    print(
+        f"✓ related: {len(index.keys)} items, neighbours recomputed for "
+        f"{recomputed}, {os.path.getsize(out_path) / 1024:.1f} KB -> {out_path}"
+    )
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the related items table")
+    parser.add_argument(
+        "--full", action="store_true", help="recompute every neighbour list"
+    )
+    parser.add_argument("-k", type=int, default=TOP_K, help="neighbours per item")
+    args = parser.parse_args()
+    sys.exit(0 if update_related(args.full, args.k) else 1)
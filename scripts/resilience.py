@@ -0,0 +1,299 @@
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, TypeVar
+
+import requests
+from http_client import get_session
+from metrics import get_metrics
+from rate_limiter import AdaptiveConcurrencyLimiter
+
+try:
+    import httpx  # google-genai's transport
+
+    TRANSIENT_ERRORS = (
+        requests.ConnectionError,
+        requests.Timeout,
+        httpx.TransportError,
+    )
+except ImportError:
+    TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout)
+
+T = TypeVar("T")
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# youtube-transcript-api raises these instead of exposing the 429
+THROTTLE_EXCEPTIONS = {"RequestBlocked", "IpBlocked", "TooManyRequests"}
+
+MAX_RETRIES = int(os.getenv("TECHDEX_MAX_RETRIES", "4"))
+BACKOFF_BASE = float(os.getenv("TECHDEX_BACKOFF_BASE", "1"))
+BACKOFF_MAX = 60.0
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = float(os.getenv("TECHDEX_BREAKER_COOLDOWN", "30"))
+BREAKER_MAX_COOLDOWN = 300.0
+# give up on a service that stays down longer than this
+BREAKER_MAX_PAUSE = float(os.getenv("TECHDEX_BREAKER_MAX_PAUSE", "900"))
+
+
+class CircuitOpenError(Exception):
+    """
+    A service stayed unavailable longer than BREAKER_MAX_PAUSE
+    """
+
+
+class CircuitBreaker:
+    """
+    Per-service breaker that pauses callers during an outage.
+
+    After `threshold` consecutive failures the breaker opens and every caller
+    waits out the cooldown instead of burning through items. Then a single
+    probe call is let through: success closes the breaker, failure reopens it
+    with twice the cooldown. Once the service has been down for longer than
+    max_pause, callers get CircuitOpenError so the run can stop and resume
+    from its journal later.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        threshold: int = BREAKER_THRESHOLD,
+        cooldown: float = BREAKER_COOLDOWN,
+        max_cooldown: float = BREAKER_MAX_COOLDOWN,
+        max_pause: float = BREAKER_MAX_PAUSE,
+    ):
+        self.name = name
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.max_pause = max_pause
+        self.state = "closed"
+        self.failures = 0
+        self._cooldown = cooldown
+        self._open_until = 0.0
+        self._down_since: Optional[float] = None
+        self._cond = threading.Condition()
+
+    def before_call(self) -> None:
+        """
+        Block while the breaker is open (or a probe is in flight)
+        """
+        with self._cond:
+            while self.state != "closed":
+                now = time.monotonic()
+                if now - self._down_since > self.max_pause:
+                    raise CircuitOpenError(
+                        f"{self.name} unavailable for {now - self._down_since:.0f}s"
+                    )
+                if self.state == "open" and now >= self._open_until:
+                    self.state = "half_open"
+                    return
+                self._cond.wait(max(0.05, self._open_until - now))
+
+    def record_success(self) -> None:
+        with self._cond:
+            if self.state != "closed":
+                print(f"✓ {self.name} recovered, circuit closed")
+            self.state = "closed"
+            self.failures = 0
+            self._cooldown = self.base_cooldown
+            self._down_since = None
+            self._cond.notify_all()
+
+    def record_throttled(self) -> None:
+        """
+        A throttled answer means the service is up: it closes the breaker if
+        it came from the probe, and leaves a closed breaker alone
+        """
+        with self._cond:
+            if self.state == "half_open":
+                self.record_success()
+
+    def record_failure(self) -> None:
+        with self._cond:
+            self.failures += 1
+            if self.state == "open":
+                return
+            if self.state == "half_open" or self.failures >= self.threshold:
+                now = time.monotonic()
+                self._down_since = self._down_since or now
+                self._open_until = now + self._cooldown
+                print(f"✗ {self.name} circuit open, pausing for {self._cooldown:.0f}s")
+                self._cooldown = min(self.max_cooldown, self._cooldown * 2)
+                self.state = "open"
+                self._cond.notify_all()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP date)
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _classify(status, exc: Optional[Exception] = None) -> Optional[str]:
+    """
+    Returns:
+        "throttled" (429 and friends), "failed" (5xx, timeouts, connection
+        errors) or None when the service answered and retrying won't help
+    """
+    if status == 429 or (exc is not None and type(exc).__name__ in THROTTLE_EXCEPTIONS):
+        return "throttled"
+    if status in RETRY_STATUSES or isinstance(exc, TRANSIENT_ERRORS):
+        return "failed"
+    return None
+
+
+class ResilientService:
+    """
+    Retries, circuit breaker and adaptive concurrency for one upstream.
+
+    Throttled calls shrink the concurrency limit and wait for Retry-After but
+    do not count against the breaker, since the service is up (a throttled
+    probe closes it); server errors and network failures do both.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int = 4,
+        retries: int = MAX_RETRIES,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_max: float = BACKOFF_MAX,
+        max_pause: float = BREAKER_MAX_PAUSE,
+        metrics_name: Optional[str] = None,
+    ):
+        self.name = name
+        self.metrics_name = metrics_name or name
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker(name, max_pause=max_pause)
+        self.limiter = AdaptiveConcurrencyLimiter(max_concurrency)
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Full-jitter exponential backoff; Retry-After, when given, is a floor
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        if retry_after is not None:
+            delay = min(max(delay, retry_after), BREAKER_MAX_COOLDOWN)
+        return delay
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """
+        Run fn (one attempt at the call) until it succeeds or retries run out.
+
+        fn either returns a value or raises. A returned requests.Response
+        with a retryable status (429, 5xx) is retried as well; if retries run
+        out the last response is returned for the caller to handle, like a
+        plain session call would.
+
+        Raises:
+            CircuitOpenError: The service has been down too long
+        """
+        for attempt in range(self.retries + 1):
+            self.breaker.before_call()
+            self.limiter.acquire()
+            try:
+                result = fn()
+            except Exception as exc:
+                response = getattr(exc, "response", None)
+                status = getattr(exc, "code", None) or getattr(
+                    response, "status_code", None
+                )
+                outcome = _classify(status, exc)
+                if outcome is None or attempt == self.retries:
+                    self._finish(outcome)
+                    raise
+                headers = getattr(response, "headers", None) or {}
+                reason = f"{type(exc).__name__}: {exc}"
+            else:
+                status = getattr(result, "status_code", None)
+                outcome = _classify(status)
+                if outcome is None or attempt == self.retries:
+                    self._finish(outcome)
+                    return result
+                headers = result.headers
+                reason = f"HTTP {status}"
+                result.close()
+            self._finish(outcome)
+
+            delay = self.backoff(attempt, parse_retry_after(headers.get("Retry-After")))
+            get_metrics().retry(self.metrics_name)
+            print(
+                f"  {self.name}: {reason[:120]}, retry {attempt + 1}/{self.retries} "
+                f"in {delay:.1f}s"
+            )
+            time.sleep(delay)
+
+    def _finish(self, outcome: Optional[str]) -> None:
+        self.limiter.release(overloaded=outcome is not None)
+        if outcome == "failed":
+            self.breaker.record_failure()
+        elif outcome == "throttled":
+            self.breaker.record_throttled()
+        else:
+            # a 404 or a bad request still means the service is up
+            self.breaker.record_success()
+
+
+# per-service settings, passed to ResilientService
+SERVICES: Dict[str, Dict] = {
+    "gemini": {"max_concurrency": 8},
+    "youtube": {"max_concurrency": 4},
+    "sheets": {"max_concurrency": 2},
+    "peekalink": {"max_concurrency": 4},
+    "transcripts": {"max_concurrency": 4},
+    # article pages get one breaker per site, so a dead blog only stalls its
+    # own articles, and only briefly
+    "pages": {"max_concurrency": 4, "retries": 2, "max_pause": 60},
+}
+
+_services: Dict[str, ResilientService] = {}
+_services_lock = threading.Lock()
+
+
+def get_service(service: str, key: Optional[str] = None) -> ResilientService:
+    """
+    Process-wide ResilientService, shared by every caller
+
+    Args:
+        service: Service name, see SERVICES
+        key: Optional sub-key (e.g. a host) for separate breakers and limits
+            within one service; metrics are still recorded under service
+    """
+    name = f"{service}:{key}" if key else service
+    with _services_lock:
+        if name not in _services:
+            _services[name] = ResilientService(
+                name, metrics_name=service, **SERVICES.get(service, {})
+            )
+        return _services[name]
+
+
+def request(
+    service: str, method: str, url: str, key: Optional[str] = None, **kwargs
+) -> requests.Response:
+    """
+    session.request through the service's retries and breaker, with every
+    attempt recorded in the run metrics
+    """
+
+    def attempt():
+        with get_metrics().track(service) as call:
+            response = get_session().request(method, url, **kwargs)
+            call.response(response, streamed=kwargs.get("stream", False))
+        return response
+
+    return get_service(service, key).call(attempt)
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+
+def cache_dir() -> str:
+    """
+    Directory that holds every on-disk cache used by the scripts.
+    Overridable with TECHDEX_CACHE_DIR so CI can point it at a restored cache.
+    """
+    return os.getenv("TECHDEX_CACHE_DIR") or DEFAULT_CACHE_DIR
+
+
+def summary_cache_key(
+    content: str, title: str, content_type: str, prompt_template: str, model: str
+) -> str:
+    """
+    Hash everything that influences the model output. Changing the prompt
+    template or the model automatically invalidates old entries.
+    """
+    h = hashlib.sha256()
+    for part in (content, title, content_type, prompt_template, model):
+        data = part.encode("utf-8")
+        # length-prefix each part so ("ab", "c") and ("a", "bc") differ
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    return h.hexdigest()
+
+
+class SummaryCache:
+    """
+    Persistent content-addressed cache of generated summaries backed by SQLite.
+
+    Entries are evicted when they are older than `max_age_days` or when the
+    table grows past `max_entries` (least recently used first).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = 50_000,
+        max_age_days: float = 365,
+    ):
+        self.path = path or os.path.join(cache_dir(), "summaries.sqlite")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_summaries_accessed ON summaries(accessed_at)"
+        )
+        self._conn.commit()
+        self.evict()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, created_at FROM summaries WHERE key = ?", (key,)
+            ).fetchone()
+            now = time.time()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE summaries SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, summary: str) -> None:
+        with self._lock:
+            now = time.time()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?)",
+                (key, summary, now, now),
+            )
+            self._conn.commit()
+            self._puts += 1
+        if self._puts % 100 == 0:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Drop expired entries and trim to max_entries
+
+        Returns:
+            int: Number of rows removed
+        """
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM summaries WHERE created_at < ?",
+                (time.time() - self.max_age_seconds,),
+            )
+            removed = cur.rowcount
+            cur = self._conn.execute(
+                """
+                DELETE FROM summaries WHERE key IN (
+                    SELECT key FROM summaries ORDER BY accessed_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+            removed += cur.rowcount
+            self._conn.commit()
+            return removed
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        return f"summary cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate)"
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache: Optional[SummaryCache] = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[SummaryCache]:
+    """
+    Process-wide cache shared by every summarization entry point.
+    Returns None when disabled with TECHDEX_SUMMARY_CACHE=0.
+    """
+    global _default_cache
+    if os.getenv("TECHDEX_SUMMARY_CACHE", "1") == "0":
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = SummaryCache()
+            except sqlite3.Error as e:
+                print(f"Warning: summary cache unavailable: {e}")
+                return None
+        return _default_cache
@@ -3,7 +3,8 @@
 Example usage of the reusable summary generation functions
 """
 
-from generate_summaries import load_json_file, process_items_summaries, save_json_file
+from generate_summaries import load_index_file, process_items_summaries, save_index_file
+from progress_journal import ProgressJournal, default_journal_path
 
 
 def process_yt_articles(input_file: str, output_file: str = ""):
@@ -11,10 +12,13 @@ def process_yt_articles(input_file: str, output_file: str = ""):
     Example: Process articles with summaries
     """
     # Load articles
-    yt = load_json_file(input_file)
+    yt = load_index_file(input_file, hydrate=("transcript",))
     if not yt:
         return False
 
+    output_path = output_file or input_file
+    journal_path = default_journal_path(output_path)
+
     # Process summaries for articles
     success = process_items_summaries(
         items=yt,
@@ -22,11 +26,13 @@ def process_yt_articles(input_file: str, output_file: str = ""):
         title_field="title",  # Field containing article title
         summary_field="summary",  # Field to store generated summary
         content_type="video transcript",  # Type for the prompt
+        journal_path=journal_path,
+        checkpoint_file=output_path,
     )
 
-    if success:
-        output_path = output_file or input_file
-        return save_json_file(yt, output_path)
+    if success and save_index_file(yt, output_path):
+        ProgressJournal(journal_path).clear()
+        return True
 
     return False
 
@@ -36,10 +42,13 @@ def process_articles_summaries(input_file: str, output_file: str = ""):
     Example: Process articles with summaries
     """
     # Load articles
-    articles = load_json_file(input_file)
+    articles = load_index_file(input_file)
     if not articles:
         return False
 
+    output_path = output_file or input_file
+    journal_path = default_journal_path(output_path)
+
     # Process summaries for articles
     success = process_items_summaries(
         items=articles,
@@ -47,11 +56,13 @@ def process_articles_summaries(input_file: str, output_file: str = ""):
         title_field="title",  # Field containing article title
         summary_field="summary",  # Field to store generated summary
         content_type="website",  # Type for the prompt
+        journal_path=journal_path,
+        checkpoint_file=output_path,
     )
 
-    if success:
-        output_path = output_file or input_file
-        return save_json_file(articles, output_path)
+    if success and save_index_file(articles, output_path):
+        ProgressJournal(journal_path).clear()
+        return True
 
     return False
 
@@ -61,10 +72,13 @@ def process_papers_summaries(input_file: str, output_file: str = ""):
     Example: Process research papers with summaries
     """
     # Load papers
-    papers = load_json_file(input_file)
+    papers = load_index_file(input_file)
     if not papers:
         return False
 
+    output_path = output_file or input_file
+    journal_path = default_journal_path(output_path)
+
     # Process summaries for papers
     success = process_items_summaries(
         items=papers,
@@ -72,11 +86,14 @@ def process_papers_summaries(input_file: str, output_file: str = ""):
         title_field="title",  # Field containing paper title
         summary_field="summary",  # Field to store generated summary
         content_type="research paper",  # Type for the prompt
+        batch_token_budget=8000,  # Pack short items into shared requests
+        journal_path=journal_path,
+        checkpoint_file=output_path,
     )
 
-    if success:
-        output_path = output_file or input_file
-        return save_json_file(papers, output_path)
+    if success and save_index_file(papers, output_path):
+        ProgressJournal(journal_path).clear()
+        return True
 
     return False
 
@@ -86,10 +103,13 @@ def process_blog_posts_summaries(input_file: str, output_file: str = ""):
     Example: Process blog posts with summaries
     """
     # Load blog posts
-    posts = load_json_file(input_file)
+    posts = load_index_file(input_file)
     if not posts:
         return False
 
+    output_path = output_file or input_file
+    journal_path = default_journal_path(output_path)
+
     # Process summaries for blog posts
     success = process_items_summaries(
         items=posts,
@@ -97,11 +117,14 @@ def process_blog_posts_summaries(input_file: str, output_file: str = ""):
         title_field="title",  # Field containing post title
         summary_field="summary",  # Field to store generated summary
         content_type="blog post",  # Type for the prompt
+        batch_token_budget=8000,  # Pack short items into shared requests
+        journal_path=journal_path,
+        checkpoint_file=output_path,
     )
 
-    if success:
-        output_path = output_file or input_file
-        return save_json_file(posts, output_path)
+    if success and save_index_file(posts, output_path):
+        ProgressJournal(journal_path).clear()
+        return True
 
     return False
 
@@ -127,8 +150,6 @@ def process_custom_data_summaries(
     )
 
     if success and output_file:
-        return save_json_file(items, output_file)
+        return save_index_file(items, output_file)
 
     return success
-
-    
@@ -0,0 +1,127 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+import batch_jobs
+import generate_summaries
+from batch_jobs import job_label, job_state_path
+from fake_services import FakeServices, make_server
+from generate_summaries import process_items_summaries
+
+
+@pytest.fixture(scope="module")
+def fake_services():
+    # batch jobs finish after 0.6s
+    services = FakeServices(items=10, latency_scale=0.01)
+    server = make_server(services)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield services, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+@pytest.fixture
+def services(fake_services, monkeypatch):
+    """
+    The fake services with Gemini pointed at them and the summary cache off,
+    so every test submits its own jobs
+    """
+    services, base_url = fake_services
+    monkeypatch.setattr(generate_summaries, "GEMINI_BASE_URL", base_url)
+    monkeypatch.setattr(batch_jobs, "POLL_SECONDS", 0.05)
+    monkeypatch.setenv("TECHDEX_SUMMARY_CACHE", "0")
+    services.batches.clear()
+    return services
+
+
+def make_items(prefix: str, count: int):
+    return [
+        {
+            "id": f"{prefix}{n}",
+            "title": f"Talk {n}",
+            "transcript": f"Notes on {prefix} part {n}. " * 40,
+        }
+        for n in range(count)
+    ]
+
+
+def summarize(items, journal_path, **kwargs) -> bool:
+    return process_items_summaries(
+        items,
+        api_key="fake-key",
+        journal_path=str(journal_path),
+        batch_job=True,
+        **kwargs,
+    )
+
+
+def missing(items):
+    return [item["id"] for item in items if not item.get("summary")]
+
+
+def test_job_is_submitted_polled_and_applied(services, tmp_path):
+    items = make_items("a", 5)
+    journal = tmp_path / "a.journal"
+    assert summarize(items, journal)
+
+    assert missing(items) == []
+    assert len(services.batches) == 1
+    [job] = services.batches.values()
+    assert len(job["requests"]) == 5
+    assert not os.path.exists(job_state_path(job_label(str(journal))))
+
+
+def test_pending_job_is_resumed_by_next_run(services, tmp_path, monkeypatch):
+    items = make_items("b", 4)
+    journal = tmp_path / "b.journal"
+    monkeypatch.setattr(batch_jobs, "MAX_WAIT_SECONDS", 0)
+    assert summarize(items, journal)
+
+    # BatchJobPending: nothing applied, the job handle kept for the next run
+    assert len(missing(items)) == 4
+    assert os.path.exists(job_state_path(job_label(str(journal))))
+
+    monkeypatch.setattr(batch_jobs, "MAX_WAIT_SECONDS", 30)
+    assert summarize(items, journal)
+    assert missing(items) == []
+    # collected, not submitted again
+    assert len(services.batches) == 1
+    assert not os.path.exists(job_state_path(job_label(str(journal))))
+
+
+def test_entries_that_do_not_fit_wait_for_the_next_job(services, tmp_path, monkeypatch):
+    items = make_items("c", 5)
+    journal = tmp_path / "c.journal"
+    # room for two prompts per job
+    monkeypatch.setattr(batch_jobs, "MAX_JOB_BYTES", 3000)
+    assert summarize(items, journal)
+    assert len(missing(items)) == 3
+
+    for _ in range(2):
+        assert summarize(items, journal)
+    assert missing(items) == []
+    assert [len(job["requests"]) for job in services.batches.values()] == [2, 2, 1]
+
+
+def test_index_files_keep_separate_jobs(services, tmp_path, monkeypatch):
+    first, second = make_items("d", 2), make_items("e", 2)
+    first_journal = tmp_path / "one" / "items.journal"
+    second_journal = tmp_path / "two" / "items.journal"
+    assert job_label(str(first_journal)) != job_label(str(second_journal))
+
+    monkeypatch.setattr(batch_jobs, "MAX_WAIT_SECONDS", 0)
+    assert summarize(first, first_journal)
+    monkeypatch.setattr(batch_jobs, "MAX_WAIT_SECONDS", 30)
+    # same content type, but not the job of the first file
+    assert summarize(second, second_journal)
+    assert missing(second) == []
+    assert len(missing(first)) == 2
+    assert os.path.exists(job_state_path(job_label(str(first_journal))))
+
+
+def test_batch_job_needs_a_label(services):
+    assert not process_items_summaries(
+        make_items("f", 1), api_key="fake-key", batch_job=True
+    )
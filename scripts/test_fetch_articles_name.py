@@ -0,0 +1,47 @@
+import json
+
+import fetch_articles_name
+import pytest
+from fetch_articles_name import NO_TITLE, resolve_titles
+from resilience import CircuitOpenError
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """
+    Pages without a title of their own; peekalink answers from `answers`
+    and raises CircuitOpenError for urls it has no answer for
+    """
+    answers = {}
+
+    def get_title(url):
+        if url not in answers:
+            raise CircuitOpenError("peekalink unavailable")
+        return answers[url]
+
+    monkeypatch.setattr(fetch_articles_name, "get_local_title", lambda url: None)
+    monkeypatch.setattr(fetch_articles_name, "get_title", get_title)
+    return answers
+
+
+def cached_titles():
+    with open(fetch_articles_name._title_cache_path(), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_misses_are_returned_but_not_cached(lookups):
+    lookups.update({"https://a.dev/post": "A post", "https://b.dev/x": NO_TITLE})
+    titles = resolve_titles(list(lookups), workers=1)
+    assert titles == lookups
+    assert list(cached_titles().values()) == ["A post"]
+
+
+def test_titles_are_cached_when_the_breaker_opens(lookups):
+    lookups["https://a.dev/post"] = "A post"
+    with pytest.raises(CircuitOpenError):
+        resolve_titles(["https://a.dev/post", "https://down.dev/x"], workers=1)
+    assert list(cached_titles().values()) == ["A post"]
+
+    # the next run only asks for what is still missing
+    lookups.clear()
+    assert resolve_titles(["https://a.dev/post"]) == {"https://a.dev/post": "A post"}
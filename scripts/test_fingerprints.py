@@ -0,0 +1,44 @@
+import time
+
+from fingerprints import FingerprintStore, content_hash
+
+
+def test_content_hash_separates_parts():
+    assert content_hash(["ab", "c"]) != content_hash(["a", "bc"])
+    assert content_hash(["a", None]) == content_hash([b"a", ""])
+
+
+def test_recorded_digest_survives_a_restart(tmp_path):
+    path = str(tmp_path / "fingerprints.json")
+    FingerprintStore(path).record("articles", "abc")
+
+    store = FingerprintStore(path)
+    assert store.unchanged("articles", "abc")
+    assert not store.unchanged("articles", "changed")
+    assert not store.unchanged("yt", "abc")
+
+
+def test_forget_invalidates_the_branch(tmp_path):
+    path = str(tmp_path / "fingerprints.json")
+    store = FingerprintStore(path)
+    store.record("articles", "abc")
+    store.record("yt", "def")
+    store.forget("articles")
+
+    restarted = FingerprintStore(path)
+    assert not restarted.unchanged("articles", "abc")
+    assert restarted.unchanged("yt", "def")
+
+
+def test_old_fingerprints_expire(tmp_path, monkeypatch):
+    store = FingerprintStore(str(tmp_path / "fingerprints.json"), max_age_days=1)
+    store.record("articles", "abc")
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 2 * 86400)
+    assert not store.unchanged("articles", "abc")
+
+
+def test_unreadable_store_starts_empty(tmp_path):
+    path = tmp_path / "fingerprints.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert not FingerprintStore(str(path)).unchanged("articles", "abc")
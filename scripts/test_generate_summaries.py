@@ -0,0 +1,103 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+from chunking import estimate_tokens
+from generate_summaries import (
+    CHUNK_PROMPT_TEMPLATE,
+    PROMPT_TEMPLATE,
+    REDUCE_PROMPT_TEMPLATE,
+    generate_summary_with_gemini,
+)
+
+WORDS = (
+    "latency throughput cache kernel scheduler database index replica consensus "
+    "compiler allocator thread socket buffer queue partition shard vector tensor"
+).split()
+
+PROMPT_KINDS = {
+    "single": PROMPT_TEMPLATE.split("{")[0].strip(),
+    "chunk": CHUNK_PROMPT_TEMPLATE.split("{")[0].strip(),
+    "reduce": REDUCE_PROMPT_TEMPLATE.split("{")[0].strip(),
+}
+
+
+class FakeClient:
+    """
+    Gemini client that records the kind of every prompt; chunk prompts fail
+    (empty answer) when fail_chunks is set
+    """
+
+    def __init__(self, fail_chunks: bool = False):
+        self.fail_chunks = fail_chunks
+        self.calls = []
+        self.models = SimpleNamespace(generate_content=self.generate_content)
+
+    def generate_content(self, model, contents, config=None):
+        kind = next(k for k, start in PROMPT_KINDS.items() if start in contents)
+        self.calls.append((kind, contents))
+        text = "" if kind == "chunk" and self.fail_chunks else f"{kind} summary"
+        return SimpleNamespace(text=text, usage_metadata=None)
+
+    def kinds(self):
+        return sorted(kind for kind, _ in self.calls)
+
+
+def make_text(tokens: int, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    sentences = []
+    while estimate_tokens(" ".join(sentences)) < tokens:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(8, 20))]
+        sentences.append(" ".join(words).capitalize() + ".")
+    return " ".join(sentences)
+
+
+def summarize(client, content, **kwargs):
+    return generate_summary_with_gemini(
+        client,
+        content,
+        "Title",
+        "article",
+        use_cache=False,
+        max_single_call_tokens=1000,
+        chunk_tokens=400,
+        **kwargs,
+    )
+
+
+def test_short_content_is_one_call():
+    client = FakeClient()
+    assert summarize(client, make_text(500)) == "single summary"
+    assert client.kinds() == ["single"]
+
+
+def test_slightly_long_content_is_compressed_into_one_call():
+    client = FakeClient()
+    assert summarize(client, make_text(1500)) == "single summary"
+    assert client.kinds() == ["single"]
+    assert estimate_tokens(client.calls[0][1]) < 1200
+
+
+def test_long_content_is_map_reduced():
+    client = FakeClient()
+    content = make_text(5000)
+    assert summarize(client, content) == "reduce summary"
+    kinds = client.kinds()
+    assert kinds.count("reduce") == 1 and kinds.count("single") == 0
+    assert kinds.count("chunk") >= 5000 // 400
+    # nothing was compressed away before chunking
+    chunked = sum(estimate_tokens(p) for kind, p in client.calls if kind == "chunk")
+    assert chunked > 5000
+
+
+@pytest.mark.parametrize(
+    "compress_tokens, expected", [(600, "single summary"), (0, None)]
+)
+def test_failed_map_reduce_falls_back_to_central_sentences(compress_tokens, expected):
+    client = FakeClient(fail_chunks=True)
+    summary = summarize(client, make_text(5000), compress_tokens=compress_tokens)
+    assert summary == expected
+    assert "reduce" not in client.kinds()
+    if expected:
+        fallback = [prompt for kind, prompt in client.calls if kind == "single"]
+        assert len(fallback) == 1 and estimate_tokens(fallback[0]) < 800
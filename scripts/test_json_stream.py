@@ -0,0 +1,47 @@
+import json
+
+import pytest
+from json_stream import dump_json_array, iter_json_array, write_json_array
+
+ITEMS = [
+    {"id": "a1", "title": "Caches, queues – and ünïcode", "tags": ["x", "y"]},
+    {"id": 2, "score": 12345.678, "nested": {"empty": [], "none": None}},
+    "a plain string with a \n newline",
+    1234567890,
+    [],
+    True,
+]
+
+
+@pytest.mark.parametrize("indent", [2, None])
+def test_dump_matches_json_dumps(indent):
+    expected = json.dumps(ITEMS, indent=indent, ensure_ascii=False)
+    assert "".join(dump_json_array(ITEMS, indent=indent)) == expected
+    assert "".join(dump_json_array([], indent=indent)) == "[]"
+
+
+# a chunk smaller than every record forces a refill in the middle of records
+# and numbers
+@pytest.mark.parametrize("chunk_chars", [3, 7, 1 << 16])
+def test_write_then_iter_round_trip(tmp_path, chunk_chars):
+    path = str(tmp_path / "items.json")
+    assert write_json_array(iter(ITEMS), path)
+    assert list(iter_json_array(path, chunk_chars=chunk_chars)) == ITEMS
+    # same bytes again: nothing is written
+    assert not write_json_array(iter(ITEMS), path)
+
+
+def test_iter_empty_array(tmp_path):
+    path = tmp_path / "empty.json"
+    path.write_text(" [ \n ] \n", encoding="utf-8")
+    assert list(iter_json_array(str(path))) == []
+
+
+@pytest.mark.parametrize(
+    "text", ['{"not": "an array"}', "[1, 2", "[1 2]", "[1, 2] trailing"]
+)
+def test_iter_rejects_malformed_files(tmp_path, text):
+    path = tmp_path / "bad.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(str(path), chunk_chars=4))
@@ -0,0 +1,91 @@
+import random
+
+import pytest
+from near_duplicates import (
+    BAND_BITS,
+    BANDS,
+    NearDuplicateIndex,
+    _bands,
+    hamming_distance,
+    simhash,
+)
+
+WORDS = (
+    "latency throughput cache kernel scheduler database index replica consensus "
+    "compiler allocator thread socket buffer queue partition shard vector tensor"
+).split()
+
+
+def make_text(seed: int, words: int = 1000) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def flip_bits(fingerprint: int, bands: int) -> int:
+    """
+    fingerprint with one bit flipped in each of the first `bands` bands
+    """
+    for band in range(bands):
+        fingerprint ^= 1 << (band * BAND_BITS + 3)
+    return fingerprint
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "near_duplicates.sqlite"))
+    yield index
+    index.close()
+
+
+def test_simhash_needs_enough_tokens():
+    assert simhash("too short to fingerprint") is None
+    assert simhash(make_text(1)) is not None
+
+
+def test_small_edits_stay_close():
+    text = make_text(1)
+    edited = text.replace("cache", "caches", 1) + " and one more sentence"
+    assert hamming_distance(simhash(text), simhash(edited)) <= 6
+    assert hamming_distance(simhash(text), simhash(make_text(2))) > 6
+
+
+def test_bands_cover_the_fingerprint():
+    fingerprint = random.Random(3).getrandbits(64)
+    bands = _bands(fingerprint)
+    assert len(bands) == BANDS
+    rebuilt = sum(band << (i * BAND_BITS) for i, band in enumerate(bands))
+    assert rebuilt == fingerprint
+
+
+def test_find_through_an_untouched_band(tmp_path):
+    # with a distance limit below BANDS, a match always shares a band
+    index = NearDuplicateIndex(str(tmp_path / "nd.sqlite"), max_distance=BANDS - 1)
+    fingerprint = random.Random(4).getrandbits(64)
+    index.add("yt", "original", fingerprint)
+
+    close = flip_bits(fingerprint, BANDS - 1)
+    assert index.find("yt", close) == [("original", BANDS - 1)]
+    # every band differs: not a candidate, and too far anyway
+    assert index.find("yt", flip_bits(fingerprint, BANDS)) == []
+    assert index.find("articles", close) == []
+    index.close()
+
+
+def test_distance_limit_must_keep_band_lookups_exact(tmp_path):
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(str(tmp_path / "nd.sqlite"), max_distance=BANDS)
+
+
+def test_matches_are_sorted_and_filtered(index):
+    fingerprint = simhash(make_text(5))
+    index.add("yt", "far", flip_bits(fingerprint, 7))
+    index.add("yt", "near", flip_bits(fingerprint, 2))
+    index.add("yt", "same", fingerprint)
+    assert index.find("yt", fingerprint) == [("same", 0), ("near", 2)]
+
+
+def test_high_bit_fingerprints_round_trip(index):
+    fingerprint = (1 << 63) | 12345
+    index.add("yt", "key", fingerprint)
+    assert index.get("yt", "key") == fingerprint
+    assert index.find("yt", fingerprint) == [("key", 0)]
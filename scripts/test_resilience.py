@@ -0,0 +1,79 @@
+import time
+
+import pytest
+from resilience import CircuitBreaker, CircuitOpenError, ResilientService
+
+
+class FakeResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        self.headers = {}
+
+    def close(self):
+        pass
+
+
+def scripted(*statuses):
+    """
+    fn for ResilientService.call answering with the given statuses in order,
+    then 200 for good
+    """
+    remaining = list(statuses)
+
+    def attempt():
+        return FakeResponse(remaining.pop(0) if remaining else 200)
+
+    return attempt
+
+
+def make_service(**kwargs) -> ResilientService:
+    service = ResilientService("test", retries=4, backoff_base=0.001, **kwargs)
+    service.breaker = CircuitBreaker("test", cooldown=0.05, max_pause=2)
+    return service
+
+
+def test_breaker_opens_after_threshold_failures():
+    service = make_service()
+    response = service.call(scripted(503, 503, 503, 503, 503))
+    assert response.status_code == 503
+    assert service.breaker.state == "open"
+
+
+def test_throttled_probe_closes_breaker():
+    service = make_service()
+    service.call(scripted(503, 503, 503, 503, 503))
+    assert service.breaker.state == "open"
+
+    started = time.monotonic()
+    # the probe is throttled, its retry must get through
+    response = service.call(scripted(429))
+    assert response.status_code == 200
+    assert service.breaker.state == "closed"
+    assert time.monotonic() - started < 1
+
+
+def test_failed_probe_reopens_breaker_with_longer_cooldown():
+    breaker = CircuitBreaker("test", threshold=1, cooldown=0.05, max_pause=2)
+    breaker.record_failure()
+    assert breaker.state == "open"
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker._cooldown == pytest.approx(0.2)
+
+
+def test_throttled_answer_leaves_closed_breaker_alone():
+    breaker = CircuitBreaker("test", threshold=2)
+    breaker.record_failure()
+    breaker.record_throttled()
+    assert breaker.state == "closed"
+    assert breaker.failures == 1
+
+
+def test_breaker_gives_up_after_max_pause():
+    breaker = CircuitBreaker("test", threshold=1, cooldown=10, max_pause=60)
+    breaker.record_failure()
+    breaker._down_since -= 61
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
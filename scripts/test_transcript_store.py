@@ -0,0 +1,32 @@
+from transcript_store import Transcript, TranscriptStore
+
+
+def make_transcript() -> Transcript:
+    return Transcript.from_snippets(
+        [
+            ("Hello there.", 0.0, 2.0),
+            ("Still minute one.", 30.0, 2.0),
+            ("Later.", 75.0, 1.5),
+        ]
+    )
+
+
+def test_round_trip(tmp_path):
+    store = TranscriptStore(str(tmp_path / "transcripts.sqlite"))
+    store.put("vid", make_transcript())
+    transcript = store.get("vid")
+    assert transcript.text == make_transcript().text
+    assert transcript.timestamped_text() == (
+        "[00:00] Hello there. Still minute one. [01:15] Later."
+    )
+    assert (store.hits, store.misses) == (1, 0)
+
+
+def test_unreadable_row_is_deleted(tmp_path):
+    store = TranscriptStore(str(tmp_path / "transcripts.sqlite"))
+    store.put("vid", make_transcript())
+    store._conn.execute("UPDATE transcripts SET data = ?", (b"not zlib",))
+
+    assert store.get("vid") is None
+    assert store._conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0] == 0
+    assert (store.hits, store.misses) == (0, 1)
@@ -0,0 +1,255 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+except ImportError:  # lxml is optional, fall back to BeautifulSoup
+    etree = None
+
+# never hold more than this much HTML in the streaming parser
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+# and never hand more than this much text to the summarizer
+DEFAULT_MAX_CHARS = 200_000
+
+CHUNK_SIZE = 64 * 1024
+
+SKIP_TAGS = {
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "svg",
+    "iframe",
+    "nav",
+    "footer",
+    "header",
+    "aside",
+    "form",
+    "button",
+    "select",
+}
+BLOCK_TAGS = {
+    "p",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "li",
+    "pre",
+    "blockquote",
+    "td",
+    "th",
+    "dt",
+    "dd",
+    "figcaption",
+    "div",
+    "section",
+    "article",
+    "main",
+}
+CONTENT_ROOTS = {"main", "article"}
+# document and content wrappers are never skipped, whatever their classes say
+NEVER_BOILERPLATE = {"html", "body"} | CONTENT_ROOTS
+KEEP_SHORT_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6", "pre"}
+# matched against whole id/class/role tokens: "site-footer" and "nav" are
+# boilerplate, "menu-closed", "has-sidebar" and "post-comments-count" are not
+BOILERPLATE_RE = re.compile(
+    r"^(?:site|page|global|top|bottom)?[-_]?"
+    r"(?:cookies?|consent|gdpr|banner|navbar|nav|navigation|menu|breadcrumbs?|"
+    r"footer|sidebar|subscribe|newsletter|share|sharing|social|related|"
+    r"comments?|promo|advert|ads|popup|modal)"
+    r"(?:[-_](?:bar|banner|box|container|wrapper|area|section|links|list|"
+    r"widget|notice|form|posts))?$",
+    re.I,
+)
+WHITESPACE_RE = re.compile(r"\s+")
+HEAD_END_RE = re.compile(r"</head\s*>", re.I)
+# meta tags first: <title> often carries a " | Site name" suffix
+TITLE_META = (("property", "og:title"), ("name", "twitter:title"))
+# titles served by bot walls and error pages rather than the article
+JUNK_TITLES = {
+    "just a moment...",
+    "attention required! | cloudflare",
+    "access denied",
+    "403 forbidden",
+    "404 not found",
+    "page not found",
+    "not found",
+    "error",
+}
+
+
+def extract_text_bs4(html: str) -> str:
+    """
+    Original extraction path: full BeautifulSoup tree with html.parser,
+    text of <main> if present, otherwise the whole document.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    # Remove script and style elements
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    # Try to get main content if possible
+    main = soup.find("main")
+    if main:
+        return main.get_text(separator=" ", strip=True)
+    return soup.get_text(separator=" ", strip=True)
+
+
+def extract_title(html: str) -> Optional[str]:
+    """
+    Title of a page from og:title, twitter:title or <title>, in that order.
+    Only the <head> is parsed. Returns None when the page has no usable title.
+    """
+    match = HEAD_END_RE.search(html)
+    soup = BeautifulSoup(html[: match.end()] if match else html, "html.parser")
+    candidates = [
+        tag.get("content")
+        for attr, value in TITLE_META
+        for tag in soup.find_all("meta", attrs={attr: value})
+    ]
+    if soup.title and soup.title.string:
+        candidates.append(soup.title.string)
+    for candidate in candidates:
+        title = WHITESPACE_RE.sub(" ", candidate or "").strip()
+        if title and title.lower() not in JUNK_TITLES:
+            return title
+    return None
+
+
+def _is_boilerplate(el) -> bool:
+    if el.tag in SKIP_TAGS:
+        return True
+    if el.tag in NEVER_BOILERPLATE:
+        return False
+    marker = f"{el.get('id', '')} {el.get('class', '')} {el.get('role', '')}"
+    return any(BOILERPLATE_RE.match(token) for token in marker.split())
+
+
+def extract_text_lxml(
+    html: str,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    max_chars: int = DEFAULT_MAX_CHARS,
+    min_block_chars: int = 25,
+    max_link_density: float = 0.5,
+) -> str:
+    """
+    Streaming extraction with lxml's pull parser.
+
+    The document is fed in chunks (at most max_bytes) and every finished
+    block is scored and then cleared, so the parser never keeps more than the
+    current path of the DOM in memory. Blocks inside nav/footer/cookie-banner
+    style containers are skipped, and the rest are kept only if they carry
+    enough text and are not mostly links. When the page has <main> or
+    <article>, only blocks inside it are used. Pages this yields no text for
+    go through extract_text_bs4 instead.
+    """
+    parser = etree.HTMLPullParser(events=("start", "end"), remove_comments=True)
+    data = html.encode("utf-8", errors="ignore")[:max_bytes]
+
+    skip_depth = 0
+    content_depth = 0
+    blocks: List[tuple] = []  # (text, inside_content_root)
+    total_chars = 0
+
+    def handle_events():
+        nonlocal skip_depth, content_depth, total_chars
+        for event, el in parser.read_events():
+            tag = el.tag if isinstance(el.tag, str) else ""
+            if event == "start":
+                if skip_depth or _is_boilerplate(el):
+                    skip_depth += 1
+                elif tag in CONTENT_ROOTS:
+                    content_depth += 1
+                continue
+
+            if skip_depth:
+                skip_depth -= 1
+                if skip_depth == 0:
+                    el.clear(keep_tail=True)
+                continue
+            if tag in CONTENT_ROOTS:
+                content_depth -= 1
+            if tag not in BLOCK_TAGS:
+                continue
+
+            text = WHITESPACE_RE.sub(" ", "".join(el.itertext())).strip()
+            if text:
+                link_chars = sum(
+                    len("".join(a.itertext()).strip()) for a in el.iter("a")
+                )
+                long_enough = len(text) >= min_block_chars or tag in KEEP_SHORT_TAGS
+                if long_enough and link_chars / len(text) <= max_link_density:
+                    blocks.append((text, content_depth > 0 or tag in CONTENT_ROOTS))
+                    total_chars += len(text)
+            # the block is consumed: drop its subtree and finished siblings
+            el.clear(keep_tail=True)
+            parent = el.getparent()
+            while el.getprevious() is not None:
+                # keep loose text between blocks for the parent's own block
+                parent.text = (parent.text or "") + " " + (parent[0].tail or "")
+                del parent[0]
+
+    for start in range(0, len(data), CHUNK_SIZE):
+        parser.feed(data[start : start + CHUNK_SIZE])
+        handle_events()
+        if total_chars >= max_chars:
+            break
+    else:
+        parser.close()
+        handle_events()
+
+    if any(in_root for _, in_root in blocks):
+        blocks = [b for b in blocks if b[1]]
+    text = " ".join(text for text, _ in blocks)[:max_chars]
+    # the heuristics can discard every block of an unusual layout
+    return text or extract_text_bs4(html)[:max_chars]
+
+
+EXTRACTORS: Dict[str, Callable[[str], str]] = {"bs4": extract_text_bs4}
+if etree is not None:
+    EXTRACTORS["lxml"] = extract_text_lxml
+
+
+def get_extractor(name: Optional[str] = None) -> Callable[[str], str]:
+    """
+    Resolve an extractor backend by name (TECHDEX_EXTRACTOR env by default).
+    Uses the streaming lxml backend when available, otherwise BeautifulSoup.
+    """
+    name = name or os.getenv("TECHDEX_EXTRACTOR") or ("lxml" if etree else "bs4")
+    if name not in EXTRACTORS:
+        raise ValueError(
+            f"Unknown extractor '{name}', choose from {', '.join(EXTRACTORS)}"
+        )
+    return EXTRACTORS[name]
+
+
+def extract_text(html: str, backend: Optional[str] = None) -> str:
+    """
+    Extract readable text from HTML with the chosen backend.
+    Top-level so it can be submitted to a ProcessPoolExecutor.
+    """
+    return get_extractor(backend)(html)
+
+
+def extract_many(
+    pages: Iterable[str], backend: Optional[str] = None, workers: int = 0
+) -> List[str]:
+    """
+    Extract text from many HTML documents, in order
+
+    Args:
+        pages: HTML documents
+        backend: Extractor backend name
+        workers: Size of the process pool; 0 parses in the calling process
+    """
+    pages = list(pages)
+    if workers <= 0:
+        return [extract_text(html, backend) for html in pages]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(extract_text, pages, [backend] * len(pages)))
@@ -0,0 +1,225 @@
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Iterator, Optional, Tuple
+
+from chunking import timestamp_marker
+from summary_cache import cache_dir
+
+# seconds of playback between the markers of timestamped_text
+MARKER_SECONDS = 60.0
+# magic, snippet count, UTF-8 text length
+HEADER = struct.Struct("<4sII")
+MAGIC = b"TDT1"
+
+
+def _le_bytes(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le_bytes(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+class Transcript:
+    """
+    A transcript as one text buffer plus parallel per-snippet arrays.
+
+    offsets[i] is where snippet i starts in text, starts[i] and durations[i]
+    are its timing in seconds. Thousands of snippets cost a few bytes each
+    instead of a Python object per snippet, and the text is built with a
+    single join.
+    """
+
+    __slots__ = ("text", "offsets", "starts", "durations")
+
+    def __init__(self, text: str, offsets: array, starts: array, durations: array):
+        self.text = text
+        self.offsets = offsets
+        self.starts = starts
+        self.durations = durations
+
+    @classmethod
+    def from_snippets(
+        cls, snippets: Iterable[Tuple[str, float, float]]
+    ) -> "Transcript":
+        """
+        Args:
+            snippets: (text, start, duration) tuples in playback order
+        """
+        parts = []
+        offsets = array("I")
+        starts = array("f")
+        durations = array("f")
+        position = 0
+        for text, start, duration in snippets:
+            offsets.append(position)
+            starts.append(start)
+            durations.append(duration)
+            parts.append(text)
+            position += len(text)
+        return cls("".join(parts), offsets, starts, durations)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def snippet(self, i: int) -> Tuple[str, float, float]:
+        end = self.offsets[i + 1] if i + 1 < len(self.offsets) else len(self.text)
+        return self.text[self.offsets[i] : end], self.starts[i], self.durations[i]
+
+    def __iter__(self) -> Iterator[Tuple[str, float, float]]:
+        return (self.snippet(i) for i in range(len(self)))
+
+    def time_at(self, char_offset: int) -> float:
+        """
+        Playback time (seconds) of the snippet that contains char_offset
+        """
+        if not self.offsets:
+            return 0.0
+        return self.starts[max(0, bisect_right(self.offsets, char_offset) - 1)]
+
+    def timestamped_text(self, every: float = MARKER_SECONDS) -> str:
+        """
+        The snippets separated by spaces, with a "[mm:ss]" marker before the
+        first snippet of every `every` seconds. Long transcripts are chunked
+        on these markers (see chunking.py), so no chunk starts mid-snippet.
+        """
+        parts = []
+        next_marker = 0.0
+        for text, start, _ in self:
+            if start >= next_marker:
+                parts.append(timestamp_marker(start))
+                next_marker = start + every
+            parts.append(text.strip())
+        return " ".join(part for part in parts if part)
+
+    def to_bytes(self) -> bytes:
+        text = self.text.encode("utf-8")
+        body = b"".join(
+            (
+                HEADER.pack(MAGIC, len(self), len(text)),
+                _le_bytes(self.offsets),
+                _le_bytes(self.starts),
+                _le_bytes(self.durations),
+                text,
+            )
+        )
+        return zlib.compress(body, 6)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Transcript":
+        body = zlib.decompress(data)
+        magic, count, text_length = HEADER.unpack_from(body)
+        if magic != MAGIC:
+            raise ValueError("not a serialized transcript")
+        position = HEADER.size
+        arrays = []
+        for typecode in ("I", "f", "f"):
+            size = count * array(typecode).itemsize
+            arrays.append(_from_le_bytes(typecode, body[position : position + size]))
+            position += size
+        text = body[position : position + text_length].decode("utf-8")
+        return cls(text, *arrays)
+
+
+class TranscriptStore:
+    """
+    Per-video transcript cache backed by SQLite, one compressed
+    Transcript blob per video. Transcripts of published videos rarely
+    change, so entries only expire after max_age_days.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_age_days: float = 365):
+        self.path = path or os.path.join(cache_dir(), "transcripts.sqlite")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.max_age_seconds = max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS transcripts (
+                video_id TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """)
+        self._conn.commit()
+
+    def get(self, video_id: str) -> Optional[Transcript]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, created_at FROM transcripts WHERE video_id = ?",
+                (video_id,),
+            ).fetchone()
+            if row is None or time.time() - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+        try:
+            transcript = Transcript.from_bytes(row[0])
+        except (ValueError, zlib.error, struct.error) as e:
+            print(f"  Warning: dropping unreadable cached transcript {video_id}: {e}")
+            with self._lock:
+                self.misses += 1
+                # unless another thread has stored a fresh copy meanwhile
+                self._conn.execute(
+                    "DELETE FROM transcripts WHERE video_id = ? AND created_at = ?",
+                    (video_id, row[1]),
+                )
+                self._conn.commit()
+            return None
+        with self._lock:
+            self.hits += 1
+        return transcript
+
+    def put(self, video_id: str, transcript: Transcript) -> None:
+        data = transcript.to_bytes()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?)",
+                (video_id, data, time.time()),
+            )
+            self._conn.commit()
+
+    def stats(self) -> str:
+        return f"transcript cache: {self.hits} hits, {self.misses} misses"
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_default_store: Optional[TranscriptStore] = None
+_default_lock = threading.Lock()
+
+
+def get_default_store() -> Optional[TranscriptStore]:
+    """
+    Process-wide transcript cache.
+    Returns None when disabled with TECHDEX_TRANSCRIPT_CACHE=0.
+    """
+    global _default_store
+    if os.getenv("TECHDEX_TRANSCRIPT_CACHE", "1") == "0":
+        return None
+    with _default_lock:
+        if _default_store is None:
+            try:
+                _default_store = TranscriptStore()
+            except sqlite3.Error as e:
+                print(f"Warning: transcript cache unavailable: {e}")
+                return None
+        return _default_store